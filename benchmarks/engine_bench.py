@@ -0,0 +1,313 @@
+"""
+比赛引擎的微基准：以随机生成的俱乐部测试GameEvE.start、GameEvE.tactical_start与GamePvE.start_one_turn的每秒场数，
+以及抽样、换位、对抗等基本操作的单次耗时
+俱乐部与球员按game_configs.formations与location_capability生成，写入内存中的SQLite数据库，不需要MySQL中的存档；
+结果写入JSON文件，指定另一次的结果文件时逐项比较，单次耗时增加超过阈值的项视为退化，此时以非零状态退出
+用法：python -m benchmarks.engine_bench [结果文件] [对比的结果文件] [退化阈值]
+"""
+
+import datetime
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import game_configs
+import models
+from models.base import Base
+from modules import game_app, generate_app
+from modules.game_app.match_engine import ClubSnapshot, PlayerSnapshot
+from modules.game_app.player_selector import PlayerSelector
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from utils import sampling, utils
+
+CAPA_NAMES = tuple(game_configs.location_capability[0]["weight"])
+LOCATION_WEIGHTS = {location["name"]: location["weight"] for location in game_configs.location_capability}
+DATE = "2020-09-01"
+SEASON = 1
+REPEAT = 3
+
+
+def get_capa(rng: random.Random, location: str, level: float) -> Dict[str, float]:
+    """
+    生成一名球员的能力：在球队水平附近波动，所在位置比重越高的能力越高
+    :param location: 位置
+    :param level: 球队水平
+    """
+    weight = LOCATION_WEIGHTS[location]
+    return {name: min(max(rng.gauss(level - 10 + weight[name] * 60, 5), 1), 99) for name in CAPA_NAMES}
+
+
+def get_lineup(rng: random.Random, formation: str) -> List[Tuple]:
+    """
+    生成不连接数据库的首发阵容，格式见Team.init_players
+    :param formation: 阵型名
+    """
+    level = rng.uniform(50, 80)
+    lineup = []
+    for location, count in game_configs.formations[formation].items():
+        for _ in range(count):
+            snapshot = PlayerSnapshot(
+                player_id=len(lineup), translated_name="p", real_stamina=100, capa=get_capa(rng, location, level)
+            )
+            lineup.append((snapshot, location, snapshot))
+    return lineup
+
+
+def get_match(rng: random.Random) -> "game_app.MatchSnapshot":
+    """
+    生成随机阵型与战术比重的比赛快照
+    """
+    clubs = []
+    lineups = []
+    for club_id in (1, 2):
+        tactic = {tactic.value: rng.randint(10, 90) for tactic in game_configs.Tactic}
+        clubs.append(ClubSnapshot(club_id=club_id, name=str(club_id), reputation=50, tactic=tactic))
+        lineups.append(get_lineup(rng, rng.choice(list(game_configs.formations))))
+    return game_app.MatchSnapshot(clubs=(clubs[0], clubs[1]), lineups=(lineups[0], lineups[1]))
+
+
+def create_world(rng: random.Random) -> Session:
+    """
+    在内存中的SQLite数据库中生成一个存档：一个联赛、两家俱乐部，每家俱乐部的球员为阵型所需人数的两倍，
+    玩家俱乐部为1号，首发阵容已选好
+    :return: 数据库会话
+    """
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)()
+    created_time = datetime.datetime.now()
+    save_model = models.Save(id=1, created_time=created_time, date=DATE, season=SEASON, player_club_id=1)
+    league_model = models.League(id=1, created_time=created_time, name="bench", cup="bench_cup", save=save_model)
+    db.add_all([save_model, league_model])
+    for club_id in (1, 2):
+        formation = rng.choice(list(game_configs.formations))
+        club_model = models.Club(id=club_id, created_time=created_time, name=str(club_id), finance=0, reputation=50)
+        club_model.league_id = league_model.id
+        club_model.coach = models.Coach(
+            created_time=created_time,
+            name=str(club_id),
+            formation=formation,
+            **{tactic.value: rng.randint(10, 90) for tactic in game_configs.Tactic},
+        )
+        level = rng.uniform(50, 80)
+        for location, count in game_configs.formations[formation].items():
+            for _ in range(count * 2):
+                player_model = models.Player(
+                    created_time=created_time,
+                    name="p",
+                    translated_name="p",
+                    age=25,
+                    real_stamina=100,
+                    values=10.0,
+                    **{"{}_num".format(location["name"]): 0 for location in game_configs.location_capability},
+                    **get_capa(rng, location, level),
+                    **{"{}_limit".format(name): 99 for name in CAPA_NAMES},
+                )
+                club_model.players.append(player_model)
+        db.add(club_model)
+    db.commit()
+    save_model.lineup = PlayerSelector(club_id=1, db=db, season=SEASON, date=DATE).select_players(is_save_mode=True)
+    db.commit()
+    return db
+
+
+def reset_players(db: Session):
+    """
+    恢复球员的体力与能力，使每场比赛的条件相同
+    """
+    db.query(models.Player).update({"real_stamina": 100, "last_game_date": None}, synchronize_session="fetch")
+
+
+def measure(case: Callable[[], int], number: int, setup: Optional[Callable] = None) -> Tuple[int, float]:
+    """
+    重复REPEAT轮，每轮调用number次，取耗时最少的一轮
+    :param case: 用例，返回本次调用完成的操作数
+    :param setup: 每次调用前的准备，不计入耗时
+    :return: 每轮的操作数，每次操作的平均耗时（秒）
+    """
+    best = None
+    ops = 0
+    for _ in range(REPEAT):
+        ops = 0
+        elapsed = 0.0
+        for _ in range(number):
+            if setup is not None:
+                setup()
+            s = time.perf_counter()
+            ops += case()
+            elapsed += time.perf_counter() - s
+        best = elapsed if best is None else min(best, elapsed)
+    return ops, best / ops
+
+
+def get_match_cases(
+    db: Session, rng: random.Random
+) -> List[Tuple[str, str, Callable[[], int], int, Optional[Callable]]]:
+    """
+    :return: (用例名, 操作单位, 用例, 每轮调用次数, 准备)列表
+    """
+    match = get_match(rng)
+
+    def eve_start():
+        # 挑选首发、模拟、评分并写入数据库的完整流程
+        game_app.GameEvE(
+            db=db, club1_id=1, club2_id=2, date=DATE, game_type="league", game_name="bench", season=SEASON, save_id=1
+        ).start()
+        return 1
+
+    def eve_simulate():
+        match.seed = rng.getrandbits(32)
+        match.simulate()
+        return 1
+
+    def tactical_start():
+        match.seed = rng.getrandbits(32)
+        match.play_tactical(num=10)
+        return 10
+
+    def create_pve():
+        reset_players(db)
+        game_pve_generator = generate_app.GamePvEGenerator(db=db, save_model=db.query(models.Save).get(1))
+        game_pve_generator.create_game_pve(
+            player_club_id=1,
+            computer_club_id=2,
+            game={"club_id": "1,2", "game_name": "bench", "game_type": "league"},
+            date=DATE,
+            season=SEASON,
+        )
+        game_pve_generator.create_team_n_player_pve()
+
+    def pve_turns():
+        # 与接口相同，每回合重新读取临时表
+        turns = 0
+        is_running = True
+        while is_running:
+            is_running, _ = game_app.GamePvE(save_id=1, db=db, player_tactic="").start_one_turn()
+            turns += 1
+        return turns
+
+    return [
+        ("eve_start", "match", eve_start, 5, lambda: reset_players(db)),
+        ("eve_simulate", "match", eve_simulate, 50, None),
+        ("tactical_start", "match", tactical_start, 10, None),
+        ("pve_start_one_turn", "turn", pve_turns, 2, create_pve),
+    ]
+
+
+def get_primitive_cases(rng: random.Random) -> List[Tuple[str, str, Callable[[], int], int, Optional[Callable]]]:
+    """
+    :return: 基本操作的用例，格式同get_match_cases
+    """
+    game_eve = get_match(rng).build_game()
+    team = game_eve.lteam
+    attacker, defender = game_eve.lteam.players[-1], game_eve.rteam.players[-1]
+    shift_pro = game_configs.location_shift[game_configs.Location.CM]
+
+    def select_by_pro():
+        utils.select_by_pro(shift_pro, rng)
+        return 1
+
+    def select_tactic():
+        team.select_tactic(counter_attack_permitted=True)
+        return 1
+
+    def shift_location():
+        team.shift_location()
+        return 1
+
+    def duel():
+        sampling.duel(attacker.get_capa("dribbling"), defender.get_capa("interception"), rng)
+        return 1
+
+    def dribble_and_block():
+        team.dribble_and_block(attacker, defender)
+        return 1
+
+    return [
+        ("select_by_pro", "call", select_by_pro, 100000, None),
+        ("select_tactic", "call", select_tactic, 100000, None),
+        ("shift_location", "call", shift_location, 10000, None),
+        ("duel", "call", duel, 100000, None),
+        ("dribble_and_block", "call", dribble_and_block, 10000, None),
+    ]
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    逐项比较单次耗时
+    :param results: 本次结果
+    :param baseline: 对比的结果
+    :param threshold: 退化阈值，耗时增加的比例
+    :return: 退化的用例名
+    """
+    print("{:<22}{:>14}{:>14}{:>10}".format("case", "baseline", "current", "change"))
+    regressions = []
+    for name, case in results["cases"].items():
+        if name not in baseline["cases"]:
+            continue
+        old, new = baseline["cases"][name]["seconds"], case["seconds"]
+        change = new / old - 1
+        if change > threshold:
+            regressions.append(name)
+        print(
+            "{:<22}{:>11.1f} us{:>11.1f} us{:>+9.1%}{}".format(
+                name, old * 1e6, new * 1e6, change, " REGRESSION" if change > threshold else ""
+            )
+        )
+    return regressions
+
+
+def run(output: str = "engine_bench.json", baseline_path: Optional[str] = None, threshold: float = 0.1) -> bool:
+    """
+    :param output: 结果文件
+    :param baseline_path: 对比的结果文件，为空时不比较
+    :param threshold: 退化阈值，单次耗时增加的比例
+    :return: 是否没有退化
+    """
+    rng = random.Random(0)
+    random.seed(0)  # GamePvE与选人使用全局随机数
+    db = create_world(rng)
+    results = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "created_time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "cases": dict(),
+    }
+    print("{:<22}{:>10}{:>14}{:>14}".format("case", "ops", "us/op", "ops/s"))
+    for name, unit, case, number, setup in get_match_cases(db, rng) + get_primitive_cases(rng):
+        ops, seconds = measure(case, number, setup)
+        results["cases"][name] = {"unit": unit, "ops": ops, "seconds": seconds, "per_second": 1 / seconds}
+        print("{:<22}{:>10}{:>14.2f}{:>14.1f}".format(name, ops, seconds * 1e6, 1 / seconds))
+    db.close()
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    if baseline_path is None:
+        return True
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, threshold)
+    if regressions:
+        print("退化：{}".format(", ".join(regressions)))
+    return not regressions
+
+
+if __name__ == "__main__":
+    passed = run(
+        sys.argv[1] if len(sys.argv) > 1 else "engine_bench.json",
+        sys.argv[2] if len(sys.argv) > 2 else None,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.1,
+    )
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,176 @@
+"""
+多进程比赛日执行器的基准：以随机生成的比赛快照测试game_app.MatchdayExecutor.simulate在不同进程数下的耗时与加速比，
+并检查结果与进程数无关；另在内存中的SQLite存档上逐场按逐场引擎（NextTurner.play_game）的步骤进行比赛，
+检查相同种子下两种引擎的战术调整、比分与比赛过程一致
+用法：python -m benchmarks.executor_bench [比赛数] [进程数，逗号分隔] [一致性检查的比赛数]
+"""
+
+import os
+import random
+import sys
+import time
+from typing import List, Tuple
+
+from benchmarks.engine_bench import DATE, SEASON, create_world, get_match, reset_players
+from modules import game_app
+from modules.game_app.matchday_executor import FixtureResult, FixtureSnapshot
+from sqlalchemy.orm import Session
+
+WORKERS = (1, 2, 4, 8)
+
+
+def get_fixtures(rng: random.Random, num: int) -> List[FixtureSnapshot]:
+    """
+    生成随机阵型与战术比重的比赛快照，战术调整模拟赛使用同一阵容
+    :param num: 比赛数
+    """
+    fixtures = []
+    for _ in range(num):
+        match = get_match(rng)
+        match.seed = rng.getrandbits(32)
+        test_match = get_match(rng)
+        test_match.seed = rng.getrandbits(32)
+        fixtures.append(
+            FixtureSnapshot(game_eve=match.build_game(), test_game=test_match.build_game(), player_club_id=0)
+        )
+    return fixtures
+
+
+def get_outcome(result: FixtureResult) -> Tuple:
+    """
+    :return: 用于比较的比赛结果：比分、双方战术与比赛过程
+    """
+    return result.scores, result.tactics, result.winner_id, result.turns, len(result.event_log)
+
+
+def bench_scaling(fixtures_num: int, workers_list: Tuple[int, ...]) -> bool:
+    """
+    :return: 各进程数的结果是否一致
+    """
+    fixtures = get_fixtures(random.Random(0), fixtures_num)
+    print("cpu: {}".format(os.cpu_count()))
+    print("{:<10}{:>12}{:>14}{:>10}".format("workers", "seconds", "ms/fixture", "speedup"))
+    baseline = None
+    outcomes = None
+    consistent = True
+    for workers in workers_list:
+        executor = game_app.MatchdayExecutor(db=None, save_model=None, date=DATE, workers=workers)
+        s = time.perf_counter()
+        results = executor.simulate(fixtures)
+        elapsed = time.perf_counter() - s
+        if baseline is None:
+            baseline = elapsed
+            outcomes = [get_outcome(result) for result in results]
+        elif [get_outcome(result) for result in results] != outcomes:
+            consistent = False
+        print(
+            "{:<10}{:>12.2f}{:>14.1f}{:>9.2f}x".format(
+                workers, elapsed, elapsed / fixtures_num * 1000, baseline / elapsed
+            )
+        )
+    return consistent
+
+
+def play_serial(db: Session, seed: int) -> Tuple:
+    """
+    按NextTurner.play_game的步骤逐场进行：在数据库中挑选阵容，战术调整写入coach表后再创建比赛
+    :return: 比赛结果，格式同get_outcome
+    """
+    rng = random.Random(seed)
+    tactic_adjustor = game_app.TacticAdjustor(
+        db=db, club1_id=1, club2_id=2, player_club_id=1, save_id=1, season=SEASON, date=DATE
+    )
+    test_game = tactic_adjustor.init_test_game(rng)
+    teams_data = tactic_adjustor.play_tactical(game_app.MatchSnapshot.from_game(test_game))
+    tactic_adjustor.adjust(*teams_data)
+    game_eve = game_app.GameEvE(
+        db=db,
+        club1_id=1,
+        club2_id=2,
+        date=DATE,
+        game_name="bench",
+        game_type="league",
+        season=SEASON,
+        save_id=1,
+        seed=seed,
+        lineup_rng=rng,
+    )
+    game_eve.simulate()
+    game_eve.finish()
+    tactics = (None, game_app.TacticAdjustor.get_tactic_pro(teams_data[1]))
+    outcome = (game_eve.lteam.score, game_eve.rteam.score), tactics, game_eve.winner_id, game_eve.turns
+    return outcome + (len(game_eve.event_log),)
+
+
+def load_fixture(db: Session, seed: int) -> FixtureSnapshot:
+    """
+    按MatchdayExecutor.load的步骤读取一场比赛的快照
+    """
+    rng = random.Random(seed)
+    tactic_adjustor = game_app.TacticAdjustor(
+        db=db, club1_id=1, club2_id=2, player_club_id=1, save_id=1, season=SEASON, date=DATE
+    )
+    test_game = tactic_adjustor.init_test_game(rng)
+    game_eve = game_app.GameEvE(
+        db=db,
+        club1_id=1,
+        club2_id=2,
+        date=DATE,
+        game_name="bench",
+        game_type="league",
+        season=SEASON,
+        save_id=1,
+        seed=seed,
+        lineup_rng=rng,
+    )
+    return FixtureSnapshot(game_eve=game_eve, test_game=test_game, player_club_id=1)
+
+
+def check_serial(fixtures_num: int, workers: int) -> bool:
+    """
+    相同种子下逐场引擎与多进程执行器的结果是否一致
+    每场比赛前恢复球员体力并回滚战术调整，使两种引擎从相同的存档状态开始
+    """
+    db = create_world(random.Random(0))
+    seeds = list(range(fixtures_num))
+    serial_outcomes = []
+    for seed in seeds:
+        reset_players(db)
+        serial_outcomes.append(play_serial(db, seed))
+        db.rollback()
+    fixtures = []
+    for seed in seeds:
+        reset_players(db)
+        fixtures.append(load_fixture(db, seed))
+        db.rollback()
+    db.close()
+    executor = game_app.MatchdayExecutor(db=None, save_model=None, date=DATE, workers=workers)
+    process_outcomes = [get_outcome(result) for result in executor.simulate(fixtures)]
+    mismatches = sum(serial != process for serial, process in zip(serial_outcomes, process_outcomes))
+    print("serial vs {} workers: {}/{} fixtures identical".format(workers, fixtures_num - mismatches, fixtures_num))
+    return mismatches == 0
+
+
+def run(fixtures_num: int = 64, workers_list: Tuple[int, ...] = WORKERS, check_num: int = 8) -> bool:
+    """
+    :param fixtures_num: 测试耗时的比赛数
+    :param workers_list: 进程数
+    :param check_num: 与逐场引擎比较的比赛数
+    :return: 结果是否与进程数无关且与逐场引擎一致
+    """
+    consistent = bench_scaling(fixtures_num, workers_list)
+    if not consistent:
+        print("不同进程数的结果不一致")
+    equivalent = check_serial(check_num, max(workers_list))
+    if not equivalent:
+        print("多进程执行器与逐场引擎的结果不一致")
+    return consistent and equivalent
+
+
+if __name__ == "__main__":
+    passed = run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 64,
+        tuple(int(workers) for workers in sys.argv[2].split(",")) if len(sys.argv) > 2 else WORKERS,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 8,
+    )
+    sys.exit(0 if passed else 1)
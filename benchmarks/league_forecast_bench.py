@@ -0,0 +1,99 @@
+"""
+联赛预测的基准：以随机生成的联赛（双循环赛程全部未进行）测试game_app.LeagueForecaster.simulate在不同模拟次数下的耗时，
+并与逐场循环的朴素实现对比，检查是否满足接口的耗时预算
+用法：python -m benchmarks.league_forecast_bench [俱乐部数] [耗时预算（秒）]
+"""
+
+import random
+import sys
+import time
+from typing import Tuple
+
+import numpy as np
+from modules import game_app
+
+SIMULATIONS = (1000, 5000, 10000)
+NAIVE_SIMULATIONS = 200
+
+
+def get_league(clubs_num: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    :return: 双循环赛程的主客队序号，进球期望矩阵
+    """
+    rng = np.random.default_rng(seed)
+    fixtures = np.array([(i, j) for i in range(clubs_num) for j in range(clubs_num) if i != j])
+    strength = rng.normal(0, 0.3, clubs_num)
+    expected_goals = np.exp(0.3 + strength[:, None] - strength[None, :])
+    return fixtures, expected_goals
+
+
+def naive_simulate(fixtures: np.ndarray, expected_goals: np.ndarray, simulations: int, seed: int = 0) -> np.ndarray:
+    """
+    逐次、逐场模拟的朴素实现
+    :return: 每次模拟中各俱乐部的最终名次
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    clubs_num = len(expected_goals)
+    ranks = np.empty((simulations, clubs_num), dtype=np.int64)
+    for n in range(simulations):
+        points, goal_diff, goals_for = [0] * clubs_num, [0] * clubs_num, [0] * clubs_num
+        for i, j in fixtures:
+            score1 = np_rng.poisson(expected_goals[i, j])
+            score2 = np_rng.poisson(expected_goals[j, i])
+            points[i] += 3 if score1 > score2 else 1 if score1 == score2 else 0
+            points[j] += 3 if score2 > score1 else 1 if score1 == score2 else 0
+            goal_diff[i] += score1 - score2
+            goal_diff[j] += score2 - score1
+            goals_for[i] += score1
+            goals_for[j] += score2
+        order = sorted(range(clubs_num), key=lambda k: (points[k], goal_diff[k], goals_for[k], rng.random()))
+        ranks[n, order[::-1]] = np.arange(clubs_num)
+    return ranks
+
+
+def run(clubs_num: int = 20, budget: float = 1.0):
+    """
+    :param clubs_num: 联赛的俱乐部数
+    :param budget: 单次预测的耗时预算（秒）
+    """
+    fixtures, expected_goals = get_league(clubs_num)
+    zeros = np.zeros(clubs_num, dtype=np.int64)
+    print("{}支球队，剩余{}场".format(clubs_num, len(fixtures)))
+
+    s = time.perf_counter()
+    naive_ranks = naive_simulate(fixtures, expected_goals, NAIVE_SIMULATIONS)
+    naive_time = (time.perf_counter() - s) / NAIVE_SIMULATIONS
+    print("{:<12}{:>10}{:>12}{:>12}{:>10}".format("impl", "sims", "ms/1k sims", "total ms", "budget"))
+    print(
+        "{:<12}{:>10}{:>12.1f}{:>12.1f}".format(
+            "naive", NAIVE_SIMULATIONS, naive_time * 1e6, naive_time * 1e3 * NAIVE_SIMULATIONS
+        )
+    )
+    for simulations in SIMULATIONS:
+        s = time.perf_counter()
+        ranks, _ = game_app.LeagueForecaster.simulate(
+            zeros, zeros, zeros, fixtures, expected_goals, simulations, seed=0
+        )
+        total = time.perf_counter() - s
+        print(
+            "{:<12}{:>10}{:>12.3f}{:>12.1f}{:>10}".format(
+                "vectorized",
+                simulations,
+                total / simulations * 1e6,
+                total * 1000,
+                "OK" if total < budget else "OVER",
+            )
+        )
+    print("相对朴素实现的加速比：{:.0f}x".format(naive_time / (total / simulations)))
+    # 两种实现的夺冠概率应一致（在抽样误差范围内）
+    title = (ranks == 0).mean(axis=0)
+    naive_title = (naive_ranks == 0).mean(axis=0)
+    print("夺冠概率最大差异：{:.3f}".format(np.abs(title - naive_title).max()))
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 1.0,
+    )
@@ -0,0 +1,119 @@
+"""
+快速模拟与完整模拟的赛季对比报告
+随机生成一个联赛的俱乐部（阵容、战术比重固定），分别以完整比赛引擎与game_app.QuickSimulator进行多个双循环赛季，
+比较赛季层面的统计：场均进球、主客胜平比例、积分的标准差与极差、冠军与垫底积分、各队场均积分的相关系数，以及场均耗时
+用法：python -m benchmarks.quick_sim_report [赛季数] [俱乐部数] [模型文件]
+"""
+
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+import game_configs
+import numpy as np
+from modules import game_app
+from modules.game_app.match_engine import ClubSnapshot
+from modules.game_app.quick_simulator import TACTIC_NAMES
+from modules.ml_app.surrogate_trainer import SurrogateTrainer
+
+METRICS = ("goals", "home_win", "draw", "away_win", "points_std", "points_range", "top_points", "bottom_points")
+
+
+def get_league(clubs_num: int, seed: int = 0) -> List[tuple]:
+    """
+    生成联赛的俱乐部
+    :return: (俱乐部快照, 首发阵容)列表
+    """
+    rng = random.Random(seed)
+    trainer = SurrogateTrainer(seed=seed)
+    clubs = []
+    for club_id in range(1, clubs_num + 1):
+        tactic = {name: rng.randint(10, 90) for name in TACTIC_NAMES}
+        club = ClubSnapshot(club_id=club_id, name=str(club_id), reputation=0, tactic=tactic)
+        formation = game_configs.formations[rng.choice(list(game_configs.formations))]
+        clubs.append((club, trainer.get_lineup(formation)))
+    return clubs
+
+
+def play_season(clubs: List[tuple], play: Callable, seed: int) -> Dict[str, float]:
+    """
+    进行一个双循环赛季
+    :param play: 由比赛快照得到两队比分的函数
+    :return: 赛季统计，见METRICS，另有各队积分points
+    """
+    rng = random.Random(seed)
+    points = np.zeros(len(clubs))
+    goals, results = [], []
+    for i, (club1, lineup1) in enumerate(clubs):
+        for j, (club2, lineup2) in enumerate(clubs):
+            if i == j:
+                continue
+            match = game_app.MatchSnapshot(clubs=(club1, club2), lineups=(lineup1, lineup2), seed=rng.getrandbits(32))
+            score1, score2 = play(match)
+            goals.append(score1 + score2)
+            results.append(np.sign(score1 - score2))
+            points[i] += 3 if score1 > score2 else 1 if score1 == score2 else 0
+            points[j] += 3 if score2 > score1 else 1 if score1 == score2 else 0
+    results = np.array(results)
+    return {
+        "goals": float(np.mean(goals)),
+        "home_win": float(np.mean(results > 0)),
+        "draw": float(np.mean(results == 0)),
+        "away_win": float(np.mean(results < 0)),
+        "points_std": float(points.std()),
+        "points_range": float(points.max() - points.min()),
+        "top_points": float(points.max()),
+        "bottom_points": float(points.min()),
+        "points": points,
+    }
+
+
+def run(seasons: int = 5, clubs_num: int = 20, model_path: str = game_configs.quick_sim_path):
+    """
+    :param seasons: 每种模拟方式进行的赛季数
+    :param clubs_num: 联赛的俱乐部数
+    :param model_path: 快速模拟模型文件
+    """
+    clubs = get_league(clubs_num)
+    quick_simulator = game_app.QuickSimulator.load(model_path)
+
+    def full(match: "game_app.MatchSnapshot"):
+        game_eve = match.build_game()
+        game_eve.simulate()
+        game_eve.finish()
+        return game_eve.lteam.score, game_eve.rteam.score
+
+    def quick(match: "game_app.MatchSnapshot"):
+        game_eve = match.build_game()
+        quick_simulator.simulate(game_eve)
+        game_eve.finish()
+        return game_eve.lteam.score, game_eve.rteam.score
+
+    matches_num = clubs_num * (clubs_num - 1)
+    stats = dict()
+    for name, play in (("full", full), ("quick", quick)):
+        s = time.perf_counter()
+        stats[name] = [play_season(clubs, play, seed) for seed in range(seasons)]
+        stats[name + "_ms"] = (time.perf_counter() - s) / (seasons * matches_num) * 1000
+
+    print("{}支球队，{}个赛季，每赛季{}场".format(clubs_num, seasons, matches_num))
+    print("{:<16}{:>16}{:>16}".format("metric", "full", "quick"))
+    for metric in METRICS:
+        row = []
+        for name in ("full", "quick"):
+            values = [season[metric] for season in stats[name]]
+            row.append("{:.3f}±{:.3f}".format(np.mean(values), np.std(values)))
+        print("{:<16}{:>16}{:>16}".format(metric, *row))
+    full_points = np.mean([season["points"] for season in stats["full"]], axis=0)
+    quick_points = np.mean([season["points"] for season in stats["quick"]], axis=0)
+    print("{:<16}{:>16.3f}".format("points_corr", np.corrcoef(full_points, quick_points)[0, 1]))
+    print("{:<16}{:>16.3f}{:>16.3f}".format("ms/match", stats["full_ms"], stats["quick_ms"]))
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+        sys.argv[3] if len(sys.argv) > 3 else game_configs.quick_sim_path,
+    )
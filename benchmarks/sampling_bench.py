@@ -0,0 +1,54 @@
+"""
+抽样工具的微基准：比较utils.select_by_pro、utils.is_happened_by_pro与utils.sampling中对应实现的单次耗时
+用法：python -m benchmarks.sampling_bench [每项调用次数]
+"""
+
+import random
+import sys
+import timeit
+from typing import Callable, List, Tuple
+
+import game_configs
+from utils import sampling, utils
+
+
+def get_cases(rng: random.Random) -> List[Tuple[str, Callable, Callable]]:
+    """
+    :return: (用例名, 原实现, 新实现)列表
+    """
+    shift_pro = game_configs.location_shift[game_configs.Location.CM]
+    shift_table = sampling.location_shift_tables[game_configs.Location.CM]
+    weight_pro = game_configs.location_capability[0]["weight"]
+    weight_table = sampling.location_weight_tables[game_configs.location_capability[0]["name"]]
+    tactic = {tactic.value: rng.randint(5, 1000) for tactic in game_configs.Tactic}
+    tactic_items = tuple(tactic.items())
+    tactic_table = sampling.CdfTable(tactic)
+
+    def sample_tactic():
+        # 与Team.get_tactic_tables相同，先确认战术比重未改变
+        if tuple(tactic.items()) == tactic_items:
+            return tactic_table.sample(rng)
+
+    return [
+        ("shift_location", lambda: utils.select_by_pro(shift_pro, rng), lambda: shift_table.sample(rng)),
+        ("location_capability", lambda: utils.select_by_pro(weight_pro, rng), lambda: weight_table.sample(rng)),
+        ("tactic", lambda: utils.select_by_pro(tactic.copy(), rng), sample_tactic),
+        ("duel", lambda: utils.select_by_pro({"a": 55.5, "b": 43.2}, rng), lambda: sampling.duel(55.5, 43.2, rng)),
+        ("happened", lambda: utils.is_happened_by_pro(0.5, rng), lambda: sampling.happened(0.5, rng)),
+    ]
+
+
+def run(number: int = 100000):
+    """
+    :param number: 每项的调用次数
+    """
+    rng = random.Random(0)
+    print("{:<22}{:>12}{:>12}{:>10}".format("case", "old(ns)", "new(ns)", "speedup"))
+    for name, old, new in get_cases(rng):
+        old_time = min(timeit.repeat(old, number=number, repeat=3)) / number * 1e9
+        new_time = min(timeit.repeat(new, number=number, repeat=3)) / number * 1e9
+        print("{:<22}{:>12.0f}{:>12.0f}{:>9.1f}x".format(name, old_time, new_time, old_time / new_time))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,64 @@
+"""
+战术调整缓存跨回合命中的检查：在内存中的SQLite存档上，以两个NextTurner实例（相当于两次下一回合请求或两个任务）
+先后进行同一对阵的比赛，阵容未变时第二回合应命中第一回合写入的缓存，并比较两回合的耗时；
+两回合之间转会或修改阵容时应清除缓存，第二回合重新进行模拟赛
+用法：python -m benchmarks.tactic_cache_bench [回合数]
+"""
+
+import random
+import sys
+import time
+
+import game_configs
+from benchmarks.engine_bench import DATE, create_world
+from modules import game_app, next_turn_app
+from sqlalchemy.orm import Session
+
+CALENDAR_GAME = {"club_id": "1,2", "game_name": "bench", "game_type": "league"}
+
+
+def play_turn(db: Session) -> tuple:
+    """
+    以新的NextTurner实例进行一场比赛，比赛后回滚，并固定挑选首发的随机数，使每回合的阵容指纹相同
+    :return: (耗时, 命中次数, 未命中次数)
+    """
+    random.seed(0)
+    next_turner = next_turn_app.NextTurner(db=db, save_id=1, fidelity=game_configs.Fidelity.headless)
+    next_turner.date = DATE
+    tactic_cache = next_turner.tactic_cache
+    hits, misses = tactic_cache.hits, tactic_cache.misses
+    s = time.perf_counter()
+    next_turner.play_game(CALENDAR_GAME)
+    elapsed = time.perf_counter() - s
+    db.rollback()
+    return elapsed, tactic_cache.hits - hits, tactic_cache.misses - misses
+
+
+def run(turns: int = 3) -> bool:
+    """
+    :param turns: 阵容不变时连续进行的回合数
+    :return: 第一回合之后是否都命中缓存，清除后是否未命中
+    """
+    db = create_world(random.Random(0))
+    game_app.TacticCache.get_by_save(1).clear()
+    passed = True
+    print("{:<14}{:>10}{:>8}{:>8}".format("turn", "ms", "hits", "misses"))
+    for turn in range(turns):
+        elapsed, hits, misses = play_turn(db)
+        print("{:<14}{:>10.1f}{:>8}{:>8}".format(turn + 1, elapsed * 1000, hits, misses))
+        if turn > 0 and hits != 1:
+            passed = False
+    # 相当于转会或修改阵容的接口
+    game_app.TacticCache.get_by_save(1).invalidate_clubs((1,))
+    elapsed, hits, misses = play_turn(db)
+    print("{:<14}{:>10.1f}{:>8}{:>8}".format("invalidated", elapsed * 1000, hits, misses))
+    if misses != 1:
+        passed = False
+    db.close()
+    if not passed:
+        print("战术调整缓存未按预期命中")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 3) else 1)
@@ -0,0 +1,110 @@
+"""
+战术调整模拟的基准：比较固定场数的GameEvE.tactical_start与自适应的TacticOptimizer
+以大量模拟比赛得到的成功率为参考值，统计各方案在不同种子下战术成功率估计的均方根误差、平均模拟场数与耗时；
+fixed 10 raw为收缩估计之前的做法，成功率直接取成功次数/尝试次数
+用法：python -m benchmarks.tactic_optimizer_bench [重复次数]
+"""
+
+import math
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+import game_configs
+from modules import game_app
+from modules.game_app.match_engine import ClubSnapshot, PlayerSnapshot
+
+FORMATIONS = {
+    "4-3-3": ("GK", "LB", "CB", "CB", "RB", "CM", "CM", "CM", "LW", "ST", "RW"),
+    "4-4-2": ("GK", "LB", "CB", "CB", "RB", "CDM", "CM", "CM", "CAM", "ST", "ST"),
+}
+REFERENCE_MATCHES = 300
+
+
+def get_match(rng: random.Random, formations: Tuple[str, str]) -> "game_app.MatchSnapshot":
+    """
+    生成两队随机能力的比赛快照
+    :param formations: 两队阵型
+    """
+    clubs = []
+    lineups = []
+    for club_id, formation in enumerate(formations, start=1):
+        tactic = {tactic.value: 50 for tactic in game_configs.Tactic}
+        clubs.append(ClubSnapshot(club_id=club_id, name=formation, reputation=0, tactic=tactic))
+        lineup = []
+        for location in FORMATIONS[formation]:
+            capa = {name: rng.uniform(40, 90) for name in game_configs.engine_capa}
+            snapshot = PlayerSnapshot(player_id=len(lineup), translated_name="p", real_stamina=100, capa=capa)
+            lineup.append((snapshot, location, snapshot))
+        lineups.append(lineup)
+    return game_app.MatchSnapshot(clubs=(clubs[0], clubs[1]), lineups=(lineups[0], lineups[1]))
+
+
+def get_rates(teams_data: Tuple[Dict[str, int], Dict[str, int]], raw: bool = False) -> List[float]:
+    """
+    两队各战术的成功率估计
+    :param raw: 是否不做收缩，直接取成功次数/尝试次数
+    """
+    rates = []
+    for team_data in teams_data:
+        if raw:
+            team_rates = {
+                tactic.value: team_data["{}_success".format(tactic.value)] / (team_data[tactic.value] + 0.01)
+                for tactic in game_configs.Tactic
+            }
+        else:
+            team_rates = game_app.TacticAdjustor.get_success_rates(team_data)
+        rates.extend(team_rates[tactic.value] for tactic in game_configs.Tactic)
+    return rates
+
+
+def run(repeat: int = 30):
+    """
+    :param repeat: 每个方案重复的次数
+    """
+    rng = random.Random(0)
+    for formations in (("4-3-3", "4-3-3"), ("4-3-3", "4-4-2")):
+        match = get_match(rng, formations)
+        match.seed = 0
+        reference = get_rates(match.play_tactical(num=REFERENCE_MATCHES), raw=True)
+        # 参考值中从未尝试过的战术不计入误差
+        indexes = [i for i, rate in enumerate(reference) if rate > 0]
+
+        def fixed(num: int) -> Callable:
+            return lambda: (match.play_tactical(num=num), num)
+
+        def adaptive():
+            optimizer = game_app.TacticOptimizer(match.build_game())
+            return optimizer.run(), optimizer.matches
+
+        cases = [
+            ("fixed 10 raw", fixed(10), True),
+            ("fixed 5", fixed(5), False),
+            ("fixed 10", fixed(10), False),
+            ("fixed 20", fixed(20), False),
+            ("adaptive", adaptive, False),
+        ]
+        print("{} vs {}".format(*formations))
+        print("{:<14}{:>10}{:>10}{:>12}".format("case", "matches", "rmse", "ms"))
+        for name, case, raw in cases:
+            errors = []
+            matches = []
+            elapsed = 0.0
+            for seed in range(1, repeat + 1):
+                match.seed = seed
+                s = time.perf_counter()
+                teams_data, num = case()
+                elapsed += time.perf_counter() - s
+                rates = get_rates(teams_data, raw=raw)
+                errors.extend((rates[i] - reference[i]) ** 2 for i in indexes)
+                matches.append(num)
+            print(
+                "{:<14}{:>10.1f}{:>10.4f}{:>12.1f}".format(
+                    name, sum(matches) / repeat, math.sqrt(sum(errors) / len(errors)), elapsed / repeat * 1000
+                )
+            )
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -1,10 +1,14 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
 import models
 from core import dburl
 from core.config import settings
 from models.base import Base
-from sqlalchemy import Index, create_engine
+from sqlalchemy import Index, create_engine, text
 from sqlalchemy.exc import OperationalError
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
 from sqlalchemy_utils import create_database, database_exists
 from utils import logger
 
@@ -21,6 +25,13 @@ try:
     player_id_index.create(bind=engine)
 except OperationalError:
     logger.warning("player_id_idx already exists")
+# 为老存档的game表添加新列 只需运行一次即可
+for column_name, column_type in (("event_log", "BLOB"), ("seed", "BIGINT"), ("replay", "BLOB")):
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE game ADD COLUMN {} {}".format(column_name, column_type)))
+    except OperationalError:
+        logger.warning("game.{} already exists".format(column_name))
 # try:
 #     values = Column('values', Float)
 #     models.Player.__table__.append_column(values)
@@ -48,6 +59,79 @@ def get_db():
         db.close()
 
 
+class CheckpointSession:
+    """
+    在检查点才提交的会话，用于度假等连续多日的模拟
+    会话绑定到已开启外层事务的连接上，期间各处的db.commit()只把改动flush到外层事务中，
+    调用checkpoint()时才真正提交；出错时回滚到上一个检查点
+    """
+
+    def __init__(self):
+        self.connection = engine.connect()
+        self.transaction = self.connection.begin()
+        self.db: Session = SessionLocal(bind=self.connection)
+
+    def checkpoint(self):
+        """
+        提交上一个检查点以来的所有改动，并开启新的外层事务
+        """
+        self.db.commit()
+        self.transaction.commit()
+        self.transaction = self.connection.begin()
+
+    def __enter__(self) -> "CheckpointSession":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self.checkpoint()
+            else:
+                self.db.rollback()
+        finally:
+            self.db.close()
+            if self.transaction.is_active:
+                self.transaction.rollback()
+            self.connection.close()
+
+
+save_thread_locks: Dict[int, threading.Lock] = dict()
+save_thread_locks_lock = threading.Lock()
+
+
+@contextmanager
+def save_lock(save_id: int, blocking: bool = True) -> Iterator[bool]:
+    """
+    存档的独占锁，同一存档同时只有一处在行进回合
+    进程内用线程锁；MySQL上另在单独的连接上以GET_LOCK加锁，对多个服务进程同样有效，
+    该锁不随事务提交释放，连接断开时自动释放
+    :param save_id: 存档id
+    :param blocking: 为False时不等待
+    :return: 是否取得锁
+    """
+    with save_thread_locks_lock:
+        thread_lock = save_thread_locks.setdefault(save_id, threading.Lock())
+    if not thread_lock.acquire(blocking=blocking):
+        yield False
+        return
+    try:
+        if engine.dialect.name != "mysql":
+            yield True
+            return
+        with engine.connect() as connection:
+            name = "save_{}".format(save_id)
+            acquired = connection.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"), {"name": name, "timeout": -1 if blocking else 0}
+            ).scalar()
+            try:
+                yield acquired == 1
+            finally:
+                if acquired == 1:
+                    connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+    finally:
+        thread_lock.release()
+
+
 def get_session():
     db = ScopedSession()
     return db
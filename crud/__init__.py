@@ -4,6 +4,7 @@ from crud.coach import *
 from crud.game import *
 from crud.game_pve import *
 from crud.league import *
+from crud.next_turn_job import *
 from crud.offer import *
 from crud.player import *
 from crud.save import *
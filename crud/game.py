@@ -1,8 +1,8 @@
-from typing import List
+from typing import List, Optional
 
 import models
 import schemas
-from core.db import engine
+from sqlalchemy import Integer, and_, cast, or_
 from sqlalchemy.orm import Session
 from utils import logger
 
@@ -52,19 +52,58 @@ def create_game_player_data(db: Session, game_player_data: schemas.GamePlayerDat
     return db_game_player_data
 
 
-def create_game_player_data_bulk(game_player_data: List[schemas.GamePlayerDataCreate], game_team_info_id: int):
+def get_inserted_ids(db: Session, lastrowid: int, num: int) -> List[int]:
     """
-    批量创建比赛球员信息表，需要提供game_team_info_id以免去更新步骤
+    一条多行INSERT写入的连续自增id
+    MySQL的lastrowid为第一行的id，SQLite为最后一行的id
+    :param lastrowid: 执行结果的lastrowid
+    :param num: 写入的行数
     """
+    first_id = lastrowid - num + 1 if db.get_bind().dialect.name == "sqlite" else lastrowid
+    return list(range(first_id, first_id + num))
 
-    def add_game_team_info_id(p):
-        p = p.dict()
-        p["game_team_info_id"] = game_team_info_id
-        return p
 
-    game_player_data = list(map(add_game_team_info_id, game_player_data))
+def create_games_bulk(db: Session, games: List[dict]) -> List[int]:
+    """
+    批量创建比赛表，不经过ORM
+    以一条多行INSERT写入：行数已知的INSERT由InnoDB一次分配连续的自增id（auto_increment_increment为1），
+    由lastrowid推算所有id，不再回查
+    :param games: 比赛表的字段字典列表
+    :return: 按传入顺序排列的比赛id
+    """
+    if not games:
+        return []
+    return get_inserted_ids(db, db.execute(models.Game.__table__.insert().values(games)).lastrowid, len(games))
+
+
+def create_game_team_infos_bulk(db: Session, game_team_infos: List[dict]) -> List[int]:
+    """
+    批量创建比赛队伍信息表，不经过ORM
+    :param game_team_infos: 比赛队伍信息表的字段字典列表，需包含game_id
+    :return: 按传入顺序排列的比赛队伍信息id
+    """
+    if not game_team_infos:
+        return []
+    lastrowid = db.execute(models.GameTeamInfo.__table__.insert().values(game_team_infos)).lastrowid
+    return get_inserted_ids(db, lastrowid, len(game_team_infos))
+
 
-    engine.execute(models.GamePlayerData.__table__.insert(), game_player_data)
+def create_game_team_data_bulk(db: Session, game_team_data: List[dict]):
+    """
+    批量创建比赛队伍数据表，不经过ORM
+    :param game_team_data: 比赛队伍数据表的字段字典列表，需包含game_team_info_id
+    """
+    if game_team_data:
+        db.execute(models.GameTeamData.__table__.insert(), game_team_data)
+
+
+def create_game_player_data_bulk(db: Session, game_player_data: List[dict]):
+    """
+    批量创建比赛球员信息表，不经过ORM
+    :param game_player_data: 比赛球员信息表的字段字典列表，需包含game_team_info_id
+    """
+    if game_player_data:
+        db.execute(models.GamePlayerData.__table__.insert(), game_player_data)
 
 
 def get_game_player_data_by_attri(db: Session, attri: str, only_one: bool = False):
@@ -148,3 +187,181 @@ def delete_game_by_attri(db: Session, query_str: str):
             db.delete(db_game_team_info)
         db.delete(db_game)
         db.commit()
+
+
+def clear_replayable_game_scripts(db: Session, save_id: int, season: int) -> int:
+    """
+    清除指定赛季及之前可重放比赛的解说与事件记录，解说在读取时重放生成
+    :param save_id: 存档id
+    :param season: 赛季序号
+    :return: 清除的比赛数
+    """
+    count = (
+        db.query(models.Game)
+        .filter(
+            models.Game.save_id == save_id,
+            cast(models.Game.season, Integer) <= season,
+            models.Game.seed.isnot(None),
+            models.Game.replay.isnot(None),
+        )
+        .update({models.Game.script: "", models.Game.event_log: None}, synchronize_session=False)
+    )
+    db.commit()
+    return count
+
+
+def is_knockout(game_type: str) -> bool:
+    """
+    是否为淘汰赛：杯赛与欧冠小组赛之后的比赛
+    """
+    return "cup" in game_type or ("champion" in game_type and "group" not in game_type)
+
+
+def is_two_legged(game_type: str) -> bool:
+    """
+    是否为两回合的淘汰赛：欧冠决赛之前的淘汰赛
+    """
+    return "champion" in game_type and "group" not in game_type and game_type != "champions2to1"
+
+
+def get_knockout_ties(
+    db: Session, save_id: int, season: int, game_name: str, game_type: str
+) -> List[models.KnockoutTie]:
+    """
+    获取一个阶段的所有对阵，按首回合的先后排列
+    """
+    return (
+        db.query(models.KnockoutTie)
+        .filter(
+            models.KnockoutTie.save_id == save_id,
+            models.KnockoutTie.season == season,
+            models.KnockoutTie.name == game_name,
+            models.KnockoutTie.type == game_type,
+        )
+        .order_by(models.KnockoutTie.id)
+        .all()
+    )
+
+
+def get_knockout_tie(
+    db: Session, save_id: int, season: int, game_name: str, game_type: str, club1_id: int, club2_id: int
+) -> Optional[models.KnockoutTie]:
+    """
+    获取两队在指定阶段的对阵，两队顺序不限
+    """
+    return (
+        db.query(models.KnockoutTie)
+        .filter(
+            models.KnockoutTie.save_id == save_id,
+            models.KnockoutTie.season == season,
+            models.KnockoutTie.name == game_name,
+            models.KnockoutTie.type == game_type,
+            or_(
+                and_(models.KnockoutTie.club1_id == club1_id, models.KnockoutTie.club2_id == club2_id),
+                and_(models.KnockoutTie.club1_id == club2_id, models.KnockoutTie.club2_id == club1_id),
+            ),
+        )
+        .first()
+    )
+
+
+def update_knockout_ties(db: Session, results: List[dict]):
+    """
+    以结束的比赛更新淘汰赛对阵，非淘汰赛的比赛直接跳过：首回合创建对阵，两回合对阵的次回合补全比分并确定晋级者
+    晋级规则同按比赛表计算时：单回合主队进球不少于客队即晋级，两回合总比分多者晋级，相同时首回合的客队晋级
+    :param results: 同一存档、同一赛季的比赛结果，含name、type、club1_id、club2_id、score1、score2以及save_id、season
+    """
+    results = [result for result in results if is_knockout(result["type"])]
+    if not results:
+        return
+    save_id, season = results[0]["save_id"], results[0]["season"]
+    ties = (
+        db.query(models.KnockoutTie)
+        .filter(
+            models.KnockoutTie.save_id == save_id,
+            models.KnockoutTie.season == season,
+            models.KnockoutTie.name.in_({result["name"] for result in results}),
+            models.KnockoutTie.type.in_({result["type"] for result in results}),
+        )
+        .all()
+    )
+    tie_index = {(tie.name, tie.type, frozenset((tie.club1_id, tie.club2_id))): tie for tie in ties}
+    for result in results:
+        key = (result["name"], result["type"], frozenset((result["club1_id"], result["club2_id"])))
+        tie = tie_index.get(key)
+        if tie is None:
+            tie = models.KnockoutTie(
+                save_id=save_id,
+                season=season,
+                name=result["name"],
+                type=result["type"],
+                club1_id=result["club1_id"],
+                club2_id=result["club2_id"],
+                legs=1,
+                first_leg_score1=result["score1"],
+                first_leg_score2=result["score2"],
+                aggregate1=result["score1"],
+                aggregate2=result["score2"],
+            )
+            if not is_two_legged(result["type"]):
+                tie.winner_id = tie.club1_id if tie.aggregate1 >= tie.aggregate2 else tie.club2_id
+            db.add(tie)
+            tie_index[key] = tie
+            continue
+        # 次回合两队主客对调
+        if result["club1_id"] == tie.club1_id:
+            score1, score2 = result["score1"], result["score2"]
+        else:
+            score1, score2 = result["score2"], result["score1"]
+        tie.legs = 2
+        tie.second_leg_score1 = score1
+        tie.second_leg_score2 = score2
+        tie.aggregate1 = tie.first_leg_score1 + score1
+        tie.aggregate2 = tie.first_leg_score2 + score2
+        tie.winner_id = tie.club1_id if tie.aggregate1 > tie.aggregate2 else tie.club2_id
+
+
+def rebuild_knockout_ties(db: Session) -> int:
+    """
+    由全部淘汰赛比赛重建对阵表，用于对阵表启用前的存档；按比赛的先后重放，结果与逐场更新时相同
+    :return: 重建的对阵数
+    """
+    db.query(models.KnockoutTie).delete()
+    rows = (
+        db.query(
+            models.Game.save_id,
+            models.Game.season,
+            models.Game.name,
+            models.Game.type,
+            models.GameTeamInfo.club_id,
+            models.GameTeamInfo.score,
+        )
+        .join(models.GameTeamInfo, models.GameTeamInfo.game_id == models.Game.id)
+        .filter(
+            or_(
+                models.Game.type.like("%cup%"),
+                and_(models.Game.type.like("%champion%"), models.Game.type.notlike("%group%")),
+            )
+        )
+        .order_by(models.Game.id, models.GameTeamInfo.id)
+        .all()
+    )
+    # 按存档与赛季分组，每场比赛两行，依次为主队与客队
+    results = dict()
+    for (save_id, season, name, game_type, club1_id, score1), (*_, club2_id, score2) in zip(rows[::2], rows[1::2]):
+        result = {
+            "save_id": save_id,
+            "season": int(season),
+            "name": name,
+            "type": game_type,
+            "club1_id": club1_id,
+            "club2_id": club2_id,
+            "score1": score1,
+            "score2": score2,
+        }
+        results.setdefault((save_id, int(season)), []).append(result)
+    for season_results in results.values():
+        update_knockout_ties(db=db, results=season_results)
+        db.flush()
+    db.commit()
+    return db.query(models.KnockoutTie).count()
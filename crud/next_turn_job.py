@@ -0,0 +1,84 @@
+import datetime
+from typing import List, Optional
+
+import game_configs
+import models
+import schemas
+from sqlalchemy.orm import Session
+
+
+def create_next_turn_job(
+    db: Session, job: schemas.NextTurnJobCreate, state: Optional[str] = None
+) -> models.NextTurnJob:
+    """
+    新建等待中的任务；同一存档已有未结束的任务或幂等键重复时提交失败，抛出IntegrityError
+    """
+    db_job = models.NextTurnJob(
+        **job.dict(),
+        created_time=datetime.datetime.now(),
+        status=game_configs.JobStatus.pending,
+        finished_num=0,
+        state=state,
+        active_save_id=job.save_id,
+        cancel_requested=False,
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+
+def get_next_turn_job_by_id(db: Session, job_id: int) -> models.NextTurnJob:
+    db_job = db.query(models.NextTurnJob).filter(models.NextTurnJob.id == job_id).first()
+    return db_job
+
+
+def get_next_turn_job_by_key(db: Session, save_id: int, idempotency_key: str) -> Optional[models.NextTurnJob]:
+    db_job = (
+        db.query(models.NextTurnJob)
+        .filter(models.NextTurnJob.save_id == save_id, models.NextTurnJob.idempotency_key == idempotency_key)
+        .first()
+    )
+    return db_job
+
+
+def get_active_next_turn_job(db: Session, save_id: int) -> Optional[models.NextTurnJob]:
+    """
+    获取存档等待中或运行中的任务
+    """
+    db_job = db.query(models.NextTurnJob).filter(models.NextTurnJob.active_save_id == save_id).first()
+    return db_job
+
+
+def get_next_turn_jobs_by_status(db: Session, status: List[game_configs.JobStatus]) -> List[models.NextTurnJob]:
+    """
+    获取指定状态的任务，按创建顺序排列
+    """
+    db_jobs = (
+        db.query(models.NextTurnJob).filter(models.NextTurnJob.status.in_(status)).order_by(models.NextTurnJob.id).all()
+    )
+    return db_jobs
+
+
+def update_next_turn_job(db: Session, job_id: int, attri: dict) -> models.NextTurnJob:
+    db_job = db.query(models.NextTurnJob).filter(models.NextTurnJob.id == job_id).first()
+    for key, value in attri.items():
+        setattr(db_job, key, value)
+    db.commit()
+    return db_job
+
+
+def update_next_turn_job_status(
+    db: Session, job_id: int, status: game_configs.JobStatus, from_status: game_configs.JobStatus, attri: dict = None
+) -> bool:
+    """
+    只在任务处于from_status时更新状态，避免接口与工作线程同时修改
+    :return: 是否更新
+    """
+    updated = (
+        db.query(models.NextTurnJob)
+        .filter(models.NextTurnJob.id == job_id, models.NextTurnJob.status == from_status)
+        .update({"status": status, **(attri or dict())}, synchronize_session="fetch")
+    )
+    db.commit()
+    return updated > 0
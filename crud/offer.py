@@ -1,3 +1,4 @@
+import datetime
 from typing import List
 
 import models
@@ -146,6 +147,20 @@ def get_rejected_offers_by_player(db: Session, save_id: int, buyer_id: int, seas
     return db_offers
 
 
+def get_completed_offers_by_date(db: Session, save_id: int, date: datetime.date) -> List[models.Offer]:
+    """
+    获取指定日期完成的转会
+    :param save_id: 存档id
+    :param date: 交易成功日期
+    """
+    db_offers = (
+        db.query(models.Offer)
+        .filter(and_(models.Offer.save_id == save_id, models.Offer.status == "s", models.Offer.date == date))
+        .all()
+    )
+    return db_offers
+
+
 def delete_offer_by_id(db: Session, offer_id: int):
     db_offer = db.query(models.Offer).filter(models.Offer.id == offer_id).first()
     db.delete(db_offer)
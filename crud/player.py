@@ -1,13 +1,15 @@
 import string
 import time
-from typing import List
+from typing import List, Optional
 
 import crud
+import game_configs
 import models
 import schemas
 from core.db import engine
-from sqlalchemy import and_, asc, desc
+from sqlalchemy import and_, asc, bindparam, desc, inspect
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 
 # region 球员操作
@@ -36,6 +38,49 @@ def create_player_bulk(players: List[schemas.PlayerCreate], club_id: int):
     engine.execute(models.Player.__table__.insert(), players)
 
 
+def update_players_bulk(db: Session, player_models: List[models.Player], attri: Optional[List[dict]] = None):
+    """
+    将多名球员在会话中被修改的字段合并为一条executemany的UPDATE，代替逐个实例的UPDATE
+    写入后清除字段的修改记录，之后的flush不会重复写入
+    :param player_models: 会话中的球员实例列表
+    :param attri: 与player_models一一对应的待写入字段，不经setattr直接写入，写入后同步到实例上
+    """
+    changes = []
+    columns = set()
+    for i, player_model in enumerate(player_models):
+        state = inspect(player_model)
+        changed = {
+            prop.key: state.attrs[prop.key].value
+            for prop in state.mapper.column_attrs
+            if state.attrs[prop.key].history.added
+        }
+        if attri:
+            changed.update(attri[i])
+        if changed:
+            changes.append((player_model, changed))
+            columns.update(changed)
+    if not changes:
+        return
+    columns = sorted(columns)
+    table = models.Player.__table__
+    statement = (
+        table.update()
+        .where(table.c.id == bindparam("b_id"))
+        .values({column: bindparam("b_" + column) for column in columns})
+    )
+    rows = []
+    for player_model, changed in changes:
+        row = {
+            "b_" + column: changed[column] if column in changed else getattr(player_model, column) for column in columns
+        }
+        row["b_id"] = player_model.id
+        rows.append(row)
+    db.execute(statement, rows)
+    for player_model, changed in changes:
+        for key, value in changed.items():
+            set_committed_value(player_model, key, value)
+
+
 def update_player(db: Session, player_id: int, attri: dict):
     db_player = db.query(models.Player).filter(models.Player.id == player_id).first()
     for key, value in attri.items():
@@ -210,3 +255,149 @@ def get_player_game_data(
 
 
 # endregion
+
+
+# 球员赛季统计中逐场累加的比赛数据
+SEASON_STATS_NAMES = (
+    "actions",
+    "shots",
+    "goals",
+    "assists",
+    "passes",
+    "pass_success",
+    "dribbles",
+    "dribble_success",
+    "tackles",
+    "tackle_success",
+    "aerials",
+    "aerial_success",
+    "saves",
+    "save_success",
+)
+SEASON_STATS_COLUMNS = ("appearance", "final_rating_sum", "real_rating_sum", *SEASON_STATS_NAMES, "recent_ratings")
+
+
+def get_player_season_stats(
+    db: Session, player_id: int, start_season: int, end_season: int
+) -> List[models.PlayerSeasonStats]:
+    """
+    获取球员指定赛季范围内的赛季统计，没有出场的赛季没有记录
+    """
+    return get_players_season_stats(db=db, player_ids=[player_id], start_season=start_season, end_season=end_season)
+
+
+def get_players_season_stats(
+    db: Session, player_ids: List[int], start_season: int, end_season: int
+) -> List[models.PlayerSeasonStats]:
+    """
+    一次获取多名球员指定赛季范围内的赛季统计
+    """
+    return (
+        db.query(models.PlayerSeasonStats)
+        .filter(
+            models.PlayerSeasonStats.player_id.in_(player_ids),
+            models.PlayerSeasonStats.season >= start_season,
+            models.PlayerSeasonStats.season <= end_season,
+        )
+        .all()
+    )
+
+
+def add_to_season_stats(stats: dict, game_player_data: dict):
+    """
+    将一场比赛的球员数据累加到赛季统计的字段字典上，最近评分只保留game_configs.player_recent_ratings_num场
+    """
+    stats["appearance"] += 1
+    stats["final_rating_sum"] += game_player_data["final_rating"]
+    stats["real_rating_sum"] += game_player_data["real_rating"]
+    for name in SEASON_STATS_NAMES:
+        stats[name] += game_player_data[name]
+    ratings = stats["recent_ratings"].split(",") if stats["recent_ratings"] else []
+    ratings.append(str(game_player_data["final_rating"]))
+    stats["recent_ratings"] = ",".join(ratings[-game_configs.player_recent_ratings_num :])
+
+
+def get_new_season_stats(player_id: int, season: int) -> dict:
+    return {
+        "player_id": player_id,
+        "season": season,
+        "appearance": 0,
+        "final_rating_sum": 0.0,
+        "real_rating_sum": 0.0,
+        **{name: 0 for name in SEASON_STATS_NAMES},
+        "recent_ratings": "",
+    }
+
+
+def update_player_season_stats(db: Session, game_player_data: List[dict]):
+    """
+    以新写入的比赛球员数据更新球员的赛季统计：已有的统计一次查出，新统计与修改分别合并为一条executemany的INSERT与UPDATE，
+    修改同步到会话中的统计实例上，同update_players_bulk
+    :param game_player_data: 比赛球员数据的字段字典列表，需包含player_id与season，按比赛先后排列
+    """
+    if not game_player_data:
+        return
+    stats_index = {
+        (stats.player_id, stats.season): stats
+        for stats in db.query(models.PlayerSeasonStats)
+        .filter(
+            models.PlayerSeasonStats.player_id.in_({data["player_id"] for data in game_player_data}),
+            models.PlayerSeasonStats.season.in_({int(data["season"]) for data in game_player_data}),
+        )
+        .all()
+    }
+    changed = dict()
+    for data in game_player_data:
+        key = (data["player_id"], int(data["season"]))
+        if key not in changed:
+            stats = stats_index.get(key)
+            if stats is None:
+                changed[key] = get_new_season_stats(*key)
+            else:
+                changed[key] = {column: getattr(stats, column) for column in SEASON_STATS_COLUMNS}
+        add_to_season_stats(changed[key], data)
+
+    table = models.PlayerSeasonStats.__table__
+    created = [stats for key, stats in changed.items() if key not in stats_index]
+    if created:
+        db.execute(table.insert(), created)
+    updated = [(stats_index[key], stats) for key, stats in changed.items() if key in stats_index]
+    if updated:
+        statement = (
+            table.update()
+            .where(table.c.id == bindparam("b_id"))
+            .values({column: bindparam("b_" + column) for column in SEASON_STATS_COLUMNS})
+        )
+        rows = [
+            {"b_id": stats_model.id, **{"b_" + column: stats[column] for column in SEASON_STATS_COLUMNS}}
+            for stats_model, stats in updated
+        ]
+        db.execute(statement, rows)
+        for stats_model, stats in updated:
+            for column in SEASON_STATS_COLUMNS:
+                set_committed_value(stats_model, column, stats[column])
+
+
+def rebuild_player_season_stats(db: Session) -> int:
+    """
+    由全部比赛球员数据重建球员的赛季统计，用于统计表启用前的存档
+    :return: 重建的统计条数
+    """
+    db.query(models.PlayerSeasonStats).delete()
+    columns = [
+        getattr(models.GamePlayerData, name)
+        for name in ("player_id", "season", "final_rating", "real_rating", *SEASON_STATS_NAMES)
+    ]
+    stats_index = dict()
+    for row in db.query(*columns).order_by(models.GamePlayerData.id).yield_per(10000):
+        data = row._asdict()
+        if data["player_id"] is None or data["season"] is None:
+            continue
+        key = (data["player_id"], int(data["season"]))
+        if key not in stats_index:
+            stats_index[key] = get_new_season_stats(*key)
+        add_to_season_stats(stats_index[key], data)
+    if stats_index:
+        db.execute(models.PlayerSeasonStats.__table__.insert(), list(stats_index.values()))
+    db.commit()
+    return len(stats_index)
@@ -25,5 +25,189 @@ class Tactic(str, enum.Enum):
     counter_attack = "counter_attack"
 
 
+class Fidelity(str, enum.Enum):
+    full = "full"  # 完整解说
+    headless = "headless"  # 不生成解说，只用于电脑间的比赛
+    quick = "quick"  # 不逐回合模拟，按统计模型抽样比分与数据，只用于电脑间的比赛
+
+
+class JobType(str, enum.Enum):
+    turn = "turn"  # 下一回合，玩家俱乐部的比赛生成game_pve
+    holiday = "holiday"  # 度假，玩家俱乐部的比赛也自动进行
+
+
+class JobStatus(str, enum.Enum):
+    pending = "pending"  # 等待执行
+    running = "running"  # 执行中
+    done = "done"  # 已完成
+    failed = "failed"  # 出错，存档停在上一个检查点，可继续
+    cancelled = "cancelled"  # 已取消，存档停在取消时，可继续
+
+
+class Event(enum.IntEnum):
+    """
+    比赛事件代码，比赛中只记录事件，解说在读取时根据event_templates生成
+    """
+
+    start = 1
+    end = 2
+    extra_time_end = 3
+    winner = 4
+    draw = 5
+    extra_time_start = 6
+    penalty_round = 7
+    penalty_scored = 8
+    penalty_missed = 9
+    penalty_tally = 10
+    penalty_end = 11
+    penalty_kick = 12
+    shot = 13
+    goal = 14
+    brace = 15
+    hat_trick = 16
+    haul = 17
+    save = 18
+    dribble_past = 19
+    tackle = 20
+    win_ball = 21
+    aerial = 22
+    win_possession = 23
+    wing_cross = 24
+    cross = 25
+    clearance = 26
+    attacker_keeps_ball = 27
+    gain_possession = 28
+    under_cutting = 29
+    take_on = 30
+    cut_inside = 31
+    pull_back = 32
+    pull_back_pass = 33
+    middle_attack = 34
+    lose_possession = 35
+    counter_attack = 36
+    long_ball = 37
+    no_striker = 38
+    long_ball_intercepted = 39
+    hold_ball = 40
+
+
+# 事件的解说模板与解说状态参数
+# actor、target为事件的发起者与对象（球员或球队），value1、value2为比分等数值，lname、rname为两队队名
+event_templates = {
+    Event.start: ("比赛开始！", "s"),
+    Event.end: ("比赛结束！ {lname} {value1}:{value2} {rname}", "e"),
+    Event.extra_time_end: ("比赛结束！ {lname} {value1}:{value2} {rname}", "ae"),
+    Event.winner: ("胜者为{actor}！", "e"),
+    Event.draw: ("平局", "e"),
+    Event.extra_time_start: ("\n开始加时比赛！", "as"),
+    Event.penalty_round: ("\n第{value1}轮点球！", "n"),
+    Event.penalty_scored: ("稳稳将球罚进！", "n"),
+    Event.penalty_missed: ("被门将拒之门外！", "n"),
+    Event.penalty_tally: ("{value1} : {value2}", "n"),
+    Event.penalty_end: ("点球结束！ {lname} {value1}:{value2} {rname}", "n"),
+    Event.penalty_kick: ("{actor}罚出点球！", "n"),
+    Event.shot: ("{actor}起脚打门！", "c"),
+    Event.goal: ("球进啦！{lname} {value1}:{value2} {rname}", "n"),
+    Event.brace: ("{actor}梅开二度！", "n"),
+    Event.hat_trick: ("{actor}帽子戏法！", "n"),
+    Event.haul: ("{actor}大四喜！", "n"),
+    Event.save: ("{actor}发挥神勇，扑出这脚劲射", "c"),
+    Event.dribble_past: ("{actor}过掉了{target}", "c"),
+    Event.tackle: ("{actor}阻截了{target}的进攻", "c"),
+    Event.win_ball: ("{actor}抢到皮球", "c"),
+    Event.aerial: ("球员们尝试争顶", "c"),
+    Event.win_possession: ("{actor}抢到球权", "c"),
+    Event.wing_cross: ("\n{actor}尝试下底传中", "d"),
+    Event.cross: ("{actor}一脚起球传中", "c"),
+    Event.clearance: ("{actor}将球解围", "c"),
+    Event.attacker_keeps_ball: ("进攻方仍然持球", "c"),
+    Event.gain_possession: ("{actor}拿到球权", "c"),
+    Event.under_cutting: ("\n{actor}尝试边路内切", "d"),
+    Event.take_on: ("{actor}拿球，尝试过人", "c"),
+    Event.cut_inside: ("{actor}尝试内切", "c"),
+    Event.pull_back: ("\n{actor}尝试倒三角传球", "d"),
+    Event.pull_back_pass: ("{actor}倒三角传中", "c"),
+    Event.middle_attack: ("\n{actor}尝试中路渗透", "d"),
+    Event.lose_possession: ("{actor}丢失了球权", "c"),
+    Event.counter_attack: ("\n{actor}尝试防守反击", "d"),
+    Event.long_ball: ("{actor}一脚长传，直击腹地", "c"),
+    Event.no_striker: ("很可惜，无锋阵容没有中锋进行接应，球权被{actor}夺去", "c"),
+    Event.long_ball_intercepted: ("{actor}策动的长传被拦截", "c"),
+    Event.hold_ball: ("{actor}持球", "c"),
+}
+
+
+# 球员每次战术组织时的位置偏移比重 未列出的位置不发生偏移
+location_shift = {
+    Location.CM: {Location.ST: 10, Location.CB: 10, Location.CM: 80},  # 中场有概率前压或后撤
+    Location.LB: {Location.LW: 20, Location.LB: 80},
+    Location.RB: {Location.RW: 20, Location.RB: 80},
+    Location.CAM: {Location.ST: 40, Location.CM: 60},
+    Location.LM: {Location.LW: 25, Location.CM: 60, Location.LB: 15},
+    Location.RM: {Location.RW: 40, Location.CM: 60, Location.RB: 15},
+    Location.CDM: {Location.CB: 40, Location.CM: 60},
+}
+
+# 比赛引擎用到的能力项
+engine_capa = (
+    "shooting",
+    "passing",
+    "dribbling",
+    "interception",
+    "pace",
+    "strength",
+    "anticipation",
+    "stamina",
+    "goalkeeping",
+)
+script_kept_seasons = 2  # 保留解说的赛季数，更早赛季中可重放的比赛只保留种子与开球快照，解说在读取时重放生成
+next_turn_job_workers = 2  # 执行下一回合任务的工作线程数，见next_turn_app.JobRunner
+holiday_checkpoint_days = 30  # 度假批量模式中每隔多少天真正提交一次，见core.db.CheckpointSession
+tactic_cache_size = 1024  # 战术调整缓存的最大对阵数
+tactic_cache_saves = 64  # 进程内最多保留战术调整缓存的存档数
+tactic_cache_ttl = 14  # 战术调整缓存的有效天数
+tactic_cache_stamina_step = 10  # 战术调整缓存按体力分档的档宽
+tactic_optimizer_budget = 10  # 战术调整每场比赛最多的模拟场数
+tactic_optimizer_min_matches = 3  # 战术调整检查提前停止前至少模拟的场数
+tactic_optimizer_z = 1.96  # 战术调整置信区间的z值
+tactic_optimizer_tolerance = 0.1  # 战术成功率置信区间半宽均不大于该值时停止模拟
+tactic_prior_strength = 20  # 战术成功率向球队整体成功率收缩的先验强度，以尝试次数计
+tactic_surrogate_enabled = False  # 战术调整是否使用代理模型代替模拟赛
+# 战术调整代理模型的路径，训练见modules/ml_app/surrogate_trainer.py
+tactic_surrogate_path = "./assets/tactic_surrogate.npz"
+# 快速模拟模型的路径，校准见modules/ml_app/quick_sim_trainer.py
+quick_sim_path = "./assets/quick_sim.npz"
+# 各赛事电脑间比赛的精度，键为赛事名或比赛类型（如{"英冠": Fidelity.quick, "league": Fidelity.headless}），
+# 赛事名优先；未列出的赛事使用下一回合请求的精度，涉及玩家俱乐部的比赛始终完整解说
+competition_fidelity = {}
+fidelity_stats_saves = 64  # 进程内最多保留解说精度统计的存档数
+relegation_num = 4  # 顶级联赛的降级名额，同时也是次级联赛的升级名额
+forecast_simulations = 10000  # 联赛排名预测的模拟次数
+forecast_max_simulations = 100000  # 联赛排名预测接口允许的最大模拟次数
+forecast_cache_size = 64  # 联赛排名预测缓存的最大结果数
+# 赛后球员评分，见game_app.PlayerRater
+rating_min_average_actions = 7  # 全场平均动作数超过该值才按动作数评分，以免比赛初期评分波动较大
+rating_min_attempts = 5  # 某项动作次数不小于该值才按其成功率评分
+# 与全场均值的偏移比例的分档：偏移不小于bonus某档阈值时取该档的加分，不大于penalty某档阈值的相反数时取该档的扣分，
+# 均取达到的最高一档
+rating_actions_steps = {
+    "bonus": ((0.1, 0.3), (0.2, 0.5), (0.4, 0.8), (0.6, 1.2), (0.8, 1.6)),
+    "penalty": ((0.1, -0.3), (0.2, -0.5), (0.4, -0.8), (0.6, -1.2), (0.8, -1.6)),
+}
+rating_success_steps = {
+    "bonus": ((0.1, 0.3), (0.2, 0.6), (0.4, 0.9), (0.6, 1.2), (0.8, 1.5)),
+    # 成功率为0（偏移为-1）时不扣分
+    "penalty": ((0.1, -0.3), (0.2, -0.6), (0.4, -1.0), (0.6, -1.3), (0.8, -1.6), (1.0, 0)),
+}
+rating_data_bonus = {"goals": 1.3, "assists": 0.8, "save_success": 0.4}  # 每次进球、助攻与成功扑救的加分
+rating_range = (0, 10)  # 最终评分的范围
+# 赛后能力成长，见game_app.PlayerDeveloper
+player_growth_base = 0.025  # 评分低于最低一档时的成长值
+player_growth_steps = ((4, 0.05), (5, 0.075), (6, 0.1), (7, 0.125), (8, 0.15), (9, 0.175))  # (评分下限, 成长值)
+player_growth_capa_num = 2  # 每场比赛成长的能力项数
+# 按位置能力比重抽取成长能力的最多次数，抽中的能力成长后超过上限时不计入，防止能力均已满值时无法结束
+player_growth_draws = 21
+player_recent_ratings_num = 5  # 球员赛季统计中保留的最近比赛评分场数，见models.PlayerSeasonStats
+
 ori_mean_potential_capa = 80  # 初始潜力均值
 ori_mean_capa = 15  # 初始能力均值
@@ -1,6 +1,10 @@
+import crud
+import models
 from core.config import settings
+from core.db import SessionLocal
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from modules import next_turn_app
 from routers.apis import api_router
 from utils import logger
 
@@ -20,6 +24,35 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+
+@app.on_event("startup")
+def init_player_season_stats():
+    """
+    为老存档由已有的比赛球员数据生成球员赛季统计，只在统计表为空时运行
+    """
+    with SessionLocal() as db:
+        if db.query(models.PlayerSeasonStats.id).first() is None and db.query(models.GamePlayerData.id).first():
+            logger.info("重建球员赛季统计：{}条".format(crud.rebuild_player_season_stats(db=db)))
+
+
+@app.on_event("startup")
+def init_knockout_ties():
+    """
+    为老存档由已有的淘汰赛比赛生成对阵表，只在对阵表为空时运行
+    """
+    with SessionLocal() as db:
+        if db.query(models.KnockoutTie.id).first() is None and db.query(models.Game.id).first():
+            logger.info("重建淘汰赛对阵：{}组".format(crud.rebuild_knockout_ties(db=db)))
+
+
+@app.on_event("startup")
+def recover_next_turn_jobs():
+    """
+    继续上次退出时未完成的下一回合任务
+    """
+    next_turn_app.JobRunner.recover()
+
+
 if __name__ == "__main__":
     import uvicorn
 
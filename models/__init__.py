@@ -4,6 +4,7 @@ from models.coach import *
 from models.game import *
 from models.game_pve import *
 from models.league import *
+from models.next_turn_job import *
 from models.player import *
 from models.save import *
 from models.transfer import *
@@ -1,6 +1,18 @@
 from game_configs.game_config import Location
 from models.base import Base
-from sqlalchemy import TEXT, Column, DateTime, Enum, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    TEXT,
+    BigInteger,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+)
 from sqlalchemy.orm import relationship
 
 
@@ -15,6 +27,9 @@ class Game(Base):
     date = Column(String(1000))
     season = Column(String(1000))
     script = Column(TEXT)
+    event_log = Column(LargeBinary)  # 打包后的比赛事件记录，见utils.EventLog
+    seed = Column(BigInteger)  # 比赛随机数流的种子
+    replay = Column(LargeBinary)  # 打包后的开球快照，与种子一起用于重放比赛，见utils.KickoffSnapshot
     goal_record = Column(String(2000))
 
     teams = relationship("GameTeamInfo", backref="game")
@@ -100,4 +115,27 @@ class GamePlayerData(Base):
     player_id = Column("player_id", Integer, ForeignKey("player.id"), index=True)
 
 
+class KnockoutTie(Base):
+    # 淘汰赛的一组对阵，随比赛结束更新，用于加时判断与生成下一轮赛程
+    __tablename__ = "knockout_tie"
+    __table_args__ = (Index("knockout_tie_idx", "save_id", "season", "name", "type"),)
+    id = Column(Integer, primary_key=True, index=True)
+
+    save_id = Column(Integer)
+    season = Column(Integer)
+    name = Column(String(100))  # 赛事名
+    type = Column(String(100))  # 比赛类型，两回合的欧冠淘汰赛每组对阵各有一个类型
+    club1_id = Column(Integer)  # 首回合的主队
+    club2_id = Column(Integer)
+    legs = Column(Integer)  # 已进行的回合数
+    # 各回合两队的进球，均按club1、club2的顺序
+    first_leg_score1 = Column(Integer)
+    first_leg_score2 = Column(Integer)
+    second_leg_score1 = Column(Integer)
+    second_leg_score2 = Column(Integer)
+    aggregate1 = Column(Integer)
+    aggregate2 = Column(Integer)
+    winner_id = Column(Integer)  # 晋级的俱乐部，两回合的对阵在次回合结束后才确定
+
+
 # endregion
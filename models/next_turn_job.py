@@ -0,0 +1,36 @@
+import game_configs
+from models.base import Base
+from sqlalchemy import TEXT, BigInteger, Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, String
+
+
+#  下一回合任务表，进度与存档在同一事务中提交
+class NextTurnJob(Base):
+    __tablename__ = "next_turn_job"
+    __table_args__ = (
+        # 同一存档的幂等键只对应一个任务
+        Index("next_turn_job_key_idx", "save_id", "idempotency_key", unique=True),
+        # 同一存档同时只有一个未结束的任务
+        Index("next_turn_job_active_idx", "active_save_id", unique=True),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    created_time = Column(DateTime)
+    started_time = Column(DateTime)
+    finished_time = Column(DateTime)
+
+    save_id = Column(Integer, ForeignKey("save.id"), index=True)
+    job_type = Column(Enum(game_configs.JobType))
+    status = Column(Enum(game_configs.JobStatus), index=True)
+    turn_num = Column(Integer)  # 总天数
+    finished_num = Column(Integer, default=0)  # 已提交的天数
+    state = Column(String(50))  # 下一回合的结果，有玩家俱乐部的比赛时为pve
+    error = Column(TEXT)
+    idempotency_key = Column(String(100))  # 客户端给出的幂等键，重复请求返回同一任务
+    active_save_id = Column(Integer)  # 等待与运行中为save_id，结束后为空
+    cancel_requested = Column(Boolean, default=False)  # 运行中的任务被请求取消，工作线程每天结束后读取
+
+    # NextTurner的参数
+    engine = Column(String(20))
+    workers = Column(Integer)
+    seed = Column(BigInteger)
+    fidelity = Column(Enum(game_configs.Fidelity))
+    checkpoint_days = Column(Integer)
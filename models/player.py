@@ -1,5 +1,5 @@
 from models.base import Base
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 # region 球员数据
@@ -70,4 +70,39 @@ class Player(Base):
     values = Column(Float, default=10.0)
 
 
+class PlayerSeasonStats(Base):
+    # 球员每赛季比赛数据的累计，随比赛写入更新，代替逐场读取生涯数据
+    __tablename__ = "player_season_stats"
+    __table_args__ = (Index("player_season_stats_idx", "player_id", "season", unique=True),)
+    id = Column(Integer, primary_key=True, index=True)
+
+    player_id = Column(Integer, ForeignKey("player.id"))
+    season = Column(Integer)
+
+    appearance = Column(Integer, default=0)  # 出场数
+    final_rating_sum = Column(Float(precision=53), default=0)
+    real_rating_sum = Column(Float(precision=53), default=0)
+    actions = Column(Integer, default=0)
+    shots = Column(Integer, default=0)
+    goals = Column(Integer, default=0)
+    assists = Column(Integer, default=0)
+    # 传球
+    passes = Column(Integer, default=0)
+    pass_success = Column(Integer, default=0)
+    # 过人
+    dribbles = Column(Integer, default=0)
+    dribble_success = Column(Integer, default=0)
+    # 抢断
+    tackles = Column(Integer, default=0)
+    tackle_success = Column(Integer, default=0)
+    # 争顶
+    aerials = Column(Integer, default=0)
+    aerial_success = Column(Integer, default=0)
+    # 扑救
+    saves = Column(Integer, default=0)
+    save_success = Column(Integer, default=0)
+    # 最近几场的评分，由远到近、以逗号分隔，最多保留game_configs.player_recent_ratings_num场
+    recent_ratings = Column(String(200), default="")
+
+
 # endregion
@@ -1,5 +1,5 @@
 import json
-from typing import List, Union
+from typing import List, Optional, Union
 
 import crud
 import models
@@ -7,7 +7,7 @@ import pandas as pd
 import schemas
 from core.db import engine
 from sqlalchemy.orm import Session, joinedload
-from utils import logger, utils
+from utils import EventLog, logger, utils
 
 
 class ComputedGame:
@@ -242,34 +242,46 @@ class ComputedGame:
         :param game_name: 比赛名
         :return: 胜者club_id数组
         """
-        query_str = "and_(models.Game.save_id=='{}',models.Game.season=='{}', models.Game.type=='{}', models.Game.name=='{}')".format(
-            self.save_id, season, game_type, game_name
+        ties = crud.get_knockout_ties(
+            db=self.db, save_id=self.save_id, season=int(season), game_name=game_name, game_type=game_type
         )
-        games: List[models.Game] = crud.get_games_by_attri(db=self.db, query_str=query_str)
         clubs_id: List[int] = []  # 参赛俱乐部
-        for game in games:
-            team1 = game.teams[0]
-            team2 = game.teams[1]
-            if team1.score >= team2.score:  # TODO 删掉等于号
-                clubs_id.append(team1.club_id)
-            elif team1.score < team2.score:
-                clubs_id.append(team2.club_id)
+        for tie in ties:
+            if tie.winner_id is None:
+                logger.error("淘汰赛未决出胜者！")
             else:
-                logger.error("淘汰赛平局！")
+                clubs_id.append(tie.winner_id)
         return clubs_id
 
-    def get_show_data(self, game_id: int) -> schemas.GameShow:
+    def render_script(self, event_log: bytes) -> str:
+        """
+        根据比赛事件记录生成解说
+        :param event_log: 打包后的比赛事件记录
+        :return: 解说文本
+        """
+        club_ids, player_ids, _ = EventLog.unpack(event_log)
+        club_names = dict(self.db.query(models.Club.id, models.Club.name).filter(models.Club.id.in_(club_ids)).all())
+        player_names = dict(
+            self.db.query(models.Player.id, models.Player.translated_name)
+            .filter(models.Player.id.in_([player_id for player_id in player_ids if player_id]))
+            .all()
+        )
+        return EventLog.render(event_log, club_names=club_names, player_names=player_names)
+
+    def get_show_data(self, game_id: int, event_log: Optional[bytes] = None) -> schemas.GameShow:
         """
         获取一场比赛的数据
+        :param event_log: 重放得到的比赛事件记录，用于解说已被清除的比赛
         """
         game: models.Game = crud.get_game_by_id(db=self.db, game_id=game_id)
+        event_log = game.event_log if game.event_log else event_log
         g_data = dict()
         g_data["id"] = game.id
         g_data["season"] = game.season
         g_data["name"] = game.name
         g_data["type"] = game.type
         g_data["date"] = game.date
-        g_data["script"] = game.script
+        g_data["script"] = game.script if game.script or not event_log else self.render_script(event_log)
         g_data["mvp"] = game.mvp
         g_data["winner_id"] = game.winner_id
         g_data["goal_record"] = [schemas.GoalRecord(**g) for g in json.loads(game.goal_record)]
@@ -250,29 +250,35 @@ class ComputedPlayer:
 
     def get_ratings_in_recent_games(self, game_num: int = 5) -> List[float]:
         """
-        获取近n场比赛的评分列表 排序由远到近
-        :param game_num: 欲获取的比赛次数
+        获取本赛季近n场比赛的评分列表 排序由远到近
+        :param game_num: 欲获取的比赛次数，最多game_configs.player_recent_ratings_num场
         """
-        game_player_data: List[models.GamePlayerData] = self.get_game_player_data(
-            start_season=self.season, end_season=self.season
-        )
-        if not game_player_data:
+        season_stats = self.get_season_stats(start_season=self.season, end_season=self.season)
+        if not season_stats or not season_stats[0].recent_ratings:
             return []
-        game_player_data_sorted = sorted(game_player_data, key=lambda x: x.id, reverse=True)
-        ratings = [x.final_rating for x in game_player_data_sorted]
-        return ratings[:game_num][::-1] if len(ratings) >= game_num else ratings[::-1]
+        ratings = [float(rating) for rating in season_stats[0].recent_ratings.split(",")]
+        return ratings[-game_num:]
 
-    def get_avg_rating_in_recent_year(self) -> float:
+    def get_recent_year_seasons(self) -> Tuple[int, int]:
         """
-        获取近一年比赛的评分数据
+        近一年所含的赛季：上一赛季与本赛季
+        :return: 开始赛季，结束赛季
         """
         start_season = self.season - 1 if self.season - 1 != 0 else self.season
-        game_player_data: List[models.GamePlayerData] = self.get_game_player_data(
-            start_season=start_season, end_season=self.season
-        )
-        if not game_player_data:
+        return start_season, self.season
+
+    def get_avg_rating_in_recent_year(self, season_stats: Optional[List[models.PlayerSeasonStats]] = None) -> float:
+        """
+        获取近一年比赛的评分数据
+        :param season_stats: 近一年的赛季统计，为空时查询
+        """
+        if season_stats is None:
+            start_season, end_season = self.get_recent_year_seasons()
+            season_stats = self.get_season_stats(start_season=start_season, end_season=end_season)
+        appearance = sum([stats.appearance for stats in season_stats])
+        if not appearance:
             return 6.0
-        rating = float(utils.retain_decimal(sum([p.real_rating for p in game_player_data]) / len(game_player_data)))
+        rating = float(utils.retain_decimal(sum([stats.real_rating_sum for stats in season_stats]) / appearance))
         rating = rating if rating <= 10 else 10
         return rating
 
@@ -300,6 +306,7 @@ class ComputedPlayer:
     def get_game_player_data(self, start_season: int = None, end_season: int = None) -> List[models.GamePlayerData]:
         """
         获取指定球员某赛季的比赛信息
+        需读取全部生涯数据，统计数据应使用get_season_stats
         :param start_season: 开始赛季，若为空，默认1开始
         :param end_season: 结束赛季，若为空，默认当前赛季
         """
@@ -311,6 +318,18 @@ class ComputedPlayer:
 
         return game_player_data
 
+    def get_season_stats(self, start_season: int = None, end_season: int = None) -> List[models.PlayerSeasonStats]:
+        """
+        获取指定球员某赛季的赛季统计，见models.PlayerSeasonStats
+        :param start_season: 开始赛季，若为空，默认1开始
+        :param end_season: 结束赛季，若为空，默认当前赛季
+        """
+        s_season = start_season if start_season else 1
+        e_season = end_season if end_season else self.season
+        return crud.get_player_season_stats(
+            db=self.db, player_id=self.player_id, start_season=s_season, end_season=e_season
+        )
+
     def get_total_game_player_data(
         self, start_season: int = None, end_season: int = None
     ) -> schemas.TotalGamePlayerDataShow:
@@ -319,40 +338,28 @@ class ComputedPlayer:
         :param start_season: 开始赛季，若为空，默认1开始
         :param end_season: 结束赛季，若为空，默认当前赛季
         """
-        game_player_data: List[models.GamePlayerData] = self.get_game_player_data(
-            start_season=start_season, end_season=end_season
-        )
-        if not game_player_data:
+        season_stats = self.get_season_stats(start_season=start_season, end_season=end_season)
+        appearance = sum([stats.appearance for stats in season_stats])
+        if not appearance:
             return schemas.TotalGamePlayerDataShow()
         result = dict()
         result["id"] = self.player_id
-        result["appearance"] = len(game_player_data)
+        result["appearance"] = appearance
         result["final_rating"] = float(
-            utils.retain_decimal(sum([p.final_rating for p in game_player_data]) / len(game_player_data))
+            utils.retain_decimal(sum([stats.final_rating_sum for stats in season_stats]) / appearance)
         )
-        result["actions"] = sum([p.actions for p in game_player_data])
-        result["shots"] = sum([p.shots for p in game_player_data])
-        result["goals"] = sum([p.goals for p in game_player_data])
-        result["assists"] = sum([p.assists for p in game_player_data])
-        result["passes"] = sum([p.passes for p in game_player_data])
-        result["pass_success"] = sum([p.pass_success for p in game_player_data])
-        result["dribbles"] = sum([p.dribbles for p in game_player_data])
-        result["dribble_success"] = sum([p.dribble_success for p in game_player_data])
-        result["tackles"] = sum([p.tackles for p in game_player_data])
-        result["tackle_success"] = sum([p.tackle_success for p in game_player_data])
-        result["aerials"] = sum([p.aerials for p in game_player_data])
-        result["aerial_success"] = sum([p.aerial_success for p in game_player_data])
-        result["saves"] = sum([p.saves for p in game_player_data])
-        result["save_success"] = sum([p.save_success for p in game_player_data])
+        for name in crud.SEASON_STATS_NAMES:
+            result[name] = sum([getattr(stats, name) for stats in season_stats])
         return schemas.TotalGamePlayerDataShow(**result)
 
-    def get_values(self) -> int:
+    def get_values(self, season_stats: Optional[List[models.PlayerSeasonStats]] = None) -> int:
         """
         获取身价
+        :param season_stats: 近一年的赛季统计，为空时查询；多名球员一起估值时可预先一次查出
         """
         top_capa = self.get_top_lo_n_capa()[1]
         basic_values = top_capa**3 / 70.0
-        avg_rating = self.get_avg_rating_in_recent_year()
+        avg_rating = self.get_avg_rating_in_recent_year(season_stats)
         extra_values = avg_rating * 2000 - 12000
         real_values = int(basic_values + extra_values)
         if real_values < 10:
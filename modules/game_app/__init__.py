@@ -1,4 +1,16 @@
 from modules.game_app.game_eve_app import GameEvE
 from modules.game_app.game_pve_app import GamePvE
+from modules.game_app.player_rater import PlayerRater
+from modules.game_app.player_developer import PlayerDeveloper
 from modules.game_app.player_selector import PlayerSelector
 from modules.game_app.tactic_adjustor import TacticAdjustor
+from modules.game_app.tactic_optimizer import TacticOptimizer
+from modules.game_app.tactic_surrogate import TacticSurrogate
+from modules.game_app.game_batch import GameBatch
+from modules.game_app.match_engine import MatchResult, MatchSnapshot
+from modules.game_app.result_sink import ResultSink
+from modules.game_app.tactic_cache import TacticCache
+from modules.game_app.matchday_executor import MatchdayExecutor
+from modules.game_app.game_replayer import GameReplayer
+from modules.game_app.quick_simulator import QuickSimulator
+from modules.game_app.league_forecaster import LeagueForecaster
@@ -0,0 +1,654 @@
+from typing import Dict, List, Optional, Tuple
+
+import game_configs
+import numpy as np
+from modules.game_app import game_eve_app
+
+CAPA_NAMES = game_configs.engine_capa
+CAPA_INDEX = {name: i for i, name in enumerate(CAPA_NAMES)}
+# 球员场上数据项 actions为其余各项之和
+PLAYER_DATA_NAMES = (
+    "goals",
+    "assists",
+    "shots",
+    "dribbles",
+    "dribble_success",
+    "passes",
+    "pass_success",
+    "tackles",
+    "tackle_success",
+    "aerials",
+    "aerial_success",
+    "saves",
+    "save_success",
+)
+PLAYER_DATA_INDEX = {name: i for i, name in enumerate(PLAYER_DATA_NAMES)}
+TEAM_DATA_NAMES = (
+    "attempts",
+    "wing_cross",
+    "wing_cross_success",
+    "under_cutting",
+    "under_cutting_success",
+    "pull_back",
+    "pull_back_success",
+    "middle_attack",
+    "middle_attack_success",
+    "counter_attack",
+    "counter_attack_success",
+)
+TEAM_DATA_INDEX = {name: i for i, name in enumerate(TEAM_DATA_NAMES)}
+TACTIC_NAMES = tuple(tactic.value for tactic in game_configs.Tactic)
+TACTIC_DATA_INDEX = np.array([TEAM_DATA_INDEX[name] for name in TACTIC_NAMES])  # 战术次数的列号 成功次数为其后一列
+LOCATIONS = tuple(game_configs.Location)
+LOCATION_INDEX = {lo.value: i for i, lo in enumerate(LOCATIONS)}
+NO_LOCATION = len(LOCATIONS)  # 补位用的空位置
+MAX_PLAYERS = 11
+
+
+def _location_table(*locations: game_configs.Location) -> np.ndarray:
+    """
+    生成位置查找表，以位置编号索引即可得到是否属于指定位置
+    """
+    table = np.zeros(NO_LOCATION + 1, dtype=bool)
+    table[[LOCATION_INDEX[lo.value] for lo in locations]] = True
+    return table
+
+
+LW_LB = _location_table(game_configs.Location.LW, game_configs.Location.LB)
+RW_RB = _location_table(game_configs.Location.RW, game_configs.Location.RB)
+WINGS = _location_table(game_configs.Location.LW, game_configs.Location.RW)
+LW = LOCATION_INDEX[game_configs.Location.LW.value]
+LB = LOCATION_INDEX[game_configs.Location.LB.value]
+RB = LOCATION_INDEX[game_configs.Location.RB.value]
+STAMINA = CAPA_INDEX["stamina"]
+ST = _location_table(game_configs.Location.ST)
+CM = _location_table(game_configs.Location.CM)
+CB = _location_table(game_configs.Location.CB)
+GK = _location_table(game_configs.Location.GK)
+ST_CM = _location_table(game_configs.Location.ST, game_configs.Location.CM)
+GK_CB = _location_table(game_configs.Location.GK, game_configs.Location.CB)
+WING_CROSS_LOCATIONS = _location_table(
+    game_configs.Location.LW, game_configs.Location.RW, game_configs.Location.LB, game_configs.Location.RB
+)
+
+
+def _build_shift_table() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    将game_configs.location_shift转换为累积概率表
+    :return: 目标位置表、累积概率表
+    """
+    width = max(len(pro) for pro in game_configs.location_shift.values())
+    targets = np.full((NO_LOCATION + 1, width), NO_LOCATION, dtype=np.int64)
+    cum = np.full((NO_LOCATION + 1, width), np.inf)
+    for code in range(NO_LOCATION + 1):
+        shift_pro = game_configs.location_shift.get(LOCATIONS[code]) if code < NO_LOCATION else None
+        if not shift_pro:
+            targets[code, 0] = code
+            cum[code, 0] = 1
+            continue
+        total = sum(shift_pro.values())
+        running = 0
+        for i, (lo, value) in enumerate(shift_pro.items()):
+            running += value
+            targets[code, i] = LOCATION_INDEX[lo.value]
+            cum[code, i] = running / total
+    return targets, cum
+
+
+SHIFT_TARGETS, SHIFT_CUM = _build_shift_table()
+
+
+class GameBatch:
+    """
+    批量比赛引擎
+    将一个比赛日的所有EvE比赛放入numpy数组中同步推进，比赛规则与Team中的战术流程一致，但不生成解说
+    数组的第一维为队伍序号：第i场比赛的主队为2i，客队为2i+1，对手序号即为队伍序号^1
+    """
+
+    def __init__(self, games: List["game_eve_app.GameEvE"], seed: Optional[int] = None):
+        self.games = games
+        self.rng = np.random.default_rng(seed)
+        teams_num = len(games) * 2
+        capa = np.zeros((teams_num, MAX_PLAYERS, len(CAPA_NAMES)))
+        original_stamina = np.zeros((teams_num, MAX_PLAYERS))
+        ori_location = np.full((teams_num, MAX_PLAYERS), NO_LOCATION, dtype=np.int64)
+        tactic = np.zeros((teams_num, len(TACTIC_NAMES)))
+        for i, game in enumerate(games):
+            for side, team in enumerate((game.lteam, game.rteam)):
+                t = i * 2 + side
+                tactic[t] = [team.tactic[tactic_name] for tactic_name in TACTIC_NAMES]
+                for p, player in enumerate(team.players[:MAX_PLAYERS]):
+                    capa[t, p] = [player.capa[name] for name in CAPA_NAMES]
+                    original_stamina[t, p] = player.stamina
+                    ori_location[t, p] = LOCATION_INDEX[player.ori_location]
+        self.load(capa, original_stamina, ori_location, tactic)
+
+    def load(self, capa: np.ndarray, original_stamina: np.ndarray, ori_location: np.ndarray, tactic: np.ndarray):
+        """
+        载入比赛数组
+        :param capa: 球员能力 (队伍, 球员, 能力)
+        :param original_stamina: 初始体力 (队伍, 球员)
+        :param ori_location: 原本位置编号 (队伍, 球员) 空位为NO_LOCATION
+        :param tactic: 战术比重 (队伍, 战术)
+        """
+        self.capa = capa
+        self.capa_flat = capa.reshape(-1, len(CAPA_NAMES))
+        self.original_stamina = original_stamina
+        self.ori_location = ori_location
+        self.tactic = tactic
+        self.players_num = np.maximum((ori_location != NO_LOCATION).sum(axis=1), 1)
+        # 体力“能力”不受体力影响，每场比赛内为常数
+        self.average_stamina = capa[:, :, STAMINA].sum(axis=1) / self.players_num
+        # 会发生位置偏移的球员及其偏移表
+        ori_flat = ori_location.reshape(-1)
+        self.shift_players = np.flatnonzero(SHIFT_CUM[ori_flat, 0] < 1)
+        self.shift_cum = SHIFT_CUM[ori_flat[self.shift_players]]
+        self.shift_targets = SHIFT_TARGETS[ori_flat[self.shift_players]]
+        self.reset()
+
+    def reset(self):
+        """
+        重置比赛状态
+        """
+        teams_num = len(self.tactic)
+        self.stamina = self.original_stamina.copy()
+        self.stamina_flat = self.stamina.reshape(-1)
+        self.location = self.ori_location.copy()
+        self.location_flat = self.location.reshape(-1)
+        self.player_data = np.zeros((teams_num, MAX_PLAYERS, len(PLAYER_DATA_NAMES)), dtype=np.int64)
+        self.player_data_flat = self.player_data.reshape(-1, len(PLAYER_DATA_NAMES))
+        self.team_data = np.zeros((teams_num, len(TEAM_DATA_NAMES)), dtype=np.int64)
+        self.score = np.zeros(teams_num, dtype=np.int64)
+        self.goal_record: List[Tuple[int, int, int]] = []  # (队伍序号, 球员序号, 回合数)
+        self.turns = 0
+
+    def start(self):
+        """
+        批量模拟常规时间，并将结果写回各GameEvE实例
+        """
+        self.reset()
+        self.simulate(turns=50)
+        self.write_back()
+
+    def tactical_start(self, num: int = 10) -> List[Tuple[Dict[str, int], Dict[str, int]]]:
+        """
+        用于战术调整的批量模拟比赛 每场比赛复制num份同时模拟
+        :param num: 每场比赛的模拟次数
+        :return: 每场比赛两队的战术数据
+        """
+        teams_num = len(self.tactic)
+        batch = GameBatch([], seed=int(self.rng.integers(1 << 31)))
+        batch.load(
+            capa=np.tile(self.capa, (num, 1, 1)),
+            original_stamina=np.tile(self.original_stamina, (num, 1)),
+            ori_location=np.tile(self.ori_location, (num, 1)),
+            tactic=np.full((teams_num * num, len(TACTIC_NAMES)), 50.0),
+        )
+        batch.simulate(turns=50)
+        team_data = batch.team_data.reshape(num, teams_num, len(TEAM_DATA_NAMES)).sum(axis=0)
+        return [
+            (self.team_data2dict(team_data[t]), self.team_data2dict(team_data[t + 1])) for t in range(0, teams_num, 2)
+        ]
+
+    @staticmethod
+    def team_data2dict(data: np.ndarray) -> Dict[str, int]:
+        return {name: int(data[i]) for i, name in enumerate(TEAM_DATA_NAMES)}
+
+    def write_back(self):
+        """
+        将模拟结果写回GameEvE实例，之后可直接调用GameEvE.settle()
+        """
+        for i, game in enumerate(self.games):
+            game.add_event(game_configs.Event.start)
+            for side, team in enumerate((game.lteam, game.rteam)):
+                t = i * 2 + side
+                team.score = int(self.score[t])
+                for name, value in self.team_data2dict(self.team_data[t]).items():
+                    team.data[name] += value
+                for p, player in enumerate(team.players[:MAX_PLAYERS]):
+                    for data_i, name in enumerate(PLAYER_DATA_NAMES):
+                        player.data[name] += int(self.player_data[t, p, data_i])
+                    player.data["actions"] += int(self.player_data[t, p].sum())
+                    player.stamina = float(self.stamina[t, p])
+        for t, p, turns in self.goal_record:
+            game = self.games[t // 2]
+            team = game.lteam if t % 2 == 0 else game.rteam
+            game.turns = turns
+            team.record_goal(player=team.players[p])
+        for game in self.games:
+            game.turns = self.turns
+
+    # region 基础操作
+    def simulate(self, turns: int):
+        """
+        所有比赛同步推进指定回合数
+        :param turns: 回合数
+        """
+        games_num = len(self.tactic) // 2
+        hold = np.arange(games_num) * 2 + self.rng.integers(0, 2, size=games_num)  # 持球队伍序号
+        counter_attack_permitted = np.zeros(games_num, dtype=bool)
+        for turn in range(turns):
+            self.turns = turn
+            # 确定本次战术组织每个球员的场上位置
+            self.shift_all_location()
+            original_score = self.score.copy()
+            # 执行进攻战术
+            tactic = self.select_tactic(hold, counter_attack_permitted)
+            exchange_ball = self.attack(hold, tactic)
+            hold = np.where(exchange_ball, hold ^ 1, hold)
+            # 若球权易位且比分未变，允许使用防守反击
+            counter_attack_permitted = exchange_ball & (original_score == self.score).reshape(-1, 2).all(axis=1)
+
+    def shift_all_location(self):
+        """
+        刷新所有球员的场上位置 仅处理会发生偏移的球员
+        """
+        u = self.rng.random(len(self.shift_players))
+        choice = (self.shift_cum < u[:, None]).sum(axis=1)
+        self.location_flat[self.shift_players] = self.shift_targets[np.arange(len(choice)), choice]
+
+    def shift_location(self, team: np.ndarray):
+        """
+        刷新指定队伍所有球员的场上位置
+        """
+        ori = self.ori_location[team]
+        u = self.rng.random(ori.shape)
+        choice = (SHIFT_CUM[ori] < u[..., None]).sum(axis=-1)
+        self.location[team] = np.take_along_axis(SHIFT_TARGETS[ori], choice[..., None], axis=-1)[..., 0]
+
+    def location_mask(self, team: np.ndarray, table: np.ndarray) -> np.ndarray:
+        """
+        获取指定位置球员的掩码
+        :param table: 位置查找表
+        :return: (n, 11)布尔数组
+        """
+        return table[self.location[team]]
+
+    def choose(self, mask: np.ndarray) -> np.ndarray:
+        """
+        每行在掩码为True的球员中等概率随机选取一人 调用方需保证每行至少有一人
+        :return: 球员序号
+        """
+        return np.where(mask, self.rng.random(mask.shape), -1.0).argmax(axis=1)
+
+    def duel(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        按a:b的比重判定a是否胜出 两者均为0时随机
+        """
+        total = a + b
+        u = self.rng.random(total.shape)
+        return np.where(total > 0, u * total <= a, u < 0.5)
+
+    def get_capa(self, player: np.ndarray, capa_index: int) -> np.ndarray:
+        """
+        获取扣除体力debuff后的能力
+        :param player: 球员全局序号 队伍序号*11+球员序号
+        """
+        return self.capa_flat[player, capa_index] * (self.stamina_flat[player] / 100)
+
+    def get_average_capability(self, team: np.ndarray, capa_index: int) -> np.ndarray:
+        return (self.capa[team, :, capa_index] * self.stamina[team]).sum(axis=1) / (self.players_num[team] * 100)
+
+    def plus_data(self, player: np.ndarray, data_name: str, average_stamina: Optional[np.ndarray] = None):
+        """
+        更新球员场上数据，并按对方体力能力均值判定是否消耗体力
+        :param player: 球员全局序号
+        :param average_stamina: 对方球队的平均体力能力
+        """
+        self.player_data_flat[player, PLAYER_DATA_INDEX[data_name]] += 1
+        if average_stamina is None:
+            return
+        stamina_diff = 1 if data_name == "passes" else 2.5
+        drain = (average_stamina > 0) & ~self.duel(self.capa_flat[player, STAMINA], average_stamina)
+        self.stamina_flat[player] = np.maximum(self.stamina_flat[player] - stamina_diff * drain, 0)
+
+    def select_tactic(self, team: np.ndarray, counter_attack_permitted: np.ndarray) -> np.ndarray:
+        """
+        选择进攻战术，规则同Team.select_tactic
+        :return: 战术序号
+        """
+        allowed = np.ones((len(team), len(TACTIC_NAMES)), dtype=bool)
+        allowed[:, TACTIC_NAMES.index("counter_attack")] = counter_attack_permitted
+        weights = self.tactic[team] * allowed
+        # 所有比重均为0时随机选取
+        weights = np.where((weights.sum(axis=1) > 0)[:, None], weights, allowed)
+        cum = np.cumsum(weights, axis=1)
+        tactic = np.full(len(team), -1)
+        pending = np.arange(len(team))
+        while pending.size:
+            u = self.rng.random(pending.size) * cum[pending, -1]
+            choice = (cum[pending] < u[:, None]).sum(axis=1)
+            pt = team[pending]
+            location = self.location[pt]
+            ok = (choice != 0) | WING_CROSS_LOCATIONS[location].any(axis=1)
+            ok &= ((choice != 1) & (choice != 2)) | WINGS[location].any(axis=1)
+            no_midfielder = (choice == 3) & ~CM[location].any(axis=1)
+            if no_midfielder.any():
+                self.shift_location(pt[no_midfielder])
+            ok &= ~no_midfielder
+            tactic[pending[ok]] = choice[ok]
+            pending = pending[~ok]
+        return tactic
+
+    def get_keeper(self, team: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        获取门将（取第一名）
+        :return: 是否存在、门将全局序号
+        """
+        mask = self.location_mask(team, GK)
+        return mask.any(axis=1), team * MAX_PLAYERS + mask.argmax(axis=1)
+
+    # endregion
+
+    # region 对抗
+    def multi_duel(
+        self, team: np.ndarray, attackers: np.ndarray, defenders: np.ndarray, is_aerial: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        多对多对抗，is_aerial为False时为冲刺过人与抢断，为True时为争顶
+        :param team: 进攻队伍序号
+        :param attackers: 进攻球员掩码
+        :param defenders: 防守球员掩码 可能为空
+        :return: 进攻是否成功、胜出球员全局序号
+        """
+        attackers = attackers.copy()
+        defenders = defenders.copy()
+        rival = team ^ 1
+        average_stamina = self.average_stamina[rival]
+        state = np.zeros(len(team), dtype=bool)
+        winner = np.zeros(len(team), dtype=np.int64)
+
+        no_defender = ~defenders.any(axis=1)
+        state[no_defender] = True
+        winner[no_defender] = team[no_defender] * MAX_PLAYERS + self.choose(attackers[no_defender])
+        no_attacker = ~no_defender & ~attackers.any(axis=1)
+        winner[no_attacker] = rival[no_attacker] * MAX_PLAYERS + self.choose(defenders[no_attacker])
+
+        if is_aerial:
+            attack_capa = defend_capa = (CAPA_INDEX["anticipation"], CAPA_INDEX["strength"])
+            attack_data, attack_success, defend_data, defend_success = ("aerials", "aerial_success") * 2
+        else:
+            attack_capa = (CAPA_INDEX["dribbling"], CAPA_INDEX["pace"])
+            defend_capa = (CAPA_INDEX["interception"], CAPA_INDEX["pace"])
+            attack_data, attack_success, defend_data, defend_success = (
+                "dribbles",
+                "dribble_success",
+                "tackles",
+                "tackle_success",
+            )
+        attack_data, attack_success, defend_data, defend_success = (
+            PLAYER_DATA_INDEX[name] for name in (attack_data, attack_success, defend_data, defend_success)
+        )
+
+        # 每次对抗随机各选一人，双方数据与体力消耗合并为一次计算，前k个为进攻球员，后k个为防守球员
+        attackers_num = attackers.sum(axis=1)
+        defenders_num = defenders.sum(axis=1)
+        active = np.flatnonzero(~no_defender & ~no_attacker)
+        while active.size:
+            k = active.size
+            attacker_index = self.choose(attackers[active])
+            defender_index = self.choose(defenders[active])
+            players = np.concatenate(
+                [team[active] * MAX_PLAYERS + attacker_index, rival[active] * MAX_PLAYERS + defender_index]
+            )
+            self.player_data_flat[players, np.repeat((attack_data, defend_data), k)] += 1
+            avg = np.tile(average_stamina[active], 2)
+            drain = (avg > 0) & ~self.duel(self.capa_flat[players, STAMINA], avg)
+            stamina = np.maximum(self.stamina_flat[players] - 2.5 * drain, 0)
+            self.stamina_flat[players] = stamina
+            capa = self.capa_flat[players]
+            value = np.concatenate(
+                [
+                    capa[:k, attack_capa[0]] + capa[:k, attack_capa[1]],
+                    capa[k:, defend_capa[0]] + capa[k:, defend_capa[1]],
+                ]
+            ) * (stamina / 100)
+            attacker_win = self.duel(value[:k], value[k:])
+
+            winner[active] = np.where(attacker_win, players[:k], players[k:])
+            self.player_data_flat[winner[active], np.where(attacker_win, attack_success, defend_success)] += 1
+            defenders[active[attacker_win], defender_index[attacker_win]] = False
+            attackers[active[~attacker_win], attacker_index[~attacker_win]] = False
+            defenders_num[active] -= attacker_win
+            attackers_num[active] -= ~attacker_win
+            state[active[defenders_num[active] == 0]] = True
+            active = active[(defenders_num[active] > 0) & (attackers_num[active] > 0)]
+        return state, winner
+
+    def dribble_and_block(self, team: np.ndarray, attacker: np.ndarray, defender: np.ndarray) -> np.ndarray:
+        """
+        过人与抢断，一对一
+        :return: 进攻是否成功
+        """
+        average_stamina = self.average_stamina[team ^ 1]
+        self.plus_data(attacker, "dribbles", average_stamina)
+        self.plus_data(defender, "tackles", average_stamina)
+        attacker_win = self.duel(
+            self.get_capa(attacker, CAPA_INDEX["dribbling"]), self.get_capa(defender, CAPA_INDEX["interception"])
+        )
+        self.plus_data(attacker[attacker_win], "dribble_success")
+        self.plus_data(defender[~attacker_win], "tackle_success")
+        return attacker_win
+
+    def pass_ball(self, team: np.ndarray, attacker: np.ndarray, is_long_pass) -> np.ndarray:
+        """
+        传球
+        :param team: 传球队伍序号
+        :param is_long_pass: 是否为长传 可逐行指定
+        :return: 进攻是否成功
+        """
+        defender_average = self.get_average_capability(team ^ 1, CAPA_INDEX["passing"])
+        self.plus_data(attacker, "passes", self.average_stamina[team ^ 1])
+        passing = self.get_capa(attacker, CAPA_INDEX["passing"])
+        # 若是长传，成功率减半
+        success = self.duel(np.where(is_long_pass, passing / 2, passing), defender_average / 2)
+        self.plus_data(attacker[success], "pass_success")
+        return success
+
+    def shot_and_save(
+        self, team: np.ndarray, attacker: np.ndarray, assister: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        射门与扑救
+        :param attacker: 射门球员全局序号
+        :param assister: 助攻球员全局序号 -1为无助攻
+        :return: 是否进球
+        """
+        average_stamina = self.average_stamina[team ^ 1]
+        has_keeper, keeper = self.get_keeper(team ^ 1)
+        self.plus_data(attacker, "shots", average_stamina)
+        self.plus_data(keeper[has_keeper], "saves", average_stamina[has_keeper])
+        goal = self.duel(
+            self.get_capa(attacker, CAPA_INDEX["shooting"]), self.get_capa(keeper, CAPA_INDEX["goalkeeping"])
+        )
+        goal |= ~has_keeper
+
+        self.score[team[goal]] += 1
+        self.plus_data(attacker[goal], "goals")
+        if assister is not None:
+            self.plus_data(assister[goal & (assister >= 0)], "assists")
+        for t, player in zip(team[goal], attacker[goal]):
+            self.goal_record.append((int(t), int(player % MAX_PLAYERS), self.turns))
+        self.plus_data(keeper[~goal], "save_success")
+        return goal
+
+    # endregion
+
+    # region 战术
+    def attack(self, team: np.ndarray, tactic: np.ndarray) -> np.ndarray:
+        """
+        执行进攻战术，流程同Team中的各战术方法
+        不同比赛互不影响，因此把各战术中相同的环节合并为同一批次计算
+        :param team: 进攻队伍序号
+        :param tactic: 战术序号
+        :return: 是否交换球权
+        """
+        n = len(team)
+        rows_all = np.arange(n)
+        rival = team ^ 1
+        wing_cross, under_cutting, pull_back, middle_attack, counter_attack = (
+            tactic == i for i in range(len(TACTIC_NAMES))
+        )
+        exchange_ball = np.ones(n, dtype=bool)
+        self.team_data[team, TEAM_DATA_INDEX["attempts"]] += 1
+        self.team_data[team, TACTIC_DATA_INDEX[tactic]] += 1
+        shooter = np.full(n, -1)
+        assister = np.full(n, -1)
+        location = self.location[team]
+        rival_location = self.location[rival]
+
+        # region 持球推进
+        # 防守反击：门将或中卫长传找前锋
+        rows = np.flatnonzero(counter_attack)
+        passer = team[rows] * MAX_PLAYERS + self.choose(GK_CB[location[rows]])
+        success = self.pass_ball(team[rows], passer, False)
+        assister[rows[success]] = passer[success]
+        # 中路渗透：中场之间10次传球
+        rows = np.flatnonzero(middle_attack)
+        passed, middle_assister = self.midfield_passing(team[rows])
+        assister[rows[passed]] = middle_assister
+
+        attackers = np.zeros((n, MAX_PLAYERS), dtype=bool)
+        defenders = np.zeros((n, MAX_PLAYERS), dtype=bool)
+        # 下底传中：边锋或边卫过边卫 两路都有人时随机选择
+        left, right = LW_LB[location], RW_RB[location]
+        use_left = left.any(axis=1) & ((self.rng.random(n) < 0.5) | ~right.any(axis=1))
+        attackers[wing_cross] = np.where(use_left[:, None], left, right)[wing_cross]
+        defenders[wing_cross] = np.where(use_left[:, None], rival_location == LB, rival_location == RB)[wing_cross]
+        # 边路内切与倒三角：随机一名边锋过对侧边卫
+        cutting = under_cutting | pull_back
+        wing = self.choose(WINGS[location])
+        is_left = location[rows_all, wing] == LW
+        attackers[cutting, wing[cutting]] = True
+        defenders[cutting] = np.where(is_left[:, None], rival_location == RB, rival_location == LB)[cutting]
+        # 防守反击：前锋冲刺过中卫
+        counter_rows = np.flatnonzero(counter_attack)
+        counter_rows = counter_rows[assister[counter_rows] >= 0]
+        attackers[counter_rows] = ST[location[counter_rows]]
+        defenders[counter_rows] = CB[rival_location[counter_rows]]
+
+        rows = np.flatnonzero((wing_cross | cutting | counter_attack) & attackers.any(axis=1))
+        state, holder = self.multi_duel(team[rows], attackers[rows], defenders[rows], False)
+        rows, holder = rows[state], holder[state]
+        shooter[rows[counter_attack[rows]]] = holder[counter_attack[rows]]
+        # endregion
+
+        # region 突破中卫与传中
+        # 边路内切随机过至多两名中卫，以最后一次结果为准；倒三角随机过一名中卫
+        cut_rows, cut_holder = rows[cutting[rows]], holder[cutting[rows]]
+        centre_backs = CB[rival_location[cut_rows]]
+        keys = np.where(centre_backs, self.rng.random(centre_backs.shape), np.inf)
+        limit = np.where(under_cutting[cut_rows], 1, 0)
+        kept = centre_backs & (keys <= np.sort(keys, axis=1)[np.arange(len(cut_rows)), limit][:, None])
+        state = np.ones(len(cut_rows), dtype=bool)
+        for _ in range(2):
+            sub = np.flatnonzero(kept.any(axis=1))
+            centre_back = kept[sub].argmax(axis=1)
+            kept[sub, centre_back] = False
+            state[sub] = self.dribble_and_block(
+                team[cut_rows[sub]], cut_holder[sub], rival[cut_rows[sub]] * MAX_PLAYERS + centre_back
+            )
+        cut_rows, cut_holder = cut_rows[state], cut_holder[state]
+        shooter[cut_rows[under_cutting[cut_rows]]] = cut_holder[under_cutting[cut_rows]]
+
+        # 下底传中的长传与倒三角的短传
+        cross_rows, cross_holder = rows[wing_cross[rows]], holder[wing_cross[rows]]
+        pass_rows = np.concatenate([cross_rows, cut_rows[pull_back[cut_rows]]])
+        pass_holder = np.concatenate([cross_holder, cut_holder[pull_back[cut_rows]]])
+        success = self.pass_ball(team[pass_rows], pass_holder, wing_cross[pass_rows])
+        pass_rows, pass_holder = pass_rows[success], pass_holder[success]
+        assister[pass_rows] = pass_holder
+        # 倒三角由中锋或中场射门
+        back_rows = pass_rows[pull_back[pass_rows]]
+        shooters = ST_CM[location[back_rows]]
+        back_rows, shooters = back_rows[shooters.any(axis=1)], shooters[shooters.any(axis=1)]
+        shooter[back_rows] = team[back_rows] * MAX_PLAYERS + self.choose(shooters)
+        # endregion
+
+        # region 争顶
+        # 下底传中与中路渗透：前锋与中卫争顶
+        rows = np.concatenate([pass_rows[wing_cross[pass_rows]], np.flatnonzero(middle_attack & (assister >= 0))])
+        rows = rows[ST[location[rows]].any(axis=1)]
+        state, win_player = self.multi_duel(team[rows], ST[location[rows]], CB[rival_location[rows]], True)
+        shooter[rows[state]] = win_player[state]
+        clear_rows, clear_player = rows[~state], win_player[~state]
+        # endregion
+
+        # region 射门
+        rows = np.flatnonzero(shooter >= 0)
+        goal = self.shot_and_save(team[rows], shooter[rows], np.where(under_cutting[rows], -1, assister[rows]))
+        rows = rows[goal]
+        self.team_data[team[rows], TACTIC_DATA_INDEX[tactic[rows]] + 1] += 1
+        # endregion
+
+        # region 解围
+        # 防守球员解围 解围失败则进攻方仍然持球
+        cleared = self.pass_ball(rival[clear_rows], clear_player, True)
+        exchange_ball[clear_rows[~cleared]] = False
+        # 中路渗透外围争顶 我方外围无中卫时丢失球权，对方外围无前锋时我方仍然持球
+        rows = clear_rows[cleared & middle_attack[clear_rows]]
+        centre_backs = CB[location[rows]]
+        rows, centre_backs = rows[centre_backs.any(axis=1)], centre_backs[centre_backs.any(axis=1)]
+        strikers = ST[rival_location[rows]]
+        exchange_ball[rows[~strikers.any(axis=1)]] = False
+        has_striker = strikers.any(axis=1)
+        rows = rows[has_striker]
+        state, _ = self.multi_duel(rival[rows], strikers[has_striker], centre_backs[has_striker], True)
+        exchange_ball[rows[~state]] = False
+        # endregion
+        return exchange_ball
+
+    def midfield_passing(self, team: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        中路渗透的中场传递
+        10次循环，若其中有一次循环：所有中场球员传球均失败，即丢失球权，否则传球成功
+        每轮中每名中场至多传球一次，且成败只取决于其自身体力，故可同时判定所有中场，再按随机顺序取第一次成功
+        :param team: 进攻队伍序号
+        :return: 是否传递成功、助攻球员全局序号（成功传球最多的球员）
+        """
+        n = len(team)
+        # 只保留中场球员所在的列
+        midfielders = self.location_mask(team, CM)
+        width = max(int(midfielders.sum(axis=1).max(initial=0)), 1)
+        column = np.argsort(~midfielders, axis=1, kind="stable")[:, :width]
+        midfielders = np.take_along_axis(midfielders, column, axis=1)
+        players = team[:, None] * MAX_PLAYERS + column
+        count = np.zeros((n, width), dtype=np.int64)
+        first_success = np.full((n, width), np.inf)  # 首次传球成功的轮次 用于助攻者平局判定
+        # 传球期间防守方体力不变，传球均值与体力能力均值在整个渗透过程中不变
+        defender_average = self.get_average_capability(team ^ 1, CAPA_INDEX["passing"])[:, None] / 2
+        average_stamina = self.average_stamina[team ^ 1][:, None]
+        passing_capa = self.capa_flat[players, CAPA_INDEX["passing"]]
+        stamina_capa = self.capa_flat[players, STAMINA]
+        passes, pass_success = PLAYER_DATA_INDEX["passes"], PLAYER_DATA_INDEX["pass_success"]
+        rows = np.arange(n)
+        for round_i in range(10):
+            player, mids = players[rows], midfielders[rows]
+            stamina = self.stamina_flat[player]
+            avg = np.broadcast_to(average_stamina[rows], mids.shape)
+            drain = (avg > 0) & ~self.duel(stamina_capa[rows], avg)
+            new_stamina = np.maximum(stamina - drain, 0)
+            success = mids & self.duel(
+                passing_capa[rows] * (new_stamina / 100), np.broadcast_to(defender_average[rows], mids.shape)
+            )
+            keys = np.where(mids, self.rng.random(mids.shape), np.inf)
+            success_keys = np.where(success, keys, np.inf)
+            passer = success_keys.argmin(axis=1)
+            first_key = success_keys[np.arange(len(rows)), passer]
+            attempted = mids & (keys <= first_key[:, None])
+            passed = np.isfinite(first_key)
+
+            self.stamina_flat[player] = np.where(attempted, new_stamina, stamina)
+            self.player_data_flat[player, passes] += attempted
+            rows, passer = rows[passed], passer[passed]
+            self.player_data_flat[players[rows, passer], pass_success] += 1
+            count[rows, passer] += 1
+            first_success[rows, passer] = np.minimum(first_success[rows, passer], round_i)
+
+        passed = np.zeros(n, dtype=bool)
+        passed[rows] = True
+        best = count[rows] == count[rows].max(axis=1, keepdims=True)
+        assister = players[rows, np.where(best, first_success[rows], np.inf).argmin(axis=1)]
+        return passed, assister
+
+    # endregion
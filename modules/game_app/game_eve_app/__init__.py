@@ -1,3 +1,3 @@
 from modules.game_app.game_eve_app.game_eve import GameEvE
-from modules.game_app.game_eve_app.player import Player
+from modules.game_app.game_eve_app.player import Player, PlayerData
 from modules.game_app.game_eve_app.team import Team
@@ -1,15 +1,17 @@
 import datetime
 import json
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 import crud
 import game_configs
 import models
 import schemas
 from modules.game_app import game_eve_app
+from modules.game_app.player_developer import PlayerDeveloper
+from modules.game_app.player_rater import PlayerRater
 from sqlalchemy.orm import Session
-from utils import logger, utils
+from utils import EventLog, KickoffSnapshot, logger
 
 
 class GameEvE:
@@ -25,31 +27,94 @@ class GameEvE:
         save_id: int,
         club1_model: models.Club = None,
         club2_model: models.Club = None,
+        lineups: Optional[Tuple[List[Tuple], List[Tuple]]] = None,
+        fidelity: str = game_configs.Fidelity.full,
+        seed: Optional[int] = None,
+        lineup_rng: Optional[random.Random] = None,
     ):
+        """
+        :param lineups: 两队已选好的首发阵容，为空时各自挑选，见Team.init_players
+        :param fidelity: 解说精度，headless时不生成也不保存解说，比赛数据不受影响
+        :param seed: 比赛随机数流的种子，为空时随机生成；相同种子与开球快照下比赛过程完全一致
+        :param lineup_rng: 挑选首发阵容所用的随机数，为空时使用全局的random
+        """
         self.db = db
+        self.lineup_rng = lineup_rng
         self.season = season
         self.date = date
-        self.script = ""
+        self.fidelity = fidelity
+        self.script = ""  # 预先生成的解说，仅GamePvE使用；GameEvE只记录事件，读取时再生成解说
+        self.event_log = EventLog()  # 比赛事件记录
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)  # 比赛过程的所有随机都取自这一随机数流
+        # 解说使用独立的随机数流，保证headless与full两种精度下的比赛过程一致
+        self.script_random = random.Random(self.rng.getrandbits(32))
+        self.kickoff: Optional[List[Dict]] = None  # 开球时两队的战术比重与首发阵容，用于重放比赛
         self.type = game_type
         self.name = game_name
         self.save_id = save_id
         self.winner_id = 0
         self.goal_record: List[schemas.GoalRecord] = []  # 进球记录
         self.turns = 0  # 比赛进行的回合数 用于记录进球回合
+        self.last_leg_drawn: Optional[bool] = None  # 上一回合是否打平，为空时在加时判断中查询数据库
+        lineup1, lineup2 = lineups if lineups else (None, None)
         self.lteam = game_eve_app.Team(
-            db=self.db, game=self, club_id=club1_id, club_model=club1_model, season=self.season, date=self.date
+            db=self.db,
+            game=self,
+            club_id=club1_id,
+            club_model=club1_model,
+            season=self.season,
+            date=self.date,
+            lineup=lineup1,
         )
         self.rteam = game_eve_app.Team(
-            db=self.db, game=self, club_id=club2_id, club_model=club2_model, season=self.season, date=self.date
+            db=self.db,
+            game=self,
+            club_id=club2_id,
+            club_model=club2_model,
+            season=self.season,
+            date=self.date,
+            lineup=lineup2,
         )
+        for side, team in enumerate((self.lteam, self.rteam)):
+            for i, player in enumerate(team.players):
+                player.slot = side * EventLog.TEAM_PLAYERS + i
+                player.rng = self.rng
         self.ingame_time = 0
 
+    @staticmethod
+    def get_fidelity(
+        fidelity: str, clubs_id: List, player_club_id: int, game_name: str = "", game_type: str = ""
+    ) -> str:
+        """
+        获取一场比赛实际使用的解说精度，涉及玩家俱乐部的比赛始终完整解说，
+        其余比赛按game_configs.competition_fidelity中赛事名、比赛类型的顺序查找，未配置时使用设定的精度
+        :param fidelity: 设定的解说精度
+        :param clubs_id: 两队id
+        :param player_club_id: 玩家俱乐部id
+        :param game_name: 赛事名
+        :param game_type: 比赛类型
+        :return: 解说精度
+        """
+        if player_club_id in [int(club_id) for club_id in clubs_id]:
+            return game_configs.Fidelity.full
+        competition_fidelity = game_configs.competition_fidelity
+        return competition_fidelity.get(game_name, competition_fidelity.get(game_type, fidelity))
+
     def start(self) -> Tuple:
         """
         开始比赛
         :return: 比分元组
         """
-        self.add_script("比赛开始！", "s")
+        self.simulate()
+        return self.settle()
+
+    def simulate(self):
+        """
+        模拟常规时间的比赛回合
+        """
+        self.kickoff = self.get_kickoff()
+        self.add_event(game_configs.Event.start)
         hold_ball_team, no_ball_team = self.init_hold_ball_team()
         counter_attack_permitted = False
 
@@ -68,6 +133,20 @@ class GameEvE:
                 counter_attack_permitted = True
             else:
                 counter_attack_permitted = False
+
+    def settle(self) -> Tuple:
+        """
+        常规时间结束后的处理：加时判断、奖金、评分与保存
+        :return: 比分元组
+        """
+        self.finish()
+        return self.save()
+
+    def finish(self, rate: bool = True):
+        """
+        常规时间结束后不涉及数据库的处理：胜者、加时与点球、终场解说、评分
+        :param rate: 是否在此评分；为False时由调用方以PlayerRater对多场比赛统一评分
+        """
         # 记录胜者id
         if self.lteam.score > self.rteam.score:
             self.winner_id = self.lteam.club_id
@@ -79,25 +158,46 @@ class GameEvE:
 
         judge = self.judge_extra_time()  # 加时判断与点球判断 最后修改self.winner_id
         if judge == 1:
-            self.add_script(
-                "比赛结束！ {} {}:{} {}".format(self.lteam.name, self.lteam.score, self.rteam.score, self.rteam.name), "ae"
-            )
+            self.add_event(game_configs.Event.extra_time_end, value1=self.lteam.score, value2=self.rteam.score)
         else:
-            self.add_script(
-                "比赛结束！ {} {}:{} {}".format(self.lteam.name, self.lteam.score, self.rteam.score, self.rteam.name), "e"
-            )
+            self.add_event(game_configs.Event.end, value1=self.lteam.score, value2=self.rteam.score)
 
         if self.winner_id == self.lteam.club_id:
-            winner_name = self.lteam.name
+            winner = self.lteam
         elif self.winner_id == self.rteam.club_id:
-            winner_name = self.rteam.name
+            winner = self.rteam
         else:
-            winner_name = None
+            winner = None
 
-        if winner_name:
-            self.add_script("胜者为{}！".format(winner_name), "e")
+        if winner:
+            self.add_event(game_configs.Event.winner, winner)
         else:
-            self.add_script("平局", "e")
+            self.add_event(game_configs.Event.draw)
+        if rate:
+            self.rate()  # 球员评分
+
+    def save(self, commit: bool = True) -> Tuple:
+        """
+        比赛结束后写入数据库：奖金、门票、比赛数据与球员数据
+        一个比赛日的多场比赛可改用game_app.ResultSink统一写入
+        :param commit: 是否在此提交；为False时只flush，由调用方统一提交
+        :return: 比分元组
+        """
+        self.save_finance()
+        self.save_game_data(commit)  # 保存比赛
+        self.update_players_data(commit)  # 保存球员数据的改变
+        return self.get_score_tuple()
+
+    def get_score_tuple(self) -> Tuple:
+        """
+        :return: 比分元组，(主队名, 客队名, 主队比分, 客队比分)
+        """
+        return self.lteam.team_model.name, self.rteam.team_model.name, self.lteam.score, self.rteam.score
+
+    def save_finance(self):
+        """
+        结算杯赛奖金与门票收益
+        """
         year, month, day = self.date.split("-")
         date = datetime.datetime(int(year), int(month), int(day))
         save = crud.get_save_by_id(db=self.db, save_id=self.save_id)
@@ -165,11 +265,6 @@ class GameEvE:
                 )
                 crud.add_user_finance(db=self.db, user_finance=user_finance)
 
-        self.rate()  # 球员评分
-        self.save_game_data()  # 保存比赛
-        self.update_players_data()  # 保存球员数据的改变
-        return self.lteam.team_model.name, self.rteam.team_model.name, self.lteam.score, self.rteam.score
-
     def judge_extra_time(self):
         """
         type:比赛类型
@@ -184,24 +279,28 @@ class GameEvE:
                 self.extra_time()
                 return 1
             else:
-                query_str = "and_(models.Game.save_id=='{}', models.Game.season=='{}', models.Game.type=='{}')".format(
-                    self.save_id, int(self.season), self.type
-                )
-                games = crud.get_games_by_attri(db=self.db, query_str=query_str)  # 查找同阶段的其他比赛
-                for game in games:
-                    team1 = game.teams[0]
-                    team2 = game.teams[1]
-                    if self.lteam.club_id == team2.club_id or self.lteam.club_id == team1.club_id:  # 查找这两队上一次比赛
-                        if team1.score == team2.score:  # 上一轮打平，这一轮加时
-                            self.extra_time()
-                            return 1
+                if self.last_leg_drawn is None:
+                    # 不连接数据库时无从查询，视为未打平
+                    self.last_leg_drawn = self.is_last_leg_drawn() if self.db else False
+                if self.last_leg_drawn:  # 上一轮打平，这一轮加时
+                    self.extra_time()
+                    return 1
+
+    def is_last_leg_drawn(self) -> bool:
+        """
+        查询两队同阶段的上一次比赛是否打平
+        """
+        tie = crud.get_knockout_tie(
+            self.db, self.save_id, int(self.season), self.name, self.type, self.lteam.club_id, self.rteam.club_id
+        )
+        return tie is not None and tie.legs == 1 and tie.first_leg_score1 == tie.first_leg_score2
 
     def extra_time(self):
         """
         进行加时比赛
         """
         print("加时")
-        self.add_script("\n开始加时比赛！", "as")
+        self.add_event(game_configs.Event.extra_time_start)
         hold_ball_team, no_ball_team = self.init_hold_ball_team()
         counter_attack_permitted = False
         for _ in range(20):  # 加时赛20个回合
@@ -236,22 +335,22 @@ class GameEvE:
         turn = 0
         win_club_id = 0  # 胜者
         while win_club_id == 0:
-            self.add_script("\n第{}轮点球！".format(turn + 1), "n")
+            self.add_event(game_configs.Event.penalty_round, value1=turn + 1)
             l_out = self.lteam.making_final_penalty(self.rteam, turn)  # 点球结果
             if l_out:
-                self.add_script("稳稳将球罚进！", "n")
+                self.add_event(game_configs.Event.penalty_scored, self.lteam)
                 lteam_p += 1
             elif not l_out:
-                self.add_script("被门将拒之门外！", "n")
+                self.add_event(game_configs.Event.penalty_missed, self.lteam)
 
             r_out = self.rteam.making_final_penalty(self.lteam, turn)
 
             if r_out:
-                self.add_script("稳稳将球罚进！", "n")
+                self.add_event(game_configs.Event.penalty_scored, self.rteam)
                 rteam_p += 1
             elif not r_out:
-                self.add_script("被门将拒之门外！", "n")
-            self.add_script("{} : {}".format(lteam_p, rteam_p), "n")
+                self.add_event(game_configs.Event.penalty_missed, self.rteam)
+            self.add_event(game_configs.Event.penalty_tally, value1=lteam_p, value2=rteam_p)
             if turn < 3 and lteam_p - rteam_p > 2:  # 前三轮，2：0还能继续
                 win_club_id = self.lteam.club_id
 
@@ -274,7 +373,7 @@ class GameEvE:
             turn += 1
 
         self.winner_id = win_club_id
-        self.add_script("点球结束！ {} {}:{} {}".format(self.lteam.name, lteam_p, rteam_p, self.rteam.name), "n")
+        self.add_event(game_configs.Event.penalty_end, value1=lteam_p, value2=rteam_p)
 
     def tactical_start(self, num: int = 20):
         """
@@ -291,28 +390,33 @@ class GameEvE:
         self.rteam.tactic = tactic
 
         for i in range(num):
-            self.set_full_stamina()
-            # 模拟一场比赛
-            hold_ball_team, no_ball_team = self.init_hold_ball_team()
-            counter_attack_permitted = False
-            for _ in range(50):
-                # 确定本次战术组织每个球员的场上位置
-                self.lteam.shift_location()
-                self.rteam.shift_location()
-                original_score = (self.lteam.score, self.rteam.score)
-                # 执行进攻战术
-                exchange_ball = hold_ball_team.attack(no_ball_team, counter_attack_permitted)
-                if exchange_ball:
-                    hold_ball_team, no_ball_team = self.exchange_hold_ball_team(hold_ball_team)
-                if exchange_ball and original_score == (self.lteam.score, self.rteam.score):
-                    # 若球权易位且比分未变，允许使用防守反击
-                    counter_attack_permitted = True
-                else:
-                    counter_attack_permitted = False
+            self.play_test_match()
         # logger.info("{}场模拟比赛耗时{}秒".format(num, str(e - s)))
         # 返回队伍战术执行数据
         return self.lteam.data, self.rteam.data
 
+    def play_test_match(self):
+        """
+        以两队当前的战术比重进行一场模拟比赛，战术数据累加在两队的data中
+        """
+        self.set_full_stamina()
+        hold_ball_team, no_ball_team = self.init_hold_ball_team()
+        counter_attack_permitted = False
+        for _ in range(50):
+            # 确定本次战术组织每个球员的场上位置
+            self.lteam.shift_location()
+            self.rteam.shift_location()
+            original_score = (self.lteam.score, self.rteam.score)
+            # 执行进攻战术
+            exchange_ball = hold_ball_team.attack(no_ball_team, counter_attack_permitted)
+            if exchange_ball:
+                hold_ball_team, no_ball_team = self.exchange_hold_ball_team(hold_ball_team)
+            if exchange_ball and original_score == (self.lteam.score, self.rteam.score):
+                # 若球权易位且比分未变，允许使用防守反击
+                counter_attack_permitted = True
+            else:
+                counter_attack_permitted = False
+
     def set_full_stamina(self):
         """
         初始化所有球员的体力
@@ -322,117 +426,19 @@ class GameEvE:
         for player in self.rteam.players:
             player.stamina = player.data["original_stamina"]
 
-    def update_players_data(self):
-        """
-        保存球员数据的改变
-        """
-        for player in self.lteam.players:
-            self.update_player_data(player)
-        self.db.commit()
-        for player in self.rteam.players:
-            self.update_player_data(player)
-        # self.db.commit() # 感觉不用加
-
-    def update_player_data(self, player: game_eve_app.Player):
-        """
-        保存球员数据的改变
-        :param player: 球员实例
-        """
-        lo = player.ori_location
-        # region 记录场上位置数
-        if lo == "ST":
-            self.update_player(player.player_model, attri={"ST_num": player.player_model.ST_num + 1})
-        elif lo == "CM":
-            self.update_player(player.player_model, attri={"CM_num": player.player_model.CM_num + 1})
-        elif lo == "LW":
-            self.update_player(player.player_model, attri={"LW_num": player.player_model.LW_num + 1})
-        elif lo == "RW":
-            self.update_player(player.player_model, attri={"RW_num": player.player_model.RW_num + 1})
-        elif lo == "CB":
-            self.update_player(player.player_model, attri={"CB_num": player.player_model.CB_num + 1})
-        elif lo == "LB":
-            self.update_player(player.player_model, attri={"LB_num": player.player_model.LB_num + 1})
-        elif lo == "RB":
-            self.update_player(player.player_model, attri={"RB_num": player.player_model.RB_num + 1})
-        elif lo == "GK":
-            self.update_player(player.player_model, attri={"GK_num": player.player_model.GK_num + 1})
-        elif lo == "CAM":
-            self.update_player(player.player_model, attri={"CAM_num": player.player_model.CAM_num + 1})
-        elif lo == "LM":
-            self.update_player(player.player_model, attri={"LM_num": player.player_model.LM_num + 1})
-        elif lo == "RM":
-            self.update_player(player.player_model, attri={"RM_num": player.player_model.RM_num + 1})
-        elif lo == "CDM":
-            self.update_player(player.player_model, attri={"CDM_num": player.player_model.CDM_num + 1})
-        else:
-            logger.warning("没有球员对应的位置！")
-        # endregion
-        # region 能力成长
-        if player.data["real_rating"] < 4:
-            self.update_player(player.player_model, self.get_cap_improvement(player, 0.025))
-        elif 4 <= player.data["real_rating"] < 5:
-            self.update_player(player.player_model, self.get_cap_improvement(player, 0.05))
-        elif 5 <= player.data["real_rating"] < 6:
-            self.update_player(player.player_model, self.get_cap_improvement(player, 0.075))
-        elif 6 <= player.data["real_rating"] < 7:
-            self.update_player(player.player_model, self.get_cap_improvement(player, 0.1))
-        elif 7 <= player.data["real_rating"] < 8:
-            self.update_player(player.player_model, self.get_cap_improvement(player, 0.125))
-        elif 8 <= player.data["real_rating"] < 9:
-            self.update_player(player.player_model, self.get_cap_improvement(player, 0.15))
-        elif player.data["real_rating"] >= 9:
-            self.update_player(player.player_model, self.get_cap_improvement(player, 0.175))
-        else:
-            logger.error("没有球员相对应的评分！")
-        # endregion
-
-        # region  剩余体力保存
-        self.update_player(player.player_model, attri={"real_stamina": player.stamina, "last_game_date": self.date})
-        # endregion
-        # region 比赛结束计算身价
-        self.update_player(player.player_model, attri={"values": player.computed_player.get_values()})
-        # self.db.commit()
-        # endregion
-
-    @staticmethod
-    def update_player(player_model: models.Player, attri: dict):
+    def update_players_data(self, commit: bool = True):
         """
-        为了统一commit所设置的中间函数
-        :param player_model:
-        :param attri:
-        :return:
+        保存球员数据的改变：位置出场数、能力成长、剩余体力与身价，见PlayerDeveloper
+        :param commit: 是否在此提交
         """
-        for key, value in attri.items():
-            setattr(player_model, key, value)
-
-    @staticmethod
-    def get_cap_improvement(player: game_eve_app.Player, value: float) -> Dict[str, float]:
-        """
-        根据评分，获取能力的提升值
-        :param player: 球员实例
-        :param value: 外部函数传入的提升值
-        :return: 记录能力提升的字典
-        """
-        original_location = dict()  # 对应位置的能力比重字典
-        for x in game_configs.location_capability:
-            if x["name"] == player.ori_location:
-                original_location = x
-                break
-        count = 0
-        circulation = 0  # 记录循环次数，防止当所有能力都满值时无法跳出循环
-        result = dict()
-        while True:
-            capa_name = utils.select_by_pro(original_location["weight"])
-            limit = eval("player.player_model.{}_limit".format(capa_name))
-            real_capa = eval("player.player_model.{}".format(capa_name))
-            if real_capa + value <= limit:
-                result[capa_name] = float(utils.retain_decimal(real_capa + value))
-                count += 1
-            circulation += 1
-            if count == 2 or circulation > 20:
-                # 若加满两项能力或循环超过20次，退出
-                break
-        return result
+        players = [*self.lteam.players, *self.rteam.players]
+        crud.update_players_bulk(
+            db=self.db,
+            player_models=[player.player_model for player in players],
+            attri=PlayerDeveloper.develop([self]),
+        )
+        if commit:
+            self.db.commit()
 
     def export_game_schemas(self, created_time=datetime.datetime.now()) -> schemas.GameCreate:
         """
@@ -447,6 +453,9 @@ class GameEvE:
             "date": self.date,
             "season": str(self.season),
             "script": self.script,
+            "event_log": self.export_event_log(),
+            "seed": self.seed if self.kickoff else None,
+            "replay": self.export_replay(),
             "mvp": self.get_highest_rating_player().player_model.id,
             "save_id": self.save_id,
             "winner_id": self.winner_id,
@@ -455,15 +464,32 @@ class GameEvE:
         game_data = schemas.GameCreate(**data)
         return game_data
 
-    def save_game_data(self):
+    def export_knockout_result(self) -> dict:
+        """
+        导出用于更新淘汰赛对阵的比赛结果，见crud.update_knockout_ties
+        """
+        return {
+            "save_id": self.save_id,
+            "season": int(self.season),
+            "name": self.name,
+            "type": self.type,
+            "club1_id": self.lteam.club_id,
+            "club2_id": self.rteam.club_id,
+            "score1": self.lteam.score,
+            "score2": self.rteam.score,
+        }
+
+    def save_game_data(self, commit: bool = True):
         """
         将比赛数据写入数据库
+        :param commit: 是否在此提交；为False时只flush以获得比赛id
         """
         created_time = datetime.datetime.now()
         # 保存Game
         game_data = self.export_game_schemas(created_time)
         game_model = crud.create_game(db=self.db, game=game_data)
         game_team_info_model_list = []
+        season_stats_data = []
         # 保存GameTeamInfo
         for team in [self.lteam, self.rteam]:
             game_team_info_schemas = team.export_game_team_info_schemas(created_time)
@@ -485,93 +511,120 @@ class GameEvE:
                 )
                 game_player_data_model.season = game_model.season  # 添加赛季
                 game_player_data_model_list.append(game_player_data_model)
+                season_stats_data.append({**game_player_data_schemas.dict(), "season": int(self.season)})
             game_team_info_model.player_data = game_player_data_model_list
         game_model.teams = game_team_info_model_list
-        self.db.commit()
-        self.db.refresh(game_model)
+        # 更新球员赛季统计与淘汰赛对阵
+        crud.update_player_season_stats(db=self.db, game_player_data=season_stats_data)
+        crud.update_knockout_ties(db=self.db, results=[self.export_knockout_result()])
+        if commit:
+            self.db.commit()
+            self.db.refresh(game_model)
+        else:
+            self.db.flush()
         return game_model.id
-        # 更迅速地保存GamePlayerData
-        # game_player_data_schemas_list: List[schemas.GamePlayerData] = list(
-        #     map(lambda p: p.export_game_player_data_schemas(created_time), team.players))
-        # crud.create_game_player_data_bulk(game_player_data=game_player_data_schemas_list,
-        #                                   game_team_info_id=game_team_info_model.id)
 
-    def add_script(self, text: str, status: str):
+    @property
+    def is_headless(self) -> bool:
         """
-        添加解说
-        :param text: 解说词
-        :param status:状态参数
+        是否不记录事件，快速模拟的比赛同样不记录
         """
-        grade = "@" + str(random.randint(1, 5))
+        return self.fidelity in (game_configs.Fidelity.headless, game_configs.Fidelity.quick)
+
+    def add_event(
+        self,
+        code: game_configs.Event,
+        actor: Optional[Union[game_eve_app.Player, game_eve_app.Team]] = None,
+        target: Optional[Union[game_eve_app.Player, game_eve_app.Team]] = None,
+        value1: int = 0,
+        value2: int = 0,
+    ):
+        """
+        记录比赛事件，解说在读取比赛时生成
+        :param code: 事件代码
+        :param actor: 发起者，球员或球队
+        :param target: 对象，球员或球队
+        :param value1: 数值1，如主队比分
+        :param value2: 数值2，如客队比分
+        """
+        if self.is_headless:
+            return
+        grade = self.script_random.randint(1, 5)
+        status = game_configs.event_templates[code][1]
         if status == "s":  # 开始
-            str_time = "@00:00"
             self.ingame_time = 0
-            self.script += text + str_time + grade + "\n"
         elif status == "as":  # 加时开始
-            str_time = "@090:00"
             self.ingame_time = 9000
-            self.script += text + str_time + grade + "\n"
-        elif status == "e":  # 结束
-            str_time = "@90:00"
-            self.script += text + str_time + grade + "\n"
-        elif status == "ae":
-            str_time = "@120:00"  # 加时结束
-            self.script += text + str_time + grade + "\n"
         elif status == "d":  # 两段动作
-            happening_time = random.randint(self.ingame_time + 25, self.ingame_time + 100)
-            str_time = str(happening_time)
-            if int(str_time[-2:]) > 60:  # 60进制
-                happening_time += 40
-            str_time = str(happening_time)
-            cstr_time = str_time
-            if len(str_time) == 1:
-                cstr_time = "000" + str_time
-            if len(str_time) == 2:
-                cstr_time = "00" + str_time
-            if len(str_time) == 3:
-                cstr_time = "0" + str_time
-            self.ingame_time = happening_time
-            if len(str_time) < 5:  # 100分钟以内
-                str_sec = cstr_time[-2:]
-                str_min = cstr_time[:2]
-                str_time = str_min + ":" + str_sec
-            else:
-                str_sec = cstr_time[-2:]
-                str_min = cstr_time[:3]
-                str_time = str_min + ":" + str_sec
-            self.script += text + "@" + str_time + grade + "\n"
+            self.set_ingame_time(self.script_random.randint(self.ingame_time + 25, self.ingame_time + 100))
         elif status == "c":  # 连续动作,时间间隔短
-            happening_time = random.randint(self.ingame_time + 1, self.ingame_time + 4)
-            str_time = str(happening_time)
-            if int(str_time[-2:]) > 60:  # 60进制
-                happening_time += 40
-            str_time = str(happening_time)
-            cstr_time = str_time
-            if len(str_time) == 1:
-                cstr_time = "000" + str_time
-            if len(str_time) == 2:
-                cstr_time = "00" + str_time
-            if len(str_time) == 3:
-                cstr_time = "0" + str_time
-            self.ingame_time = happening_time
-            if len(str_time) < 5:  # 100分钟以内
-                str_sec = cstr_time[-2:]
-                str_min = cstr_time[:2]
-                str_time = str_min + ":" + str_sec
-            else:
-                str_sec = cstr_time[-2:]
-                str_min = cstr_time[:3]
-                str_time = str_min + ":" + str_sec
-            self.script += text + "@" + str_time + grade + "\n"
-        elif status == "n":  # 纯解说
-            self.script += text + grade + "\n"
+            self.set_ingame_time(self.script_random.randint(self.ingame_time + 1, self.ingame_time + 4))
+        self.event_log.append(
+            code, self.get_slot(actor), self.get_slot(target), value1, value2, grade, self.turns, self.ingame_time
+        )
+
+    def set_ingame_time(self, happening_time: int):
+        """
+        记录当前比赛时间
+        :param happening_time: 以分秒拼接的整数表示的时间，如1230为12:30
+        """
+        if happening_time % 100 > 60:  # 60进制
+            happening_time += 40
+        self.ingame_time = happening_time
+
+    def get_slot(self, obj: Optional[Union[game_eve_app.Player, game_eve_app.Team]]) -> int:
+        """
+        获取球员或球队在事件记录中的槽位
+        """
+        if obj is None:
+            return EventLog.NO_SLOT
+        if isinstance(obj, game_eve_app.Team):
+            return EventLog.TEAM_SLOT + (0 if obj is self.lteam else 1)
+        return obj.slot
+
+    def export_event_log(self) -> Optional[bytes]:
+        """
+        导出打包后的事件记录，没有事件时为空
+        """
+        if not self.event_log:
+            return None
+        return self.event_log.pack(
+            club_ids=[int(self.lteam.club_id), int(self.rteam.club_id)],
+            player_ids=[[player.player_model.id for player in team.players] for team in (self.lteam, self.rteam)],
+        )
+
+    def get_kickoff(self) -> List[Dict]:
+        """
+        获取开球时两队的战术比重与首发阵容快照
+        :return: 两队快照，球员为[球员id, 位置, 初始体力, 能力字典]
+        """
+        return [
+            {
+                "club_id": int(team.club_id),
+                "tactic": dict(team.tactic),
+                "players": [
+                    [player.player_model.id, player.ori_location, player.stamina, dict(player.capa)]
+                    for player in team.players
+                ],
+            }
+            for team in (self.lteam, self.rteam)
+        ]
+
+    def export_replay(self) -> Optional[bytes]:
+        """
+        导出重放比赛所需的开球快照，与种子一起保存；未经GameEvE.simulate()模拟的比赛无法重放
+        :return: 二进制数据，无法重放时为None
+        """
+        if not self.kickoff:
+            return None
+        return KickoffSnapshot.pack(self.last_leg_drawn, self.kickoff)
 
     def init_hold_ball_team(self) -> Tuple[game_eve_app.Team, game_eve_app.Team]:
         """
         比赛开始时，随机选择持球队伍
         :return: 持球队伍，无球队伍
         """
-        hold_ball_team = random.choice([self.lteam, self.rteam])
+        hold_ball_team = self.rng.choice([self.lteam, self.rteam])
         no_ball_team = self.lteam if hold_ball_team == self.rteam else self.rteam
         return hold_ball_team, no_ball_team
 
@@ -587,225 +640,10 @@ class GameEvE:
 
     def rate(self):
         """
-        球员评分，写入到每一个球员实例的.data['real_rating']中
-        """
-        # 动作次数评分
-        average_actions = self.get_average_actions()
-        # 按动作数偏移值评分
-        if average_actions > 7:
-            # 总动作书超过7次 才开始为动作数评分 以免造成比赛初期评分波动较大的情况出现
-            for player in self.lteam.players:
-                if player.ori_location != game_configs.Location.GK:
-                    offset = self.get_offset_per(player.data["actions"], average_actions)
-                    self.rate_by_actions(player, offset)
-            for player in self.rteam.players:
-                if player.ori_location != game_configs.Location.GK:
-                    offset = self.get_offset_per(player.data["actions"], average_actions)
-                    self.rate_by_actions(player, offset)
-        # 各项动作准确率评分
-        average_pass_success = self.get_average_capa("pass_success", action_name="passes") / self.get_average_capa(
-            "passes", is_action=True
-        )
-        average_dribble_success = self.get_average_capa(
-            "dribble_success", action_name="dribbles"
-        ) / self.get_average_capa("dribbles", is_action=True)
-        average_tackle_success = self.get_average_capa("tackle_success", action_name="tackles") / self.get_average_capa(
-            "tackles", is_action=True
-        )
-        average_aerial_success = self.get_average_capa("aerial_success", action_name="aerials") / self.get_average_capa(
-            "aerials", is_action=True
-        )
-
-        for player in self.lteam.players:
-            if player.ori_location != game_configs.Location.GK:
-                if player.data["passes"] >= 5:
-                    # 动作次数不小于5次，才将其计入评分
-                    offset = self.get_offset_per(
-                        player.data["pass_success"] / player.data["passes"], average_pass_success
-                    )
-                    self.rate_by_capa(player, offset)
-                if player.data["dribbles"] >= 5:
-                    offset = self.get_offset_per(
-                        player.data["dribble_success"] / player.data["dribbles"], average_dribble_success
-                    )
-                    self.rate_by_capa(player, offset)
-                if player.data["tackles"] >= 5:
-                    offset = self.get_offset_per(
-                        player.data["tackle_success"] / player.data["tackles"], average_tackle_success
-                    )
-                    self.rate_by_capa(player, offset)
-                if player.data["aerials"] >= 5:
-                    offset = self.get_offset_per(
-                        player.data["aerial_success"] / player.data["aerials"], average_aerial_success
-                    )
-                    self.rate_by_capa(player, offset)
-        for player in self.rteam.players:
-            if player.ori_location != game_configs.Location.GK:
-                # 动作次数不小于5次才计入评分
-                if player.data["passes"] >= 5:
-                    offset = self.get_offset_per(
-                        player.data["pass_success"] / player.data["passes"], average_pass_success
-                    )
-                    self.rate_by_capa(player, offset)
-                if player.data["dribbles"] >= 5:
-                    offset = self.get_offset_per(
-                        player.data["dribble_success"] / player.data["dribbles"], average_dribble_success
-                    )
-                    self.rate_by_capa(player, offset)
-                if player.data["tackles"] >= 5:
-                    offset = self.get_offset_per(
-                        player.data["tackle_success"] / player.data["tackles"], average_tackle_success
-                    )
-                    self.rate_by_capa(player, offset)
-                if player.data["aerials"] >= 5:
-                    offset = self.get_offset_per(
-                        player.data["aerial_success"] / player.data["aerials"], average_aerial_success
-                    )
-                    self.rate_by_capa(player, offset)
-        # 其他加成
-        for player in self.lteam.players:
-            goals = player.data["goals"]
-            assists = player.data["assists"]
-            saves = player.data["save_success"]
-            player.data["real_rating"] += goals * 1.3 + assists * 0.8 + saves * 0.4
-        for player in self.rteam.players:
-            goals = player.data["goals"]
-            assists = player.data["assists"]
-            saves = player.data["save_success"]
-            player.data["real_rating"] += goals * 1.3 + assists * 0.8 + saves * 0.4
-        for player in self.lteam.players:
-            self.perf_rating(player.data["real_rating"], player)
-        for player in self.rteam.players:
-            self.perf_rating(player.data["real_rating"], player)
-
-    def get_average_actions(self) -> float:
-        """
-        获取动作数量的均值
-        :return: 均值
-        """
-        _sum = 0
-        for player in self.lteam.players:
-            _sum += player.data["actions"]
-        for player in self.rteam.players:
-            _sum += player.data["actions"]
-        return _sum / 22
-
-    def get_average_capa(self, capa_name: str, is_action=False, action_name: str = None) -> float:
+        球员评分，写入到每一个球员实例的.data['real_rating']与.data['final_rating']中
+        一个比赛日的多场比赛可调用finish(rate=False)后改用PlayerRater统一评分
         """
-        获取指定数据的平均值
-        :param capa_name: 数据名
-        :param is_action: 是否是动作
-        :param action_name: 如果不是动作，则其相应的动作名
-        :return: 均值
-        """
-        _sum = 0
-        count = 0
-        for player in self.lteam.players:
-            if is_action:
-                if player.data[capa_name] < 5:
-                    continue
-            else:
-                if player.data[action_name] < 5:
-                    continue
-            _sum += player.data[capa_name]
-            count += 1  # 说明有一个球员被选中参与评分
-        for player in self.rteam.players:
-            if is_action:
-                if player.data[capa_name] < 5:
-                    continue
-            else:
-                if player.data[action_name] < 5:
-                    continue
-            _sum += player.data[capa_name]
-            count += 1
-        if is_action and _sum == 0:
-            # 防止分母为零
-            _sum = 1
-        if count == 0:
-            return 1
-        else:
-            return _sum / count
-
-    @staticmethod
-    def get_offset_per(a, b) -> float:
-        """
-        获取a比b高或低的比例 可能为负
-        """
-        if b == 0:
-            return 0
-        else:
-            return (a - b) / b
-
-    @staticmethod
-    def rate_by_actions(player, offset):
-        """
-        动作数量的评分办法
-        :param player: 球员实例
-        :param offset: 与均值的偏移百分比
-        """
-        if 0.1 <= offset < 0.2:
-            player.data["real_rating"] += 0.3
-        if 0.2 <= offset < 0.4:
-            player.data["real_rating"] += 0.5
-        if 0.4 <= offset < 0.6:
-            player.data["real_rating"] += 0.8
-        if 0.6 <= offset < 0.8:
-            player.data["real_rating"] += 1.2
-        if 0.8 <= offset:
-            player.data["real_rating"] += 1.6
-        if -0.2 < offset <= -0.1:
-            player.data["real_rating"] -= 0.3
-        if -0.4 < offset <= -0.2:
-            player.data["real_rating"] -= 0.5
-        if -0.6 < offset <= -0.4:
-            player.data["real_rating"] -= 0.8
-        if -0.8 < offset <= -0.6:
-            player.data["real_rating"] -= 1.2
-        if offset <= -0.8:
-            player.data["real_rating"] -= 1.6
-
-    @staticmethod
-    def rate_by_capa(player, offset):
-        """
-        TODO 这种参数统统分离到game_configs里去
-        各项能力数值的评分办法
-        :param player: 球员实例
-        :param offset: 与均值的偏移值
-        """
-        if 0.1 <= offset < 0.2:
-            player.data["real_rating"] += 0.3
-        if 0.2 <= offset < 0.4:
-            player.data["real_rating"] += 0.6
-        if 0.4 <= offset < 0.6:
-            player.data["real_rating"] += 0.9
-        if 0.6 <= offset < 0.8:
-            player.data["real_rating"] += 1.2
-        if 0.8 <= offset:
-            player.data["real_rating"] += 1.5
-        if -0.2 < offset <= -0.1:
-            player.data["real_rating"] -= 0.3
-        if -0.4 < offset <= -0.2:
-            player.data["real_rating"] -= 0.6
-        if -0.6 < offset <= -0.4:
-            player.data["real_rating"] -= 1.0
-        if -0.8 < offset <= -0.6:
-            player.data["real_rating"] -= 1.3
-        if -1 < offset <= -0.8:
-            player.data["real_rating"] -= 1.6
-
-    @staticmethod
-    def perf_rating(rating, player):
-        """
-        调整评分在正常范围内
-        :param rating: 评分
-        :param player: 球员实例
-        """
-        rating = player.data["real_rating"]
-        if rating < 0:
-            rating = 0
-        if rating > 10:
-            rating = 10
-        player.data["final_rating"] = float(utils.retain_decimal(rating))
+        PlayerRater.rate([self])
 
     def get_highest_rating_player(self) -> game_eve_app.Player:
         """
@@ -1,69 +1,161 @@
 import datetime
+import random
 from typing import Optional
 
-import game_configs
 import models
 import schemas
 from modules import computed_data_app
+from modules.game_app import game_eve_app
 from sqlalchemy.orm import Session
-from utils import utils
+from utils import sampling
+
+
+class PlayerData:
+    """
+    球员场上数据，各项计数保存在槽位中；兼容按数据名读写，如data["goals"] += 1
+    """
+
+    __slots__ = (
+        "original_stamina",  # 初始体力
+        "actions",
+        "goals",
+        "assists",
+        "shots",
+        "dribbles",
+        "dribble_success",
+        "passes",
+        "pass_success",
+        "tackles",
+        "tackle_success",
+        "aerials",
+        "aerial_success",
+        "saves",
+        "save_success",
+        "final_rating",
+        "real_rating",  # 未取顶值的真实评分
+    )
+
+    def __init__(self, original_stamina: float = 0, final_rating: float = 6.0, real_rating: float = 6.0, **counters):
+        """
+        :param original_stamina: 初始体力
+        :param final_rating: 评分，初始为6.0
+        :param real_rating: 未取顶值的真实评分
+        :param counters: 其余各项计数的初始值，未给出的为0
+        """
+        self.original_stamina = original_stamina
+        self.final_rating = final_rating
+        self.real_rating = real_rating
+        for name in self.__slots__[1:-2]:
+            setattr(self, name, counters.pop(name, 0))
+        if counters:
+            raise KeyError("未知的球员数据{}".format(", ".join(counters)))
+
+    def __getitem__(self, data_name: str):
+        return getattr(self, data_name)
+
+    def __setitem__(self, data_name: str, value):
+        setattr(self, data_name, value)
+
+    def to_dict(self) -> dict:
+        """
+        导出为字典，仅在导出比赛数据时使用
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
 
 
 class Player:
     # 比赛球员类
-    def __init__(self, db: Session, player_model: models.Player, location: str, season: int, date: str):
+    __slots__ = (
+        "db",
+        "season",
+        "date",
+        "player_model",
+        "computed_player",
+        "name",
+        "slot",
+        "ori_location",
+        "real_location",
+        "capa",
+        "current_stamina",
+        "real_capa",
+        "data",
+        "rng",
+        "team",
+    )
+
+    def __init__(
+        self,
+        db: Session,
+        player_model: models.Player,
+        location: str,
+        season: int,
+        date: str,
+        computed_player: Optional["computed_data_app.ComputedPlayer"] = None,
+    ):
+        """
+        :param computed_player: 现成的计算球员实例，为空时根据player_model创建；子进程中传入球员快照
+        """
         self.db = db
         self.season = season
         self.date = date
         self.player_model = player_model
-        self.computed_player = computed_data_app.ComputedPlayer(
-            player_id=self.player_model.id,
-            db=self.db,
-            player_model=self.player_model,
-            season=self.season,
-            date=self.date,
+        self.computed_player = (
+            computed_player
+            if computed_player
+            else computed_data_app.ComputedPlayer(
+                player_id=self.player_model.id,
+                db=self.db,
+                player_model=self.player_model,
+                season=self.season,
+                date=self.date,
+            )
         )
         self.name = player_model.translated_name  # 解说用
+        self.slot = 0  # 在比赛中的槽位，用于事件记录
+        self.rng = random  # 随机数生成器，加入GameEvE后替换为比赛自身的随机数流
+        self.team: Optional["game_eve_app.Team"] = None  # 所属球队，体力下降时通知其更新能力均值
         self.ori_location = location  # 原本位置，不会变
         self.real_location = location  # 每个回合变化后的实时位置
         self.capa = dict()  # 球员能力字典
         self.init_capa()
         self.stamina = self.computed_player.get_real_stamina()  # 初始体力，会随着比赛进行而减少
         # self.data记录球员场上数据
-        self.data = dict()
+        self.data = PlayerData()
         self.init_data()
 
+    @property
+    def stamina(self) -> float:
+        """
+        实时体力
+        """
+        return self.current_stamina
+
+    @stamina.setter
+    def stamina(self, value: float):
+        self.current_stamina = value
+        self.expire_real_capa()
+
     def reset(self):
         self.init_capa()
         self.stamina = self.player_model.real_stamina
         self.init_data()
 
     def init_data(self):
-        self.data = {
-            "original_stamina": self.stamina,  # 初始体力
-            "actions": 0,
-            "goals": 0,
-            "assists": 0,
-            "shots": 0,
-            "dribbles": 0,
-            "dribble_success": 0,
-            "passes": 0,
-            "pass_success": 0,
-            "tackles": 0,
-            "tackle_success": 0,
-            "aerials": 0,
-            "aerial_success": 0,
-            "saves": 0,
-            "save_success": 0,
-            "final_rating": 6.0,  # 初始评分为6.0
-            "real_rating": 6.0,  # 未取顶值的真实评分
-        }
+        self.data = PlayerData(original_stamina=self.stamina)
 
     def init_capa(self):
         """
         将球员的各项能力值读入self.rating中
         """
         self.capa = self.computed_player.get_all_capa()
+        self.expire_real_capa()
+
+    def expire_real_capa(self):
+        """
+        能力或体力变化后，清除已计算的扣除体力debuff后的能力
+        """
+        # 体力能力本身不受实时体力影响
+        self.real_capa = {"stamina": self.capa["stamina"]}
 
     def export_game_player_data_schemas(self, created_time=datetime.datetime.now()) -> schemas.GamePlayerDataCreate:
         """
@@ -75,7 +167,7 @@ class Player:
             "created_time": created_time,
             "player_id": self.player_model.id,
             "location": self.ori_location,
-            **self.data,
+            **self.data.to_dict(),
             "final_stamina": self.stamina,
         }
         game_player_data = schemas.GamePlayerDataCreate(**data)
@@ -87,9 +179,10 @@ class Player:
         :param capa_name: 能力名称
         :return: 扣除体力debuff后的数据
         """
-        if capa_name == "stamina":
-            return self.capa["stamina"]
-        return self.capa[capa_name] * (self.stamina / 100)
+        real_capa = self.real_capa.get(capa_name)
+        if real_capa is None:
+            real_capa = self.real_capa[capa_name] = self.capa[capa_name] * (self.current_stamina / 100)
+        return real_capa
 
     def get_data(self, data_name: str) -> str:
         """
@@ -97,7 +190,7 @@ class Player:
         :param data_name: 数据名
         :return: 指定场上数据
         """
-        return self.data[data_name]
+        return getattr(self.data, data_name)
 
     def plus_data(self, data_name: str, average_stamina: Optional[float] = 0):
         """
@@ -117,39 +210,24 @@ class Player:
         elif data_name == "passes":
             stamina_diff = 1
 
-        self.data["actions"] += 1
-        if average_stamina and utils.select_by_pro({False: self.get_capa("stamina"), True: average_stamina}):
-            # 若capa stamina判定结果是False，则扣除体力
-            self.stamina -= stamina_diff
-
-        if self.stamina < 0:
-            self.stamina = 0
-        self.data[data_name] += 1
+        data = self.data
+        data.actions += 1
+        if average_stamina and not sampling.duel(self.real_capa["stamina"], average_stamina, self.rng):
+            # 若体力能力判定失败，则扣除体力
+            stamina = self.current_stamina
+            self.current_stamina = max(stamina - stamina_diff, 0)
+            if self.current_stamina != stamina:
+                self.expire_real_capa()
+                if self.team:
+                    self.team.expire_average_capability()
+        setattr(data, data_name, getattr(data, data_name) + 1)
 
     def shift_location(self):
         """
         确定每次战术的场上位置
-        TODO 将概率值抽离出来作为可更改的全局变量
-        """
-        location = game_configs.Location
-
-        if self.ori_location == game_configs.Location.CM:
-            # 中场有概率前压或后撤
-            self.real_location = utils.select_by_pro({location.ST: 10, location.CB: 10, location.CM: 80})
-        elif self.ori_location == location.LB:
-            self.real_location = utils.select_by_pro({location.LW: 20, location.LB: 80})
-        elif self.ori_location == location.RB:
-            self.real_location = utils.select_by_pro({location.RW: 20, location.RB: 80})
-        elif self.ori_location == location.CAM:
-            self.real_location = utils.select_by_pro({location.ST: 40, location.CM: 60})
-        elif self.ori_location == location.LM:
-            self.real_location = utils.select_by_pro({location.LW: 25, location.CM: 60, location.LB: 15})
-        elif self.ori_location == location.RM:
-            self.real_location = utils.select_by_pro({location.RW: 40, location.CM: 60, location.RB: 15})
-        elif self.ori_location == location.CDM:
-            self.real_location = utils.select_by_pro({location.CB: 40, location.CM: 60})
-        else:
-            self.real_location = self.ori_location
+        """
+        shift_table = sampling.location_shift_tables.get(self.ori_location)
+        self.real_location = shift_table.sample(self.rng) if shift_table else self.ori_location
 
     def get_location(self):
         """
@@ -1,6 +1,5 @@
 import datetime
-import random
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 import crud
 import game_configs
@@ -9,10 +8,26 @@ import schemas
 from modules.game_app import game_eve_app
 from modules.game_app.player_selector import PlayerSelector
 from sqlalchemy.orm import Session
-from utils import logger, utils
+from utils import logger, sampling
 
 
 class Team:
+    tactic_items: Tuple = ()  # 编译战术累积分布表时的战术比重
+    tactic_tables: Tuple[sampling.CdfTable, sampling.CdfTable] = ()
+    # 各战术需要的场上位置，场上没有其中任一位置的球员时该战术不可用，为空时总可使用
+    tactic_locations = {
+        "wing_cross": (
+            game_configs.Location.LW,
+            game_configs.Location.RW,
+            game_configs.Location.LB,
+            game_configs.Location.RB,
+        ),
+        "under_cutting": (game_configs.Location.LW, game_configs.Location.RW),
+        "pull_back": (game_configs.Location.LW, game_configs.Location.RW),
+        "middle_attack": (game_configs.Location.CM,),
+        "counter_attack": (),
+    }
+
     def __init__(
         self,
         db: Session,
@@ -21,7 +36,11 @@ class Team:
         season: int,
         date: str,
         club_model: models.Club = None,
+        lineup: Optional[List[Tuple]] = None,
     ):
+        """
+        :param lineup: 已选好的首发阵容，元素为(球员实例, 位置, 计算球员实例)，为空时由PlayerSelector挑选
+        """
         self.db = db
         self.game = game
         self.season = season
@@ -32,7 +51,8 @@ class Team:
         self.tactic = dict()  # 战术比重字典
         self.init_tactic()
         self.players: List[game_eve_app.Player] = []  # 球员列表
-        self.init_players()
+        self.init_players(lineup)
+        self.init_indexes()
         self.score: int = 0  # 本方比分
 
         # self.data记录俱乐部场上数据
@@ -48,6 +68,7 @@ class Team:
         self.init_data()
         for player in self.players:
             player.reset()
+        self.init_indexes()
 
     def init_data(self):
         self.data = {
@@ -74,23 +95,47 @@ class Team:
         self.tactic["middle_attack"] = self.team_model.coach.middle_attack
         self.tactic["counter_attack"] = self.team_model.coach.counter_attack
 
-    def init_players(self):
+    def init_players(self, lineup: Optional[List[Tuple]] = None):
         """
         挑选球员 并写入self.players中
-        """
-        player_selector = PlayerSelector(
-            club_id=self.club_id, db=self.game.db, club_model=self.team_model, season=self.season, date=self.date
-        )
-        players_model, locations_list = player_selector.select_players()
-        for player_model, location in zip(players_model, locations_list):
+        :param lineup: 已选好的首发阵容，为空时由PlayerSelector挑选
+        """
+        if lineup is None:
+            player_selector = PlayerSelector(
+                club_id=self.club_id,
+                db=self.game.db,
+                club_model=self.team_model,
+                season=self.season,
+                date=self.date,
+                rng=self.game.lineup_rng,
+            )
+            players_model, locations_list = player_selector.select_players()
+            lineup = [(player_model, location, None) for player_model, location in zip(players_model, locations_list)]
+        for player_model, location, computed_player in lineup:
             self.players.append(
                 game_eve_app.Player(
-                    db=self.db, player_model=player_model, location=location, season=self.season, date=self.date
+                    db=self.db,
+                    player_model=player_model,
+                    location=location,
+                    season=self.season,
+                    date=self.date,
+                    computed_player=computed_player,
                 )
             )
         if len(self.players) != 11:
             logger.warning("队伍仅有{}人！".format(len(self.players)))
 
+    def init_indexes(self):
+        """
+        初始化本回合的球队索引：各位置的球员、可用战术与能力均值，均在首次使用时计算
+        球员位置刷新时整体失效，球员体力下降时仅受体力影响的能力均值失效
+        """
+        self.location_players: Dict[Tuple, List[game_eve_app.Player]] = {}  # 位置元组与该位置上的球员
+        self.tactic_mask: Optional[Dict[str, bool]] = None  # 各战术是否可用
+        self.average_capa: Dict[str, float] = {}  # 能力名与队内均值
+        for player in self.players:
+            player.team = self
+
     def export_game_team_data_schemas(self, created_time=datetime.datetime.now()) -> schemas.GameTeamDataCreate:
         """
         导出球队数据至GameTeamData
@@ -115,12 +160,21 @@ class Team:
         game_team_info = schemas.GameTeamInfoCreate(**data)
         return game_team_info
 
-    def add_script(self, text: str, status: str):
+    def add_event(
+        self,
+        code: game_configs.Event,
+        actor: Optional[Union[game_eve_app.Player, "Team"]] = None,
+        target: Optional[Union[game_eve_app.Player, "Team"]] = None,
+        value1: int = 0,
+        value2: int = 0,
+    ):
         """
-        添加解说
-        :param text: 解说词
+        记录比赛事件
+        :param code: 事件代码
+        :param actor: 发起者
+        :param target: 对象
         """
-        self.game.add_script(text, status)
+        self.game.add_event(code, actor, target, value1, value2)
 
     def record_goal(self, player: game_eve_app.Player):
         """
@@ -146,6 +200,8 @@ class Team:
         """
         for player in self.players:
             player.capa[capa_name] = num
+            player.expire_real_capa()
+        self.average_capa.clear()
 
     def get_rival_team(self) -> "Team":
         """
@@ -172,37 +228,46 @@ class Team:
             self.data["attempts"] += 1
         self.data[data_name] += 1
 
+    def get_tactic_tables(self) -> Tuple[sampling.CdfTable, sampling.CdfTable]:
+        """
+        获取战术比重的累积分布表，战术比重改变时重新编译
+        :return: 不含防反与含防反的累积分布表
+        """
+        tactic_items = tuple(self.tactic.items())
+        if tactic_items != self.tactic_items:
+            tactic_pro = dict(tactic_items)
+            tactic_pro.pop("counter_attack")  # 无防反
+            self.tactic_items = tactic_items
+            self.tactic_tables = (sampling.CdfTable(tactic_pro), sampling.CdfTable(self.tactic))
+        return self.tactic_tables
+
     def select_tactic(self, counter_attack_permitted: bool):
         """
         选择进攻战术
         :param counter_attack_permitted: 是否允许使用防反
         :return: 战术名
         """
-        tactic_pro_total = self.tactic.copy()
-        tactic_pro = self.tactic.copy()
-        tactic_pro.pop("counter_attack")  # 无防反
+        tactic_table = self.get_tactic_tables()[counter_attack_permitted]
         while True:
-            tactic_name = (
-                utils.select_by_pro(tactic_pro_total) if counter_attack_permitted else utils.select_by_pro(tactic_pro)
-            )
-            if tactic_name == "wing_cross" and not self.get_location_players(
-                (game_configs.Location.LW, game_configs.Location.RW, game_configs.Location.LB, game_configs.Location.RB)
-            ):
-                continue
-            if tactic_name == "under_cutting" and not self.get_location_players(
-                (game_configs.Location.LW, game_configs.Location.RW)
-            ):
-                continue
-            if tactic_name == "pull_back" and not self.get_location_players(
-                (game_configs.Location.LW, game_configs.Location.RW)
-            ):
-                continue
-            if tactic_name == "middle_attack" and not self.get_location_players((game_configs.Location.CM,)):
+            tactic_name = tactic_table.sample(self.game.rng)
+            if self.get_tactic_mask()[tactic_name]:
+                return tactic_name
+            if tactic_name == "middle_attack":
+                # 没有中场时重新刷新位置后再选
                 self.shift_location()
-            else:
-                break
 
-        return tactic_name
+    def get_tactic_mask(self) -> Dict[str, bool]:
+        """
+        获取本回合各战术是否可用
+        :return: 战术名与是否可用
+        """
+        if self.tactic_mask is None:
+            locations = {player.real_location for player in self.players}
+            self.tactic_mask = {
+                tactic_name: not required or not locations.isdisjoint(required)
+                for tactic_name, required in self.tactic_locations.items()
+            }
+        return self.tactic_mask
 
     def get_average_capability(self, capa_name: str) -> float:
         """
@@ -210,15 +275,30 @@ class Team:
         :param capa_name: 能力名
         :return: 队内均值
         """
-        average_capa = sum([player.get_capa(capa_name) for player in self.players]) / len(self.players)
+        average_capa = self.average_capa.get(capa_name)
+        if average_capa is None:
+            average_capa = sum([player.get_capa(capa_name) for player in self.players]) / len(self.players)
+            self.average_capa[capa_name] = average_capa
         return average_capa
 
+    def expire_average_capability(self):
+        """
+        球员体力下降后，清除受实时体力影响的能力均值；体力能力不受实时体力影响，予以保留
+        """
+        average_stamina = self.average_capa.get("stamina")
+        self.average_capa.clear()
+        if average_stamina is not None:
+            self.average_capa["stamina"] = average_stamina
+
     def shift_location(self):
         """
-        所有球员刷新场上位置
+        所有球员刷新场上位置，并使本回合的索引失效
         """
         for player in self.players:
             player.shift_location()
+        self.location_players = {}
+        self.tactic_mask = None
+        self.average_capa = {}
 
     def get_location_players(self, location_tuple: tuple) -> List[game_eve_app.Player]:
         """
@@ -226,12 +306,12 @@ class Team:
         :param location_tuple: 位置名
         :return: 球员实例列表
         """
-        return [player for player in self.players if player.get_location() in location_tuple]
-        # player_list = []
-        # for player in self.players:
-        #     if player.get_location() in location_tuple:
-        #         player_list.append(player)
-        # return player_list
+        players = self.location_players.get(location_tuple)
+        if players is None:
+            players = [player for player in self.players if player.real_location in location_tuple]
+            self.location_players[location_tuple] = players
+        # 调用方会从列表中移除球员，返回副本
+        return players.copy()
 
     def attack(self, rival_team: "Team", counter_attack_permitted=False) -> bool:
         """
@@ -273,15 +353,9 @@ class Team:
         点球与扑救
         :return: 是否进球
         """
-        self.add_script("{}罚出点球！".format(shooter.name), "n")
+        self.add_event(game_configs.Event.penalty_kick, shooter)
         # 点球 为射手增加30点能力
-        win_player = utils.select_by_pro(
-            {shooter: shooter.get_capa("shooting") + 30, keeper: keeper.get_capa("goalkeeping")}
-        )
-        if win_player == shooter:
-            return True
-        else:
-            return False
+        return sampling.duel(shooter.get_capa("shooting") + 30, keeper.get_capa("goalkeeping"), self.game.rng)
 
     def shot_and_save(
         self,
@@ -296,42 +370,37 @@ class Team:
         :param assister: 助攻球员实例
         :return: 进攻是否成功
         """
-        self.add_script("{}起脚打门！".format(attacker.name), "c")
+        self.add_event(game_configs.Event.shot, attacker)
         if defender:
             average_stamina = self.get_rival_team().get_average_capability("stamina")
             attacker.plus_data("shots", average_stamina)
             defender.plus_data("saves", average_stamina)
-            win_player = utils.select_by_pro(
-                {attacker: attacker.get_capa("shooting"), defender: defender.get_capa("goalkeeping")}
-            )
+            is_goal = sampling.duel(attacker.get_capa("shooting"), defender.get_capa("goalkeeping"), self.game.rng)
         else:
             average_stamina = self.get_rival_team().get_average_capability("stamina")
             attacker.plus_data("shots", average_stamina)
-            win_player = attacker
-        if win_player == attacker:
+            is_goal = True
+        if is_goal:
             # 比分直接在这儿改写，省的在每处调用后都要改写比分
             self.score += 1
             attacker.plus_data("goals")
             if assister:
                 assister.plus_data("assists")
-            self.add_script(
-                "球进啦！{} {}:{} {}".format(
-                    self.game.lteam.name, self.game.lteam.score, self.game.rteam.score, self.game.rteam.name
-                ),
-                "n",
+            self.add_event(
+                game_configs.Event.goal, attacker, value1=self.game.lteam.score, value2=self.game.rteam.score
             )
             if attacker.get_data("goals") == 2:
-                self.add_script("{}梅开二度！".format(attacker.name), "n")
+                self.add_event(game_configs.Event.brace, attacker)
             if attacker.get_data("goals") == 3:
-                self.add_script("{}帽子戏法！".format(attacker.name), "n")
+                self.add_event(game_configs.Event.hat_trick, attacker)
             if attacker.get_data("goals") == 4:
-                self.add_script("{}大四喜！".format(attacker.name), "n")
+                self.add_event(game_configs.Event.haul, attacker)
             # 记录进球
             self.record_goal(player=attacker)
             return True
         else:
             defender.plus_data("save_success")
-            self.add_script("{}发挥神勇，扑出这脚劲射".format(defender.name), "c")
+            self.add_event(game_configs.Event.save, defender)
             return False
 
     def dribble_and_block(self, attacker: game_eve_app.Player, defender: game_eve_app.Player) -> bool:
@@ -351,16 +420,13 @@ class Team:
         attacker.plus_data("dribbles", average_stamina)
         defender.plus_data("tackles", average_stamina)
         # 比拼进攻球员的过人与防守球员的抢断
-        win_player = utils.select_by_pro(
-            {attacker: attacker.get_capa("dribbling"), defender: defender.get_capa("interception")}
-        )
-        if win_player == attacker:
+        if sampling.duel(attacker.get_capa("dribbling"), defender.get_capa("interception"), self.game.rng):
             attacker.plus_data("dribble_success")
-            self.add_script("{}过掉了{}".format(attacker.name, defender.name), "c")
+            self.add_event(game_configs.Event.dribble_past, attacker, defender)
             return True
         else:
             defender.plus_data("tackle_success")
-            self.add_script("{}阻截了{}的进攻".format(defender.name, attacker.name), "c")
+            self.add_event(game_configs.Event.tackle, defender, attacker)
             return False
 
     def sprint_dribble_and_block(
@@ -374,20 +440,23 @@ class Team:
         """
         average_stamina = self.get_rival_team().get_average_capability("stamina")
         if not defenders:
-            return True, random.choice(attackers)  # 随机选一个进攻球员持球
+            return True, self.game.rng.choice(attackers)  # 随机选一个进攻球员持球
         if not attackers:
-            return False, random.choice(defenders)  # 随机选一个防守球员持球
+            return False, self.game.rng.choice(defenders)  # 随机选一个防守球员持球
         while True:
-            attacker = random.choice(attackers)
-            defender = random.choice(defenders)
+            attacker = self.game.rng.choice(attackers)
+            defender = self.game.rng.choice(defenders)
             attacker.plus_data("dribbles", average_stamina)
             defender.plus_data("tackles", average_stamina)
             # 开始数值判定
-            win_player = utils.select_by_pro(
-                {
-                    attacker: attacker.get_capa("dribbling") + attacker.get_capa("pace"),
-                    defender: defender.get_capa("interception") + defender.get_capa("pace"),
-                }
+            win_player = (
+                attacker
+                if sampling.duel(
+                    attacker.get_capa("dribbling") + attacker.get_capa("pace"),
+                    defender.get_capa("interception") + defender.get_capa("pace"),
+                    self.game.rng,
+                )
+                else defender
             )
             if win_player == attacker:
                 attacker.plus_data("dribble_success")
@@ -396,10 +465,10 @@ class Team:
                 defender.plus_data("tackle_success")
                 attackers.remove(attacker)
             if not attackers:
-                self.add_script("{}抢到皮球".format(win_player.name), "c")
+                self.add_event(game_configs.Event.win_ball, win_player)
                 return False, win_player
             elif not defenders:
-                self.add_script("{}过掉了{}".format(win_player.name, defender.name), "c")
+                self.add_event(game_configs.Event.dribble_past, win_player, defender)
                 return True, win_player
             else:
                 pass
@@ -414,27 +483,26 @@ class Team:
         :return: 进攻是否成功、争顶成功的球员
         """
         if not defenders:
-            return True, random.choice(attackers)  # 随机选一个进攻球员持球
+            return True, self.game.rng.choice(attackers)  # 随机选一个进攻球员持球
         if not attackers:
-            return False, random.choice(defenders)  # 随机选一个防守球员持球
+            return False, self.game.rng.choice(defenders)  # 随机选一个防守球员持球
 
-        self.add_script("球员们尝试争顶", "c")
+        self.add_event(game_configs.Event.aerial)
         average_stamina = self.get_rival_team().get_average_capability("stamina")
         while True:
-            attacker = random.choice(attackers)
-            defender = random.choice(defenders)
+            attacker = self.game.rng.choice(attackers)
+            defender = self.game.rng.choice(defenders)
             attacker.plus_data("aerials", average_stamina)
             defender.plus_data("aerials", average_stamina)
-            win_player = utils.select_by_pro(
-                {
-                    attacker: attacker.get_capa("anticipation") + attacker.get_capa("strength"),
-                    defender: defender.get_capa("anticipation") + defender.get_capa("strength"),
-                }
+            win_player = (
+                attacker
+                if sampling.duel(
+                    attacker.get_capa("anticipation") + attacker.get_capa("strength"),
+                    defender.get_capa("anticipation") + defender.get_capa("strength"),
+                    self.game.rng,
+                )
+                else defender
             )
-            if not win_player:
-                print(attacker.get_capa("anticipation") + attacker.get_capa("strength"))
-                print(defender.get_capa("anticipation") + defender.get_capa("strength"))
-                raise ValueError("win_player 不存在！")
             win_player.plus_data("aerial_success")
             if win_player == attacker:
                 defenders.remove(defender)
@@ -443,7 +511,7 @@ class Team:
             if not attackers:
                 return False, win_player
             elif not defenders:
-                self.add_script("{}抢到球权".format(win_player.name), "c")
+                self.add_event(game_configs.Event.win_possession, win_player)
                 return True, win_player
             else:
                 pass
@@ -460,14 +528,10 @@ class Team:
         attacker.plus_data("passes", average_stamina)
         if is_long_pass:
             # 若是长传，成功率减半
-            win_player = utils.select_by_pro(
-                {attacker: attacker.get_capa("passing") / 2, defender_average: defender_average / 2}
-            )
+            is_success = sampling.duel(attacker.get_capa("passing") / 2, defender_average / 2, self.game.rng)
         else:
-            win_player = utils.select_by_pro(
-                {attacker: attacker.get_capa("passing"), defender_average: defender_average / 2}
-            )
-        if win_player == attacker:
+            is_success = sampling.duel(attacker.get_capa("passing"), defender_average / 2, self.game.rng)
+        if is_success:
             attacker.plus_data("pass_success")
             return True
         else:
@@ -485,11 +549,11 @@ class Team:
         :return: 是否交换球权
         """
         self.plus_data("wing_cross")
-        self.add_script("\n{}尝试下底传中".format(self.name), "d")
+        self.add_event(game_configs.Event.wing_cross, self)
 
         # 边锋或边卫过边卫
         while True:
-            flag = utils.is_happened_by_pro(0.5)
+            flag = sampling.happened(0.5, self.game.rng)
             # TODO 选择左路还是右路现在是随机实现，可以改
             if flag:
                 wings = self.get_location_players((game_configs.Location.LW, game_configs.Location.LB))
@@ -505,7 +569,7 @@ class Team:
         state, win_player = self.sprint_dribble_and_block(wings, wing_backs)  # 一对一或一对多
         if state:
             # 边锋/卫传中
-            self.add_script("{}一脚起球传中".format(win_player.name), "c")
+            self.add_event(game_configs.Event.cross, win_player)
             state = self.pass_ball(win_player, rival_team.get_average_capability("passing"), is_long_pass=True)
             if state:
                 # 争顶
@@ -517,23 +581,24 @@ class Team:
                 state, win_player = self.drop_ball(strikers, centre_backs)
                 if state:
                     # 射门
-                    goal_keeper = rival_team.get_location_players((game_configs.Location.GK,))[0]  # 这个[0]是以防万一。。
+                    goal_keepers = rival_team.get_location_players((game_configs.Location.GK,))
+                    goal_keeper = goal_keepers[0]  # 这个[0]是以防万一。。
                     state = self.shot_and_save(win_player, goal_keeper, assister)
                     if state:
                         # 进球啦！
                         self.plus_data("wing_cross_success")
                 else:
                     # 防守球员解围
-                    self.add_script("{}将球解围".format(win_player.name), "c")
+                    self.add_event(game_configs.Event.clearance, win_player)
                     # 进行一次球权判定
                     state = rival_team.pass_ball(win_player, self.get_average_capability("passing"), is_long_pass=True)
                     if not state:
-                        self.add_script("进攻方仍然持球", "c")
+                        self.add_event(game_configs.Event.attacker_keeps_ball)
                         return False
                     else:
-                        self.add_script("{}拿到球权".format(rival_team.name), "c")
+                        self.add_event(game_configs.Event.gain_possession, rival_team)
             else:
-                self.add_script("{}抢到球权".format(rival_team.name), "c")
+                self.add_event(game_configs.Event.win_possession, rival_team)
 
         return True
 
@@ -544,24 +609,24 @@ class Team:
         :return: 是否交换球权
         """
         self.plus_data("under_cutting")
-        self.add_script("\n{}尝试边路内切".format(self.name), "d")
+        self.add_event(game_configs.Event.under_cutting, self)
         # 边锋过边卫
-        wing = random.choice(self.get_location_players((game_configs.Location.LW, game_configs.Location.RW)))
+        wing = self.game.rng.choice(self.get_location_players((game_configs.Location.LW, game_configs.Location.RW)))
         if wing.get_location() == game_configs.Location.LW:
             wing_backs = rival_team.get_location_players((game_configs.Location.RB,))
         elif wing.get_location() == game_configs.Location.RW:
             wing_backs = rival_team.get_location_players((game_configs.Location.LB,))
         else:
             raise ValueError("边锋不存在！")  # 之前都判定过的，应该不会出现这种情况
-        self.add_script("{}拿球，尝试过人".format(wing.name), "c")
+        self.add_event(game_configs.Event.take_on, wing)
         state, win_player = self.sprint_dribble_and_block([wing], wing_backs)  # 一对一或一对多
         if state:
             # 边锋内切
-            self.add_script("{}尝试内切".format(win_player.name), "c")
+            self.add_event(game_configs.Event.cut_inside, win_player)
             centre_backs = rival_team.get_location_players((game_configs.Location.CB,))
             while len(centre_backs) > 2:
                 # 使防守球员上限不超过2个
-                player = random.choice(centre_backs)
+                player = self.game.rng.choice(centre_backs)
                 centre_backs.remove(player)
             if not centre_backs:
                 # 这一步是防一手那些不带中后卫的憨批阵型
@@ -584,37 +649,37 @@ class Team:
         :return: 是否交换球权
         """
         self.plus_data("pull_back")
-        self.add_script("\n{}尝试倒三角传球".format(self.name), "d")
+        self.add_event(game_configs.Event.pull_back, self)
         # 边锋过边卫
-        wing = random.choice(self.get_location_players((game_configs.Location.LW, game_configs.Location.RW)))
+        wing = self.game.rng.choice(self.get_location_players((game_configs.Location.LW, game_configs.Location.RW)))
         if wing.get_location() == game_configs.Location.LW:
             wing_backs = rival_team.get_location_players((game_configs.Location.RB,))
         elif wing.get_location() == game_configs.Location.RW:
             wing_backs = rival_team.get_location_players((game_configs.Location.LB,))
         else:
             raise ValueError("边锋不存在！")
-        self.add_script("{}拿球，尝试过人".format(wing.name), "c")
+        self.add_event(game_configs.Event.take_on, wing)
         state, win_player = self.sprint_dribble_and_block([wing], wing_backs)  # 一对一或一对多
         if state:
             # 边锋内切
             assister = win_player
-            self.add_script("{}尝试内切".format(win_player.name), "c")
+            self.add_event(game_configs.Event.cut_inside, win_player)
             # 随机选一个中卫
             centre_backs = rival_team.get_location_players((game_configs.Location.CB,))
             if not centre_backs:
                 state = True
             else:
-                centre_back = random.choice(centre_backs)
+                centre_back = self.game.rng.choice(centre_backs)
                 state = self.dribble_and_block(win_player, centre_back)  # 过一个中卫即可
             if state:
                 # 倒三角传球
-                self.add_script("{}倒三角传中".format(win_player.name), "c")
+                self.add_event(game_configs.Event.pull_back_pass, win_player)
                 state = self.pass_ball(win_player, rival_team.get_average_capability("passing"))
                 if state:
                     shooters = self.get_location_players((game_configs.Location.ST, game_configs.Location.CM))
                     if not shooters:
                         return True
-                    shooter = random.choice(shooters)
+                    shooter = self.game.rng.choice(shooters)
                     goal_keeper = rival_team.get_location_players((game_configs.Location.GK,))[0]
                     state = self.shot_and_save(shooter, goal_keeper, assister)
                     if state:
@@ -628,13 +693,13 @@ class Team:
         :return: 是否交换球权
         """
         self.plus_data("middle_attack")
-        self.add_script("\n{}尝试中路渗透".format(self.name), "d")
+        self.add_event(game_configs.Event.middle_attack, self)
         count_dict = {}
         for _ in range(10):
             # 10次循环，若其中有一次循环：所有中场球员传球均失败，即丢失球权，否则传球成功
             midfielders = self.get_location_players((game_configs.Location.CM,))
             while True:
-                player = random.choice(midfielders)
+                player = self.game.rng.choice(midfielders)
                 flag = self.pass_ball(player, rival_team.get_average_capability("passing"))
                 if flag:
                     # 若传球成功，进入下一次循环
@@ -642,7 +707,7 @@ class Team:
                     break
                 midfielders.remove(player)
                 if not midfielders:
-                    self.add_script("{}丢失了球权".format(self.name), "c")
+                    self.add_event(game_configs.Event.lose_possession, self)
                     return True
         # 取成功数最多次的球员为助攻者
         assister = sorted(count_dict.items(), key=lambda x: x[1], reverse=True)[0][0]
@@ -661,7 +726,7 @@ class Team:
                 self.plus_data("middle_attack_success")
         else:
             # 防守球员解围
-            self.add_script("{}将球解围".format(win_player.name), "c")
+            self.add_event(game_configs.Event.clearance, win_player)
             state = rival_team.pass_ball(win_player, self.get_average_capability("passing"), is_long_pass=True)
             if state:
                 # 外围争顶
@@ -677,7 +742,7 @@ class Team:
                     state, win_player = rival_team.drop_ball(strikers, centre_backs)
                 if state:
                     return True
-            self.add_script("进攻方仍然持球", "c")
+            self.add_event(game_configs.Event.attacker_keeps_ball)
             return False
         return True
 
@@ -688,18 +753,20 @@ class Team:
         :return: 是否交换球权
         """
         self.plus_data("counter_attack")
-        self.add_script("\n{}尝试防守反击".format(self.name), "d")
+        self.add_event(game_configs.Event.counter_attack, self)
         # 随便选一个球员传球
-        passing_player = random.choice(self.get_location_players((game_configs.Location.GK, game_configs.Location.CB)))
+        passing_player = self.game.rng.choice(
+            self.get_location_players((game_configs.Location.GK, game_configs.Location.CB))
+        )
         state = self.pass_ball(passing_player, rival_team.get_average_capability("passing"))
         if state:
             # 过人
-            self.add_script("{}一脚长传，直击腹地".format(passing_player.name), "c")
+            self.add_event(game_configs.Event.long_ball, passing_player)
             assister = passing_player
             strikers = self.get_location_players((game_configs.Location.ST,))
             centre_backs = rival_team.get_location_players((game_configs.Location.CB,))
             if not strikers:
-                self.add_script("很可惜，无锋阵容没有中锋进行接应，球权被{}夺去".format(rival_team.name), "c")
+                self.add_event(game_configs.Event.no_striker, rival_team)
                 return True
             state, win_player = self.sprint_dribble_and_block(strikers, centre_backs)
             if state:
@@ -708,6 +775,6 @@ class Team:
                 state = self.shot_and_save(win_player, goal_keeper, assister)
                 if state:
                     self.plus_data("counter_attack_success")
-        self.add_script("{}策动的长传被拦截".format(passing_player.name), "c")
-        self.add_script("{}持球".format(rival_team.name), "c")
+        self.add_event(game_configs.Event.long_ball_intercepted, passing_player)
+        self.add_event(game_configs.Event.hold_ball, rival_team)
         return True
@@ -1,13 +1,13 @@
 import json
 import random
-from typing import List, Tuple
+from typing import List, Optional, Tuple, Union
 
 import crud
 import game_configs
 import schemas
 from modules.game_app import game_eve_app, game_pve_app
 from sqlalchemy.orm import Session
-from utils import logger
+from utils import EventLog, logger
 
 
 class GamePvE(game_eve_app.GameEvE):
@@ -25,6 +25,10 @@ class GamePvE(game_eve_app.GameEvE):
         self.season = self.game_pve_models.season
         self.date = self.game_pve_models.date
         self.script = self.game_pve_models.script
+        self.event_log = EventLog()  # 不记录事件，解说已实时生成
+        self.seed = None  # 比赛跨多个请求进行，不保存种子，也无法重放
+        self.rng = random
+        self.kickoff = None
         self.type = self.game_pve_models.type
         self.name = self.game_pve_models.name
         self.save_id = self.game_pve_models.save_id
@@ -40,6 +44,28 @@ class GamePvE(game_eve_app.GameEvE):
             else:
                 self.rteam = game_pve_app.TeamPvE(db=self.db, game=self, team_pve_model=t)
 
+    def add_event(
+        self,
+        code: game_configs.Event,
+        actor: Optional[Union[game_eve_app.Player, game_eve_app.Team]] = None,
+        target: Optional[Union[game_eve_app.Player, game_eve_app.Team]] = None,
+        value1: int = 0,
+        value2: int = 0,
+    ):
+        """
+        重写方法 玩家需要实时查看每回合的解说，直接生成解说词
+        """
+        text, status = EventLog.format_event(
+            code,
+            actor.name if actor else None,
+            target.name if target else None,
+            value1,
+            value2,
+            self.lteam.name,
+            self.rteam.name,
+        )
+        self.add_script(text, status)
+
     def add_script(self, text: str, status: str) -> None:
         """
         重写方法 添加解说
@@ -264,18 +290,17 @@ class GamePvE(game_eve_app.GameEvE):
                 if self.type == "champions2to1":
                     return True
                 else:
-                    query_str = (
-                        "and_(models.Game.save_id=='{}', models.Game.season=='{}', models.Game.type=='{}')".format(
-                            self.save_id, int(self.season), self.type
-                        )
+                    # 同阶段已有首回合，这一轮加时
+                    tie = crud.get_knockout_tie(
+                        self.db,
+                        self.save_id,
+                        int(self.season),
+                        self.name,
+                        self.type,
+                        self.lteam.club_id,
+                        self.rteam.club_id,
                     )
-                    games = crud.get_games_by_attri(db=self.db, query_str=query_str)  # 查找同阶段的其他比赛
-                    for game in games:
-                        team1 = game.teams[0]
-                        team2 = game.teams[1]
-                        if self.lteam.club_id == team2.club_id or self.lteam.club_id == team1.club_id:  # 查找这两队上一次比赛
-                            # 上一轮打平，这一轮加时
-                            return True
+                    return tie is not None and tie.legs == 1
         return False
 
     def save_temporary_table(self, exchange_ball: bool, original_score: Tuple[int, int]):
@@ -1,3 +1,5 @@
+import random
+
 import crud
 import models
 from modules import computed_data_app
@@ -27,6 +29,9 @@ class PlayerPvE(game_eve_app.Player):
         )
 
         self.name = self.player_model.translated_name  # 解说用
+        self.slot = 0
+        self.rng = random
+        self.team = None
         self.ori_location = self.player_pve_model.ori_location  # 原本位置，不会变
         self.real_location = self.player_pve_model.real_location  # 每个回合变化后的实时位置
         self.capa = dict()  # 球员能力字典
@@ -49,25 +54,25 @@ class PlayerPvE(game_eve_app.Player):
             self.db.commit()
 
     def init_data(self):
-        self.data = {
-            "original_stamina": self.player_pve_model.original_stamina,  # 初始体力
-            "actions": self.player_pve_model.actions,
-            "goals": self.player_pve_model.goals,
-            "assists": self.player_pve_model.assists,
-            "shots": self.player_pve_model.shots,
-            "dribbles": self.player_pve_model.dribbles,
-            "dribble_success": self.player_pve_model.dribble_success,
-            "passes": self.player_pve_model.passes,
-            "pass_success": self.player_pve_model.pass_success,
-            "tackles": self.player_pve_model.tackles,
-            "tackle_success": self.player_pve_model.tackle_success,
-            "aerials": self.player_pve_model.aerials,
-            "aerial_success": self.player_pve_model.aerial_success,
-            "saves": self.player_pve_model.saves,
-            "save_success": self.player_pve_model.save_success,
-            "final_rating": 6.0,  # 每次评分重置为默认值
-            "real_rating": 6.0,
-        }
+        self.data = game_eve_app.PlayerData(
+            original_stamina=self.player_pve_model.original_stamina,  # 初始体力
+            actions=self.player_pve_model.actions,
+            goals=self.player_pve_model.goals,
+            assists=self.player_pve_model.assists,
+            shots=self.player_pve_model.shots,
+            dribbles=self.player_pve_model.dribbles,
+            dribble_success=self.player_pve_model.dribble_success,
+            passes=self.player_pve_model.passes,
+            pass_success=self.player_pve_model.pass_success,
+            tackles=self.player_pve_model.tackles,
+            tackle_success=self.player_pve_model.tackle_success,
+            aerials=self.player_pve_model.aerials,
+            aerial_success=self.player_pve_model.aerial_success,
+            saves=self.player_pve_model.saves,
+            save_success=self.player_pve_model.save_success,
+            final_rating=6.0,  # 每次评分重置为默认值
+            real_rating=6.0,
+        )
 
     def save_temporary_table(self):
         self.player_pve_model.actions = self.data["actions"]
@@ -31,6 +31,7 @@ class TeamPvE(game_eve_app.Team):
             )
             for player_pve_model in self.team_pve_model.players
         ]
+        self.init_indexes()
         self.score: int = self.team_pve_model.score  # 本方比分
 
         # self.data记录俱乐部场上数据
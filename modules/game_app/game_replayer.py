@@ -0,0 +1,83 @@
+from typing import List, Tuple
+
+import game_configs
+import models
+from modules import game_app
+from modules.game_app.match_engine import ClubSnapshot, MatchSnapshot, PlayerSnapshot
+from sqlalchemy.orm import Session
+from utils import KickoffSnapshot
+
+
+class GameReplayer:
+    """
+    根据Game表中保存的种子与开球快照重放比赛，不修改数据库
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def is_replayable(game_model: models.Game) -> bool:
+        return game_model.seed is not None and bool(game_model.replay)
+
+    def replay(self, game_model: models.Game) -> "game_app.GameEvE":
+        """
+        重放一场比赛，始终完整记录比赛事件
+        :param game_model: 比赛表实例
+        :return: 已完成模拟的比赛实例，不连接数据库
+        """
+        if not self.is_replayable(game_model):
+            raise ValueError("比赛{}没有保存种子与开球快照，无法重放".format(game_model.id))
+        last_leg_drawn, teams = KickoffSnapshot.unpack(game_model.replay)
+        clubs, lineups = self.load_teams(teams)
+        match = MatchSnapshot(
+            clubs=(clubs[0], clubs[1]),
+            lineups=(lineups[0], lineups[1]),
+            date=game_model.date,
+            season=int(game_model.season),
+            game_type=game_model.type,
+            game_name=game_model.name,
+            save_id=game_model.save_id,
+            seed=game_model.seed,
+            fidelity=game_configs.Fidelity.full,
+            last_leg_drawn=last_leg_drawn,
+        )
+        return match.simulate()
+
+    def load_teams(self, teams: List[dict]) -> Tuple[List[ClubSnapshot], List[List[Tuple]]]:
+        """
+        由开球快照生成两队的俱乐部快照与首发阵容
+        :param teams: 开球快照中的两队信息
+        :return: 俱乐部快照列表，首发阵容列表
+        """
+        club_ids = [team["club_id"] for team in teams]
+        player_ids = [player[0] for team in teams for player in team["players"]]
+        club_models = {club.id: club for club in self.db.query(models.Club).filter(models.Club.id.in_(club_ids)).all()}
+        player_names = dict(
+            self.db.query(models.Player.id, models.Player.translated_name)
+            .filter(models.Player.id.in_(player_ids))
+            .all()
+        )
+        clubs = []
+        lineups = []
+        for team in teams:
+            club_model = club_models[team["club_id"]]
+            clubs.append(
+                ClubSnapshot(
+                    club_id=club_model.id,
+                    name=club_model.name,
+                    reputation=club_model.reputation,
+                    tactic=team["tactic"],
+                )
+            )
+            lineup = []
+            for player_id, location, stamina, capa in team["players"]:
+                snapshot = PlayerSnapshot(
+                    player_id=player_id,
+                    translated_name=player_names.get(player_id, ""),
+                    real_stamina=stamina,
+                    capa=capa,
+                )
+                lineup.append((snapshot, location, snapshot))
+            lineups.append(lineup)
+        return clubs, lineups
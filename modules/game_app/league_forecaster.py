@@ -0,0 +1,267 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import game_configs
+import models
+import numpy as np
+import schemas
+from modules import computed_data_app, game_app
+from modules.game_app.quick_simulator import LOCATION_INDEX, LOCATION_NAMES, TACTIC_NAMES
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+CAPA_NAMES = game_configs.engine_capa
+GOALKEEPING = CAPA_NAMES.index("goalkeeping")
+
+
+class LeagueForecaster:
+    """
+    联赛最终排名的预测
+    以当前积分榜为起点，按俱乐部能力聚合得到每对球队的进球期望，对剩余联赛比赛进行批量的蒙特卡洛模拟，
+    统计各俱乐部夺冠、前四（次级联赛即升级名额）与降级的概率
+    进球期望取自快速模拟模型（game_app.QuickSimulator）的球队进球回归，模型对两队特征是线性的，
+    所有对阵的期望可由各队的进攻项与防守项相加得到；结果按存档日期与已进行的比赛数缓存
+    """
+
+    cache: OrderedDict = OrderedDict()  # (存档id, 联赛id, 日期, 已进行的比赛数, 模拟次数): 预测结果
+    lock = threading.Lock()
+    model: Optional["game_app.QuickSimulator"] = None
+
+    def __init__(
+        self,
+        db: Session,
+        league_model: models.League,
+        simulations: int = game_configs.forecast_simulations,
+        seed: Optional[int] = None,
+    ):
+        """
+        :param league_model: 联赛实例
+        :param simulations: 模拟次数
+        :param seed: 随机种子
+        """
+        self.db = db
+        self.league_model = league_model
+        self.save_model: models.Save = league_model.save
+        self.simulations = simulations
+        self.seed = seed
+        self.clubs: List[models.Club] = list(league_model.clubs)
+        self.club_index = {club.id: i for i, club in enumerate(self.clubs)}
+
+    @classmethod
+    def get_model(cls) -> "game_app.QuickSimulator":
+        if cls.model is None:
+            cls.model = game_app.QuickSimulator.load(game_configs.quick_sim_path)
+        return cls.model
+
+    def forecast(self) -> schemas.LeagueForecast:
+        """
+        预测联赛的最终排名，同一存档日期且已进行的比赛数相同时直接取缓存（当天的玩家比赛进行后重新预测）
+        """
+        key = (self.save_model.id, self.league_model.id, self.save_model.date, self.get_played_num(), self.simulations)
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+        points, goal_diff, goals_for = self.get_standings()
+        fixtures = self.get_remaining_fixtures()
+        ranks, final_points = self.simulate(
+            points, goal_diff, goals_for, fixtures, self.get_expected_goals(), self.simulations, self.seed
+        )
+        clubs_num = len(self.clubs)
+        relegation_num = game_configs.relegation_num if self.league_model.lower_league else 0
+        clubs = [
+            schemas.ClubForecast(
+                club_id=club.id,
+                name=club.name,
+                points=int(points[i]),
+                expected_points=float(final_points[:, i].mean()),
+                title=float((ranks[:, i] == 0).mean()),
+                top4=float((ranks[:, i] < 4).mean()),
+                relegation=float((ranks[:, i] >= clubs_num - relegation_num).mean()),
+            )
+            for i, club in enumerate(self.clubs)
+        ]
+        result = schemas.LeagueForecast(
+            league_id=self.league_model.id,
+            date=self.save_model.date,
+            simulations=self.simulations,
+            remaining_games=len(fixtures),
+            clubs=sorted(clubs, key=lambda club: club.expected_points, reverse=True),
+        )
+        with self.lock:
+            self.cache[key] = result
+            while len(self.cache) > game_configs.forecast_cache_size:
+                self.cache.popitem(last=False)
+        return result
+
+    def get_played_num(self) -> int:
+        """
+        本赛季本联赛已进行的比赛数
+        """
+        return (
+            self.db.query(func.count(models.Game.id))
+            .filter(
+                models.Game.save_id == self.save_model.id,
+                models.Game.season == self.save_model.season,
+                models.Game.name == self.league_model.name,
+                models.Game.type == "league",
+            )
+            .scalar()
+        )
+
+    def get_standings(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        当前积分榜，见ComputedGame.get_season_points_table
+        :return: 各俱乐部的积分、净胜球与进球，顺序同self.clubs
+        """
+        standings = np.zeros((3, len(self.clubs)), dtype=np.int64)
+        computed_game = computed_data_app.ComputedGame(db=self.db, save_id=self.save_model.id)
+        df = computed_game.get_season_points_table(self.save_model.season, self.league_model.name, "league")
+        for row in df.to_dict("records"):
+            i = self.club_index.get(row["id"])
+            if i is not None:
+                standings[:, i] = (row["积分"], row["净胜球"], row["胜球"])
+        return standings[0], standings[1], standings[2]
+
+    def get_remaining_fixtures(self) -> np.ndarray:
+        """
+        从日程表中读取存档日期当天（含）之后的本联赛比赛；当天已进行的比赛已计入积分榜，不再模拟
+        :return: 形状为(比赛数, 2)的主客队序号
+        """
+        calendars = (
+            self.db.query(models.Calendar)
+            .filter(models.Calendar.save_id == self.save_model.id, models.Calendar.date >= self.save_model.date)
+            .all()
+        )
+        played = self.get_played_clubs(self.save_model.date)
+        fixtures = []
+        for calendar in calendars:
+            event = json.loads(calendar.event_str)
+            for game in event.get("eve", []) + event.get("pve", []):
+                if game["game_name"] != self.league_model.name or game["game_type"] != "league":
+                    continue
+                club1_id, club2_id = (int(club_id) for club_id in game["club_id"].split(","))
+                if calendar.date == self.save_model.date and club1_id in played:
+                    continue
+                if club1_id in self.club_index and club2_id in self.club_index:
+                    fixtures.append((self.club_index[club1_id], self.club_index[club2_id]))
+        return np.array(fixtures, dtype=np.int64).reshape(-1, 2)
+
+    def get_played_clubs(self, date: str) -> Set[int]:
+        """
+        指定日期已进行本联赛比赛的俱乐部
+        """
+        rows = (
+            self.db.query(models.GameTeamInfo.club_id)
+            .join(models.Game)
+            .filter(
+                models.Game.save_id == self.save_model.id,
+                models.Game.date == date,
+                models.Game.name == self.league_model.name,
+                models.Game.type == "league",
+            )
+            .all()
+        )
+        return {club_id for club_id, in rows}
+
+    def get_club_arrays(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        各俱乐部的能力聚合，格式同QuickSimulator.get_team_arrays：
+        按主教练的阵型排出首发位置，门将取门将能力最高的球员，其余位置取能力均值最高的十名球员的平均能力
+        """
+        club_players: Dict[int, List[models.Player]] = {club.id: [] for club in self.clubs}
+        players = self.db.query(models.Player).filter(models.Player.club_id.in_(list(club_players))).all()
+        for player in players:
+            club_players[player.club_id].append(player)
+        arrays = []
+        for club in self.clubs:
+            club_capa = np.array(
+                [[getattr(player, name) for name in CAPA_NAMES] for player in club_players[club.id]], dtype=float
+            ).reshape(-1, len(CAPA_NAMES))
+            # 年龄滤镜，见ComputedPlayer.get_capa
+            ages = np.array([player.age + self.save_model.season - 1 for player in club_players[club.id]])
+            age_weight = np.where(ages >= 30, 1 - (ages - 29) * 0.05, 1)
+            club_capa *= np.where(age_weight <= 0, 0.05, age_weight)[:, None]
+            formation = game_configs.formations.get(club.coach.formation, game_configs.formations["4-4-2"])
+            locations = [location for location, count in formation.items() for _ in range(count)]
+            capa = np.zeros((len(locations), len(CAPA_NAMES)))
+            if len(club_capa):
+                goalkeeper = int(club_capa[:, GOALKEEPING].argmax())
+                outfield = np.delete(club_capa, goalkeeper, axis=0)
+                if len(outfield):
+                    overall = np.delete(outfield, GOALKEEPING, axis=1).mean(axis=1)
+                    capa[:] = outfield[np.argsort(-overall)[:10]].mean(axis=0)
+                capa[locations.index("GK")] = club_capa[goalkeeper]
+            one_hot = np.zeros((len(locations), len(LOCATION_NAMES)))
+            one_hot[np.arange(len(locations)), [LOCATION_INDEX[location] for location in locations]] = 1
+            arrays.append((one_hot, capa / 100))
+        return arrays
+
+    def get_expected_goals(self) -> np.ndarray:
+        """
+        :return: 形状为(俱乐部数, 俱乐部数)的矩阵，[i, j]为i对阵j时i的进球期望
+        """
+        weights = self.get_model().team_weights[:, 0]
+        groups = np.array([game_app.QuickSimulator.get_group_features(*arrays) for arrays in self.get_club_arrays()])
+        tactic = np.array(
+            [[getattr(club.coach, name) for name in TACTIC_NAMES] for club in self.clubs], dtype=float
+        ).reshape(-1, len(TACTIC_NAMES))
+        tactic /= np.maximum(tactic.sum(axis=1, keepdims=True), 1)
+        # 球队特征依次为本队分组能力、对方分组能力、本队战术占比与常数项，见QuickSimulator.get_team_features
+        groups_num = groups.shape[1]
+        attack = groups @ weights[:groups_num] + tactic @ weights[2 * groups_num : -1] + weights[-1]
+        defence = groups @ weights[groups_num : 2 * groups_num]
+        return np.maximum(attack[:, None] + defence[None, :], 0.05)
+
+    @staticmethod
+    def simulate(
+        points: np.ndarray,
+        goal_diff: np.ndarray,
+        goals_for: np.ndarray,
+        fixtures: np.ndarray,
+        expected_goals: np.ndarray,
+        simulations: int,
+        seed: Optional[int] = None,
+        chunk_size: int = 2000,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量模拟剩余比赛：每次模拟的所有比赛同时按泊松分布抽样比分，积分、净胜球与进球按主客队的独热矩阵累加
+        :param points: 各俱乐部的当前积分
+        :param goal_diff: 当前净胜球
+        :param goals_for: 当前进球
+        :param fixtures: 剩余比赛的主客队序号，见get_remaining_fixtures
+        :param expected_goals: 进球期望矩阵，见get_expected_goals
+        :param simulations: 模拟次数
+        :param chunk_size: 每批同时模拟的次数，限制内存占用
+        :return: 每次模拟中各俱乐部的最终名次（从0开始）与积分，形状均为(模拟次数, 俱乐部数)
+        """
+        rng = np.random.default_rng(seed)
+        clubs_num = len(points)
+        home = np.zeros((len(fixtures), clubs_num), dtype=np.float32)
+        away = np.zeros((len(fixtures), clubs_num), dtype=np.float32)
+        home[np.arange(len(fixtures)), fixtures[:, 0]] = 1
+        away[np.arange(len(fixtures)), fixtures[:, 1]] = 1
+        home_expected = expected_goals[fixtures[:, 0], fixtures[:, 1]]
+        away_expected = expected_goals[fixtures[:, 1], fixtures[:, 0]]
+        ranks = np.empty((simulations, clubs_num), dtype=np.int64)
+        final_points = np.empty((simulations, clubs_num), dtype=np.int64)
+        for start in range(0, simulations, chunk_size):
+            num = min(chunk_size, simulations - start)
+            home_goals = rng.poisson(home_expected, size=(num, len(fixtures))).astype(np.float32)
+            away_goals = rng.poisson(away_expected, size=(num, len(fixtures))).astype(np.float32)
+            draw = home_goals == away_goals
+            home_points = 3 * (home_goals > away_goals) + draw
+            away_points = 3 * (away_goals > home_goals) + draw
+            chunk_points = points + home_points @ home + away_points @ away
+            chunk_goal_diff = goal_diff + (home_goals - away_goals) @ home + (away_goals - home_goals) @ away
+            chunk_goals_for = goals_for + home_goals @ home + away_goals @ away
+            # 按积分、净胜球、进球排名，仍相同时随机
+            key = (chunk_points * 1000 + chunk_goal_diff + 500) * 1000 + chunk_goals_for + rng.random((num, clubs_num))
+            order = np.argsort(-key, axis=1)
+            np.put_along_axis(
+                ranks[start : start + num], order, np.broadcast_to(np.arange(clubs_num), (num, clubs_num)), axis=1
+            )
+            final_points[start : start + num] = np.rint(chunk_points)
+        return ranks, final_points
@@ -0,0 +1,225 @@
+"""
+不访问数据库的比赛模拟核心
+比赛由快照描述：两队的俱乐部快照（战术比重）与首发阵容（球员id、位置、体力与能力），模拟结果为MatchResult；
+GameEvE、TacticAdjustor、MatchdayExecutor、GameReplayer与ml_app只负责读取快照与写回结果
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import game_configs
+import schemas
+from modules import game_app
+
+
+class CoachSnapshot:
+    """
+    教练战术比重的快照
+    """
+
+    def __init__(self, tactic: Dict[str, int]):
+        for key, value in tactic.items():
+            setattr(self, key, value)
+
+
+class ClubSnapshot:
+    """
+    俱乐部快照，按Team所需的字段模仿models.Club
+    """
+
+    def __init__(self, club_id, name: str, reputation: float, tactic: Dict[str, int]):
+        self.id = club_id
+        self.name = name
+        self.reputation = reputation
+        self.coach = CoachSnapshot(tactic)
+
+
+class PlayerSnapshot:
+    """
+    球员快照，同时充当比赛球员的player_model与computed_player
+    """
+
+    def __init__(self, player_id: int, translated_name: str, real_stamina: int, capa: Dict[str, float]):
+        self.id = player_id
+        self.translated_name = translated_name
+        self.real_stamina = real_stamina
+        self.capa = capa
+
+    def get_all_capa(self) -> Dict[str, float]:
+        return dict(self.capa)
+
+    def get_real_stamina(self) -> int:
+        return self.real_stamina
+
+
+class MatchSnapshot:
+    """
+    一场比赛的快照：比赛信息、两队俱乐部快照与首发阵容，可在任意进程中反复模拟
+    """
+
+    def __init__(
+        self,
+        clubs: Tuple[ClubSnapshot, ClubSnapshot],
+        lineups: Tuple[List[Tuple], List[Tuple]],
+        date: str = "",
+        season: int = 0,
+        game_type: str = "test",
+        game_name: str = "test",
+        save_id: int = 0,
+        seed: Optional[int] = None,
+        fidelity: str = game_configs.Fidelity.headless,
+        last_leg_drawn: Optional[bool] = None,
+    ):
+        """
+        :param clubs: 两队俱乐部快照
+        :param lineups: 两队首发阵容，元素为(球员快照, 位置, 球员快照)，见Team.init_players
+        :param seed: 比赛随机数流的种子，为空时每次模拟随机生成
+        :param fidelity: 解说精度
+        :param last_leg_drawn: 上一回合是否打平，仅两回合淘汰赛需要；不连接数据库时为空视为未打平
+        """
+        self.clubs = clubs
+        self.lineups = lineups
+        self.date = date
+        self.season = season
+        self.game_type = game_type
+        self.game_name = game_name
+        self.save_id = save_id
+        self.seed = seed
+        self.fidelity = fidelity
+        self.last_leg_drawn = last_leg_drawn
+
+    @classmethod
+    def from_game(cls, game_eve: "game_app.GameEvE") -> "MatchSnapshot":
+        """
+        由已挑选好首发阵容的比赛实例生成快照
+        :param game_eve: 比赛实例，通常连接数据库
+        :return: 比赛快照
+        """
+        return cls(
+            clubs=(cls.get_club_snapshot(game_eve.lteam), cls.get_club_snapshot(game_eve.rteam)),
+            lineups=(cls.get_lineup(game_eve.lteam), cls.get_lineup(game_eve.rteam)),
+            date=game_eve.date,
+            season=game_eve.season,
+            game_type=game_eve.type,
+            game_name=game_eve.name,
+            save_id=game_eve.save_id,
+            seed=game_eve.seed,
+            fidelity=game_eve.fidelity,
+            last_leg_drawn=game_eve.last_leg_drawn,
+        )
+
+    @staticmethod
+    def get_club_snapshot(team: "game_app.game_eve_app.Team") -> ClubSnapshot:
+        return ClubSnapshot(
+            club_id=team.club_id, name=team.name, reputation=team.team_model.reputation, tactic=dict(team.tactic)
+        )
+
+    @staticmethod
+    def get_lineup(team: "game_app.game_eve_app.Team") -> List[Tuple]:
+        """
+        :return: 可直接传给Team的首发阵容
+        """
+        lineup = []
+        for player in team.players:
+            snapshot = PlayerSnapshot(
+                player_id=player.player_model.id,
+                translated_name=player.name,
+                real_stamina=player.stamina,
+                capa=dict(player.capa),
+            )
+            lineup.append((snapshot, player.ori_location, snapshot))
+        return lineup
+
+    def build_game(self) -> "game_app.GameEvE":
+        """
+        以快照创建不连接数据库的比赛实例
+        """
+        game_eve = game_app.GameEvE(
+            db=None,
+            club1_id=self.clubs[0].id,
+            club2_id=self.clubs[1].id,
+            date=self.date,
+            game_type=self.game_type,
+            game_name=self.game_name,
+            season=self.season,
+            save_id=self.save_id,
+            club1_model=self.clubs[0],
+            club2_model=self.clubs[1],
+            lineups=self.lineups,
+            fidelity=self.fidelity,
+            seed=self.seed,
+        )
+        game_eve.last_leg_drawn = self.last_leg_drawn
+        return game_eve
+
+    def simulate(self) -> "game_app.GameEvE":
+        """
+        完整模拟一场比赛，包括加时、点球与评分
+        :return: 已完成模拟的比赛实例
+        """
+        game_eve = self.build_game()
+        game_eve.simulate()
+        game_eve.finish()
+        return game_eve
+
+    def play(self) -> "MatchResult":
+        """
+        完整模拟一场比赛
+        :return: 比赛结果
+        """
+        return MatchResult(self.simulate())
+
+    def play_tactical(self, num: int) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        进行用于战术调整的模拟比赛，见GameEvE.tactical_start
+        :param num: 模拟场数
+        :return: 两队的战术数据
+        """
+        return self.build_game().tactical_start(num=num)
+
+    def optimize_tactics(self, **kwargs) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        自适应地进行用于战术调整的模拟比赛，见game_app.TacticOptimizer
+        :param kwargs: TacticOptimizer的参数
+        :return: 两队的战术数据
+        """
+        return game_app.TacticOptimizer(self.build_game(), **kwargs).run()
+
+
+class MatchResult:
+    """
+    比赛结果，可写回连接数据库的比赛实例
+    """
+
+    def __init__(self, game_eve: "game_app.GameEvE"):
+        self.event_log = game_eve.event_log
+        self.kickoff = game_eve.kickoff
+        self.winner_id = game_eve.winner_id
+        self.goal_record: List[schemas.GoalRecord] = game_eve.goal_record
+        self.turns = game_eve.turns
+        self.ingame_time = game_eve.ingame_time
+        self.teams = []
+        for team in (game_eve.lteam, game_eve.rteam):
+            players = [(player.data, player.stamina) for player in team.players]
+            self.teams.append((team.score, team.data, dict(team.tactic), players))
+
+    @property
+    def scores(self) -> Tuple[int, int]:
+        return self.teams[0][0], self.teams[1][0]
+
+    def apply(self, game_eve: "game_app.GameEvE"):
+        """
+        将结果写回连接数据库的比赛实例，之后可直接调用GameEvE.save()
+        """
+        game_eve.event_log = self.event_log
+        game_eve.kickoff = self.kickoff
+        game_eve.winner_id = self.winner_id
+        game_eve.goal_record = self.goal_record
+        game_eve.turns = self.turns
+        game_eve.ingame_time = self.ingame_time
+        for team, (score, data, tactic, players) in zip((game_eve.lteam, game_eve.rteam), self.teams):
+            team.score = score
+            team.data = data
+            team.tactic = tactic
+            for player, (player_data, stamina) in zip(team.players, players):
+                player.data = player_data
+                player.stamina = stamina
@@ -0,0 +1,218 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import crud
+import game_configs
+import models
+from modules import game_app
+from modules.game_app.match_engine import CoachSnapshot, MatchResult, MatchSnapshot
+from sqlalchemy.orm import Session
+from utils import logger
+
+
+class FixtureSnapshot:
+    """
+    一场比赛的快照：战术调整模拟赛与正式比赛各自的比赛快照
+    战术调整命中缓存或使用代理模型时，teams_data为已有的两队战术数据，子进程不再进行模拟赛
+    """
+
+    def __init__(self, game_eve: "game_app.GameEvE", test_game: "game_app.GameEvE", player_club_id: int):
+        self.player_club_id = player_club_id
+        self.match = MatchSnapshot.from_game(game_eve)
+        self.test_match = MatchSnapshot.from_game(test_game)
+        self.cache_key: Optional[tuple] = None
+        self.teams_data: Optional[Tuple[dict, dict]] = None
+
+
+class FixtureResult(MatchResult):
+    """
+    子进程返回的比赛结果与战术调整，由父进程写回原比赛实例
+    """
+
+    def __init__(
+        self,
+        game_eve: "game_app.GameEvE",
+        tactics: Tuple[Optional[dict], Optional[dict]],
+        teams_data: Tuple[dict, dict],
+    ):
+        super().__init__(game_eve)
+        self.tactics = tactics
+        self.teams_data = teams_data
+
+
+def play_fixture(fixture: FixtureSnapshot) -> FixtureResult:
+    """
+    在子进程中进行一场比赛，包括战术调整；不访问数据库
+    :param fixture: 比赛快照
+    :return: 比赛结果
+    """
+    # 战术调整
+    teams_data = fixture.teams_data
+    if teams_data is None:
+        teams_data = fixture.test_match.optimize_tactics()
+    tactics = []
+    for club, team_data in zip(fixture.match.clubs, teams_data):
+        if club.id != fixture.player_club_id:
+            tactic = game_app.TacticAdjustor.get_tactic_pro(team_data)
+            club.coach = CoachSnapshot(tactic)
+            tactics.append(tactic)
+        else:
+            tactics.append(None)
+    # 开始模拟比赛
+    game_eve = fixture.match.simulate()
+    return FixtureResult(game_eve, tactics=(tactics[0], tactics[1]), teams_data=teams_data)
+
+
+class MatchdayExecutor:
+    """
+    多进程比赛日执行器
+    分三步：在父进程中读取两队快照与首发阵容；在进程池中模拟比赛；在父进程中写回结果，批量写入并统一提交
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        save_model: models.Save,
+        date: str,
+        workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        fidelity: str = game_configs.Fidelity.full,
+        tactic_cache: Optional["game_app.TacticCache"] = None,
+        tactic_estimator: Optional["game_app.TacticSurrogate"] = None,
+    ):
+        """
+        :param workers: 进程数，为空时取cpu核数；不大于1时在当前进程中执行
+        :param seed: 随机种子，与日期一起决定本比赛日的随机数，见get_rng；相同种子下结果与进程数无关
+        :param fidelity: 电脑间比赛的解说精度
+        :param tactic_cache: 战术调整缓存，在父进程中读写
+        :param tactic_estimator: 代理模型，不为空时在父进程中预测战术数据，不再进行模拟赛
+        """
+        self.db = db
+        self.save_model = save_model
+        self.date = date
+        self.workers = workers if workers else os.cpu_count()
+        self.seed = seed
+        self.fidelity = fidelity
+        self.tactic_cache = tactic_cache
+        self.tactic_estimator = tactic_estimator
+
+    def run(self, calendar_games: list) -> List[Tuple]:
+        """
+        进行一个比赛日的比赛
+        :param calendar_games: 日程表中的比赛信息列表
+        :return: 比分元组列表
+        """
+        games, fixtures = self.load(calendar_games)
+        results = self.simulate(fixtures)
+        result_sink = game_app.ResultSink(self.db)
+        scores = self.merge(games, fixtures, results, result_sink)
+        result_sink.commit()
+        return scores
+
+    def get_rng(self) -> random.Random:
+        """
+        本比赛日的随机数：由种子与日期共同决定，每个比赛日各不相同，不重设全局的random（其他存档的工作线程也在使用）
+        首发阵容的挑选、模拟赛与正式比赛的种子都取自这一随机数
+        """
+        if self.seed is None:
+            return random.Random()
+        # 字符串种子按sha512散列，与进程无关
+        return random.Random("{}:{}".format(self.seed, self.date))
+
+    def load(self, calendar_games: list) -> Tuple[List["game_app.GameEvE"], List[FixtureSnapshot]]:
+        """
+        读取所有比赛的快照
+        :return: 连接数据库的比赛实例列表与对应的快照列表
+        """
+        rng = self.get_rng()
+        games: List[game_app.GameEvE] = []
+        fixtures: List[FixtureSnapshot] = []
+        for calendar_game in calendar_games:
+            clubs_id = calendar_game["club_id"].split(",")
+            club1_model = self.db.query(models.Club).filter(models.Club.id == clubs_id[0]).first()
+            club2_model = self.db.query(models.Club).filter(models.Club.id == clubs_id[1]).first()
+            tactic_adjustor = game_app.TacticAdjustor(
+                db=self.db,
+                club1_id=clubs_id[0],
+                club2_id=clubs_id[1],
+                player_club_id=self.save_model.player_club_id,
+                save_id=self.save_model.id,
+                club1_model=club1_model,
+                club2_model=club2_model,
+                season=self.save_model.season,
+                date=self.date,
+            )
+            test_game = tactic_adjustor.init_test_game(rng)
+            game_eve = game_app.GameEvE(
+                db=self.db,
+                club1_id=clubs_id[0],
+                club2_id=clubs_id[1],
+                date=self.date,
+                game_name=calendar_game["game_name"],
+                game_type=calendar_game["game_type"],
+                season=self.save_model.season,
+                save_id=self.save_model.id,
+                club1_model=club1_model,
+                club2_model=club2_model,
+                fidelity=game_app.GameEvE.get_fidelity(
+                    self.fidelity,
+                    clubs_id,
+                    self.save_model.player_club_id,
+                    calendar_game["game_name"],
+                    calendar_game["game_type"],
+                ),
+                seed=rng.getrandbits(32),
+                lineup_rng=rng,
+            )
+            if crud.is_two_legged(game_eve.type):
+                game_eve.last_leg_drawn = game_eve.is_last_leg_drawn()
+            games.append(game_eve)
+            fixture = FixtureSnapshot(
+                game_eve=game_eve, test_game=test_game, player_club_id=self.save_model.player_club_id
+            )
+            if self.tactic_estimator is not None:
+                fixture.teams_data = self.tactic_estimator.predict_teams_data(fixture.test_match)
+            elif self.tactic_cache is not None:
+                fixture.cache_key = self.tactic_cache.get_key(fixture.test_match)
+                fixture.teams_data = self.tactic_cache.get(fixture.cache_key, self.date)
+            fixtures.append(fixture)
+        return games, fixtures
+
+    def simulate(self, fixtures: List[FixtureSnapshot]) -> List[FixtureResult]:
+        """
+        在进程池中模拟所有比赛
+        """
+        if self.workers <= 1 or len(fixtures) <= 1:
+            return [play_fixture(fixture) for fixture in fixtures]
+        chunksize = max(1, len(fixtures) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(play_fixture, fixtures, chunksize=chunksize))
+
+    def merge(
+        self,
+        games: List["game_app.GameEvE"],
+        fixtures: List[FixtureSnapshot],
+        results: List[FixtureResult],
+        result_sink: "game_app.ResultSink",
+    ) -> List[Tuple]:
+        """
+        写回比赛结果与战术调整，比赛数据交由result_sink批量写入，由调用方统一提交
+        """
+        scores = []
+        try:
+            for game_eve, fixture, result in zip(games, fixtures, results):
+                for team, tactic in zip((game_eve.lteam, game_eve.rteam), result.tactics):
+                    if tactic:
+                        for key, value in tactic.items():
+                            setattr(team.team_model.coach, key, value)
+                result.apply(game_eve)
+                scores.append(result_sink.add(game_eve))
+                if fixture.cache_key is not None and fixture.teams_data is None:
+                    self.tactic_cache.put(fixture.cache_key, self.date, result.teams_data)
+        except Exception:
+            logger.error("比赛日结果写回失败，回滚")
+            self.db.rollback()
+            raise
+        return scores
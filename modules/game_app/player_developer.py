@@ -0,0 +1,125 @@
+from operator import attrgetter
+from typing import Dict, List
+
+import crud
+import game_configs
+import models
+import numpy as np
+from modules.game_app import game_eve_app
+from sqlalchemy.orm import Session
+from utils import utils
+
+GROWTH_CAPA_NAMES = tuple(game_configs.location_capability[0]["weight"])
+LOCATION_NAMES = tuple(location["name"] for location in game_configs.location_capability)
+LOCATION_INDEX = {name: i for i, name in enumerate(LOCATION_NAMES)}
+get_capa = attrgetter(*GROWTH_CAPA_NAMES)
+get_limit = attrgetter(*("{}_limit".format(name) for name in GROWTH_CAPA_NAMES))
+
+
+def _build_weight_cdf() -> np.ndarray:
+    """
+    生成各位置能力比重的累积分布表，形状为(位置数, 能力数)，比重全为0的位置等概率抽取，同utils.sampling.CdfTable
+    """
+    weights = np.array(
+        [
+            [location["weight"].get(name, 0) for name in GROWTH_CAPA_NAMES]
+            for location in game_configs.location_capability
+        ],
+        dtype=float,
+    )
+    weights[weights.sum(axis=1) == 0] = 1
+    cdf = weights.cumsum(axis=1)
+    return cdf / cdf[:, -1:]
+
+
+WEIGHT_CDF = _build_weight_cdf()
+GROWTH_THRESHOLDS = np.array([rating for rating, _ in game_configs.player_growth_steps])
+GROWTH_VALUES = np.array([game_configs.player_growth_base, *(value for _, value in game_configs.player_growth_steps)])
+
+
+class PlayerDeveloper:
+    """
+    赛后球员数据的更新：位置出场数、能力成长、剩余体力与身价
+    一场或一个比赛日多场比赛的球员一起处理：成长值按评分档查表，候选能力按位置的能力比重一次抽齐，
+    成长后不超过上限的前几次抽中的能力成长；结果以字段字典返回，交给crud.update_players_bulk合并为一条UPDATE
+    """
+
+    @classmethod
+    def develop(cls, games: List["game_eve_app.GameEvE"]) -> List[dict]:
+        """
+        :param games: 已评分的比赛实例列表
+        :return: 各场比赛两队球员依次对应的待写入字段
+        """
+        players = [player for game in games for team in (game.lteam, game.rteam) for player in team.players]
+        dates = [game.date for game in games for team in (game.lteam, game.rteam) for _ in team.players]
+        if not players:
+            return []
+        # 每场比赛的抽样取自比赛自身的随机数流，结果只取决于比赛的种子
+        draws = np.vstack(
+            [
+                np.random.default_rng(game.rng.getrandbits(64)).random(
+                    (len(game.lteam.players) + len(game.rteam.players), game_configs.player_growth_draws)
+                )
+                for game in games
+            ]
+        )
+        locations = np.array([LOCATION_INDEX[player.ori_location] for player in players])
+        capa = np.array([get_capa(player.player_model) for player in players], dtype=float)
+        limit = np.array([get_limit(player.player_model) for player in players], dtype=float)
+        growth = GROWTH_VALUES[
+            np.searchsorted(GROWTH_THRESHOLDS, [player.data["real_rating"] for player in players], side="right")
+        ]
+        grown_capa = capa + growth[:, None]
+        grown = cls.get_grown(WEIGHT_CDF[locations], grown_capa <= limit, draws)
+        season_stats = cls.get_season_stats(games[0].db, players)
+
+        players_attri = []
+        for player, date, location, player_grown, player_grown_capa in zip(
+            players, dates, locations, grown, grown_capa
+        ):
+            player_model = player.player_model
+            # GamePvE的位置为game_configs.Location，按序号取位置名
+            location_num = "{}_num".format(LOCATION_NAMES[location])
+            attri = {location_num: getattr(player_model, location_num) + 1}
+            for i in np.flatnonzero(player_grown):
+                attri[GROWTH_CAPA_NAMES[i]] = float(utils.retain_decimal(player_grown_capa[i]))
+            attri["real_stamina"] = player.stamina
+            attri["last_game_date"] = date
+            attri["values"] = player.computed_player.get_values(season_stats[player.player_model.id])
+            players_attri.append(attri)
+        return players_attri
+
+    @staticmethod
+    def get_season_stats(
+        db: Session, players: List["game_eve_app.Player"]
+    ) -> Dict[int, List[models.PlayerSeasonStats]]:
+        """
+        一次查出各球员近一年的赛季统计，用于估值，见ComputedPlayer.get_values
+        :return: 球员id: 赛季统计列表
+        """
+        players_stats = {player.player_model.id: [] for player in players}
+        seasons_players = dict()
+        for player in players:
+            seasons = player.computed_player.get_recent_year_seasons()
+            seasons_players.setdefault(seasons, []).append(player.player_model.id)
+        for (start_season, end_season), player_ids in seasons_players.items():
+            for stats in crud.get_players_season_stats(db, player_ids, start_season, end_season):
+                players_stats[stats.player_id].append(stats)
+        return players_stats
+
+    @staticmethod
+    def get_grown(cdf: np.ndarray, allowed: np.ndarray, draws: np.ndarray) -> np.ndarray:
+        """
+        按能力比重抽取候选能力，取成长后不超过上限的前player_growth_capa_num次；同一能力被抽中多次时只成长一次
+        :param cdf: 各球员位置的能力比重累积分布，形状为(球员数, 能力数)
+        :param allowed: 各项能力成长后是否不超过上限
+        :param draws: 形状为(球员数, 抽取次数)的[0, 1)均匀随机数
+        :return: 各项能力是否成长
+        """
+        chosen = (cdf[:, None, :] < draws[..., None]).sum(axis=2)
+        accepted = np.take_along_axis(allowed, chosen, axis=1)
+        kept = accepted & (accepted.cumsum(axis=1) <= game_configs.player_growth_capa_num)
+        grown = np.zeros_like(allowed)
+        rows, columns = np.nonzero(kept)
+        grown[rows, chosen[rows, columns]] = True
+        return grown
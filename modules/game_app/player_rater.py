@@ -0,0 +1,121 @@
+from operator import attrgetter
+from typing import Dict, List, Tuple
+
+import game_configs
+import numpy as np
+from modules.game_app import game_eve_app
+from utils import utils
+
+# 成功率评分的动作与其成功次数
+SUCCESS_NAMES = (
+    ("passes", "pass_success"),
+    ("dribbles", "dribble_success"),
+    ("tackles", "tackle_success"),
+    ("aerials", "aerial_success"),
+)
+BONUS_NAMES = tuple(game_configs.rating_data_bonus)
+RATING_DATA_NAMES = ("actions", *(name for names in SUCCESS_NAMES for name in names), *BONUS_NAMES, "real_rating")
+RATING_DATA_INDEX = {name: i for i, name in enumerate(RATING_DATA_NAMES)}
+ATTEMPTS_COLUMNS = [RATING_DATA_INDEX[attempts_name] for attempts_name, _ in SUCCESS_NAMES]
+SUCCESS_COLUMNS = [RATING_DATA_INDEX[success_name] for _, success_name in SUCCESS_NAMES]
+BONUS_COLUMNS = [RATING_DATA_INDEX[name] for name in BONUS_NAMES]
+BONUS_VALUES = np.array([game_configs.rating_data_bonus[name] for name in BONUS_NAMES])
+get_rating_data = attrgetter(*RATING_DATA_NAMES)
+TEAM_PLAYERS = 11  # 每场比赛的动作数均值按22名球员计算
+
+
+class StepTable:
+    """
+    分档评分表：偏移比例不小于加分某档的阈值时取该档的加分，不大于扣分某档阈值的相反数时取该档的扣分，均取达到的最高一档
+    """
+
+    def __init__(self, steps: Dict[str, Tuple[Tuple[float, float], ...]]):
+        """
+        :param steps: 加分与扣分的(阈值, 分值)列表，阈值递增，见game_configs.rating_actions_steps
+        """
+        self.bonus_thresholds = np.array([threshold for threshold, _ in steps["bonus"]])
+        self.bonus = np.array([0, *(value for _, value in steps["bonus"])], dtype=float)
+        self.penalty_thresholds = np.array([threshold for threshold, _ in steps["penalty"]])
+        self.penalty = np.array([0, *(value for _, value in steps["penalty"])], dtype=float)
+
+    def lookup(self, offset: np.ndarray) -> np.ndarray:
+        """
+        :param offset: 与均值的偏移比例
+        :return: 各偏移对应的加减分
+        """
+        bonus = self.bonus[np.searchsorted(self.bonus_thresholds, offset, side="right")]
+        penalty = self.penalty[np.searchsorted(self.penalty_thresholds, -offset, side="right")]
+        return np.where(offset >= 0, bonus, penalty)
+
+
+class PlayerRater:
+    """
+    赛后球员评分
+    把一场或一个比赛日多场比赛的球员数据排成(比赛数, 球员数, 数据项)的计数矩阵，一次完成各项均值、分档查表、加成与取顶，
+    结果写入每个球员的.data['real_rating']与.data['final_rating']
+    """
+
+    actions_table = StepTable(game_configs.rating_actions_steps)
+    success_table = StepTable(game_configs.rating_success_steps)
+
+    @classmethod
+    def rate(cls, games: List["game_eve_app.GameEvE"]):
+        """
+        为比赛中的所有球员评分
+        :param games: 比赛实例列表
+        """
+        if not games:
+            return
+        players = [[*game.lteam.players, *game.rteam.players] for game in games]
+        players_num = max(TEAM_PLAYERS * 2, *(len(game_players) for game_players in players))
+        data = np.zeros((len(games), players_num, len(RATING_DATA_NAMES)))
+        outfield = np.zeros((len(games), players_num), dtype=bool)  # 门将与补位的空行不参与动作数与成功率评分
+        for i, game_players in enumerate(players):
+            data[i, : len(game_players)] = [get_rating_data(player.data) for player in game_players]
+            outfield[i, : len(game_players)] = [
+                player.ori_location != game_configs.Location.GK for player in game_players
+            ]
+        real_rating = cls.get_ratings(data, outfield)
+        final_rating = np.clip(real_rating, *game_configs.rating_range)
+        for game_players, game_real_rating, game_final_rating in zip(
+            players, real_rating.tolist(), final_rating.tolist()
+        ):
+            for player, real, final in zip(game_players, game_real_rating, game_final_rating):
+                player.data.real_rating = real
+                player.data.final_rating = float(utils.retain_decimal(final))
+
+    @classmethod
+    def get_ratings(cls, data: np.ndarray, outfield: np.ndarray) -> np.ndarray:
+        """
+        :param data: 形状为(比赛数, 球员数, 数据项)的计数矩阵，数据项见RATING_DATA_NAMES，补位的空行全为0
+        :param outfield: 各球员是否参与动作数与成功率评分
+        :return: 未取顶的评分
+        """
+        # 按动作数与全场均值的偏移评分，平均动作数达到要求的比赛才计入
+        actions = data[..., RATING_DATA_INDEX["actions"]]
+        average_actions = actions.sum(axis=1, keepdims=True) / (TEAM_PLAYERS * 2)
+        offset = (actions - average_actions) / np.maximum(average_actions, 1)
+        counted = outfield & (average_actions > game_configs.rating_min_average_actions)
+        actions_rating = np.where(counted, cls.actions_table.lookup(offset), 0)
+        # 按各项动作成功率与全场均值的偏移评分，均值只计动作次数达到要求的球员
+        attempts = data[..., ATTEMPTS_COLUMNS]
+        success = data[..., SUCCESS_COLUMNS]
+        counted = attempts >= game_configs.rating_min_attempts
+        count = counted.sum(axis=1, keepdims=True)
+        average_success = (success * counted).sum(axis=1, keepdims=True) / np.maximum(count, 1)
+        average_attempts = (attempts * counted).sum(axis=1, keepdims=True) / np.maximum(count, 1)
+        # 没有球员计入时均值取1
+        average = np.where(count > 0, average_success / np.maximum(average_attempts, 1), 1)
+        ratio = success / np.maximum(attempts, 1)
+        offset = np.where(average == 0, 0, (ratio - average) / np.where(average == 0, 1, average))
+        success_rating = np.where(counted & outfield[..., None], cls.success_table.lookup(offset), 0)
+        # 进球、助攻与扑救的加成
+        bonus = data[..., BONUS_COLUMNS] * BONUS_VALUES
+        # 依次累加各项，与逐项加减的结果一致
+        rating = data[..., RATING_DATA_INDEX["real_rating"]] + actions_rating
+        for i in range(len(SUCCESS_NAMES)):
+            rating += success_rating[..., i]
+        total_bonus = bonus[..., 0]
+        for i in range(1, len(BONUS_NAMES)):
+            total_bonus = total_bonus + bonus[..., i]
+        return rating + total_bonus
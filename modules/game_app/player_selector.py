@@ -14,8 +14,20 @@ from utils import logger, utils
 
 
 class PlayerSelector:
-    def __init__(self, club_id: int, db: Session, season: int, date: str, club_model: Optional[models.Club] = None):
+    def __init__(
+        self,
+        club_id: int,
+        db: Session,
+        season: int,
+        date: str,
+        club_model: Optional[models.Club] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        :param rng: 随机选择选人算法所用的随机数，为空时使用全局的random
+        """
         self.db = db
+        self.rng = rng if rng else random
         self.club_id = club_id
         self.season = season
         self.date = date
@@ -39,7 +51,7 @@ class PlayerSelector:
         :return: (选定球员, 选定球员对应的位置)
         """
         if is_random:
-            a = random.choice([1, 2])
+            a = self.rng.choice([1, 2])
             if a == 1:
                 players_model, locations_list = self.select_players1(
                     self.club_model.players, self.club_model.coach.formation
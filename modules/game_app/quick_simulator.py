@@ -0,0 +1,283 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+import game_configs
+import numpy as np
+from modules import game_app
+from modules.game_app.game_batch import PLAYER_DATA_NAMES, TEAM_DATA_NAMES
+from modules.game_app.tactic_surrogate import LOCATION_GROUPS
+from utils import logger
+
+TACTIC_NAMES = tuple(tactic.value for tactic in game_configs.Tactic)
+LOCATION_NAMES = tuple(location.value for location in game_configs.Location)
+LOCATION_INDEX = {name: i for i, name in enumerate(LOCATION_NAMES)}
+# 位置到位置组的映射矩阵，分组见TacticSurrogate
+LOCATION_GROUP_MATRIX = np.array(
+    [[location in group for group in LOCATION_GROUPS] for location in LOCATION_NAMES], float
+)
+# 球队预测目标：进球数与各战术的尝试、成功次数
+TEAM_TARGET_NAMES = ("goals", *TEAM_DATA_NAMES[1:])
+# 球员预测目标：各项场上数据与体力消耗
+PLAYER_TARGET_NAMES = (*PLAYER_DATA_NAMES, "stamina_drop")
+GOALS, ASSISTS, SHOTS, SAVES, SAVE_SUCCESS = (
+    PLAYER_DATA_NAMES.index(name) for name in ("goals", "assists", "shots", "saves", "save_success")
+)
+
+
+def get_counter_columns(names: Tuple) -> Tuple[List[int], List[int], List[int]]:
+    """
+    :param names: 计数名
+    :return: 直接抽样的列、成功次数的列与对应尝试次数的列
+    """
+    successes = [i for i, name in enumerate(names) if name.endswith("_success")]
+    attempts = []
+    for i in successes:
+        name = names[i][: -len("_success")]
+        # 如dribble_success对应dribbles，pass_success对应passes
+        attempts.append(next(names.index(attempt) for attempt in (name, name + "s", name + "es") if attempt in names))
+    return [i for i in range(len(names)) if i not in successes], successes, attempts
+
+
+TEAM_COLUMNS = get_counter_columns(TEAM_TARGET_NAMES)
+PLAYER_COLUMNS = get_counter_columns(PLAYER_DATA_NAMES)
+
+
+class QuickSimulator:
+    """
+    统计抽样的快速模拟，用于无人观看的电脑间比赛
+    不逐回合模拟，而是以两队能力与战术比重为特征，按完整比赛引擎校准的回归模型得到比分与各项数据的期望，
+    进球数按（过离散的）泊松分布抽样，场上数据按泊松与二项分布抽样，再交给GameEvE.finish()完成加时、点球与评分，
+    写入的Game、GamePlayerData与完整模拟相同，但没有事件记录，也无法重放
+    校准数据与训练命令见modules/ml_app/quick_sim_trainer.py
+    """
+
+    def __init__(
+        self,
+        team_weights: np.ndarray,
+        player_weights: np.ndarray,
+        assist_rate: float,
+        goals_dispersion: float = 1.0,
+    ):
+        """
+        :param team_weights: 球队回归系数，形状为(球队特征数, 球队目标数)，目标见TEAM_TARGET_NAMES
+        :param player_weights: 球员回归系数，形状为(球员特征数, 球员目标数)，目标见PLAYER_TARGET_NAMES
+        :param assist_rate: 进球有助攻的比例
+        :param goals_dispersion: 进球数的方差与期望之比，大于1时按负二项分布抽样
+        """
+        self.team_weights = team_weights
+        self.player_weights = player_weights
+        self.assist_rate = assist_rate
+        self.goals_dispersion = goals_dispersion
+
+    @staticmethod
+    def get_team_arrays(team: "game_app.game_eve_app.Team") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :return: 各球员位置的独热矩阵、能力矩阵（除以100）与初始体力
+        """
+        locations = np.zeros((len(team.players), len(LOCATION_NAMES)))
+        locations[np.arange(len(team.players)), [LOCATION_INDEX[player.ori_location] for player in team.players]] = 1
+        capa = np.array([[player.capa[name] for name in game_configs.engine_capa] for player in team.players]) / 100
+        return locations, capa, np.array([player.stamina for player in team.players], dtype=float)
+
+    @staticmethod
+    def get_group_features(locations: np.ndarray, capa: np.ndarray) -> np.ndarray:
+        """
+        一队的分组能力：各位置组的人数与能力均值，同TacticSurrogate.get_team_features
+        :param locations: 位置的独热矩阵
+        :param capa: 能力矩阵
+        """
+        groups = locations @ LOCATION_GROUP_MATRIX
+        counts = groups.sum(axis=0)
+        means = groups.T @ capa / np.maximum(counts, 1)[:, None]
+        return np.hstack([counts[:, None], means]).ravel()
+
+    @classmethod
+    def get_team_features(cls, team_arrays: Tuple, opponent_arrays: Tuple, tactic: Dict[str, int]) -> np.ndarray:
+        """
+        一队的特征：两队的分组能力、本队的战术比重占比与常数项
+        :param team_arrays: 本队的位置与能力，见get_team_arrays
+        :param opponent_arrays: 对方的位置与能力
+        :param tactic: 本队的战术比重
+        """
+        total = sum(tactic[name] for name in TACTIC_NAMES) or 1
+        return np.concatenate(
+            [
+                cls.get_group_features(*team_arrays[:2]),
+                cls.get_group_features(*opponent_arrays[:2]),
+                [tactic[name] / total for name in TACTIC_NAMES],
+                [1.0],
+            ]
+        )
+
+    @staticmethod
+    def get_players_features(team_arrays: Tuple, opponent_arrays: Tuple) -> np.ndarray:
+        """
+        一队各球员的特征：位置、自身能力与初始体力、两队的能力均值、常数项
+        :return: 每行一名球员
+        """
+        locations, capa, stamina = team_arrays
+        players_num = len(locations)
+        return np.hstack(
+            [
+                locations,
+                capa,
+                stamina[:, None] / 100,
+                np.tile(capa.mean(axis=0), (players_num, 1)),
+                np.tile(opponent_arrays[1].mean(axis=0), (players_num, 1)),
+                np.ones((players_num, 1)),
+            ]
+        )
+
+    @staticmethod
+    def fit(features: np.ndarray, targets: np.ndarray, l2: float = 1.0) -> np.ndarray:
+        """
+        岭回归，正则化不作用于最后一列的常数项
+        :return: 回归系数
+        """
+        penalty = np.eye(features.shape[1]) * l2
+        penalty[-1, -1] = 0
+        return np.linalg.solve(features.T @ features + penalty, features.T @ targets)
+
+    def sample_goals(self, rng: np.random.Generator, expected: np.ndarray) -> np.ndarray:
+        """
+        :param expected: 两队进球数的期望
+        """
+        expected = np.maximum(expected, 0.05)
+        if self.goals_dispersion > 1:
+            # 负二项分布：泊松分布的期望服从伽马分布
+            expected = rng.gamma(expected / (self.goals_dispersion - 1), self.goals_dispersion - 1)
+        return rng.poisson(expected)
+
+    @staticmethod
+    def sample_counters(rng: np.random.Generator, expected: np.ndarray, columns: Tuple) -> np.ndarray:
+        """
+        按期望抽样计数：尝试次数等服从泊松分布，成功次数服从二项分布，成功率取两者期望之比
+        :param expected: 各计数的期望，每行一队或一名球员
+        :param columns: 见get_counter_columns
+        :return: 与expected形状相同的整数数组
+        """
+        counters_columns, successes, attempts = columns
+        expected = np.maximum(expected, 0)
+        counters = np.zeros(expected.shape, dtype=np.int64)
+        counters[:, counters_columns] = rng.poisson(expected[:, counters_columns])
+        rate = np.clip(expected[:, successes] / np.maximum(expected[:, attempts], 1e-6), 0, 1)
+        counters[:, successes] = rng.binomial(counters[:, attempts], rate)
+        return counters
+
+    def simulate(self, game_eve: "game_app.GameEvE"):
+        """
+        抽样常规时间的比赛结果并写入比赛实例，之后可直接调用GameEvE.finish()
+        随机数取自比赛自身的随机数流，相同种子下结果一致
+        :param game_eve: 已挑选好首发阵容的比赛实例
+        """
+        rng = np.random.default_rng(game_eve.rng.getrandbits(32))
+        teams = (game_eve.lteam, game_eve.rteam)
+        arrays = [self.get_team_arrays(team) for team in teams]
+        team_features = np.stack(
+            [self.get_team_features(arrays[side], arrays[1 - side], teams[side].tactic) for side in (0, 1)]
+        )
+        expected = team_features @ self.team_weights
+        scores = self.sample_goals(rng, expected[:, 0])
+        teams_data = self.sample_counters(rng, expected, TEAM_COLUMNS)
+        for team, score, team_data in zip(teams, scores, teams_data):
+            team.score = int(score)
+            for i, name in enumerate(TEAM_TARGET_NAMES[1:], start=1):
+                team.data[name] += int(team_data[i])
+            team.data["attempts"] += int(team_data[TEAM_COLUMNS[0][1:]].sum())  # 除进球外的各战术尝试次数
+
+        rows = (slice(0, len(teams[0].players)), slice(len(teams[0].players), None))  # 两队球员所在的行
+        players_features = np.vstack(
+            [self.get_players_features(arrays[0], arrays[1]), self.get_players_features(arrays[1], arrays[0])]
+        )
+        expected = np.maximum(players_features @ self.player_weights, 0)
+        players_data = self.sample_counters(rng, expected[:, :-1], PLAYER_COLUMNS)
+        for side, team in enumerate(teams):
+            self.assign_goals(rng, team.score, expected[rows[side]], players_data[rows[side]])
+        # 扑救由对方的射门与进球决定，只计入门将
+        for side, team in enumerate(teams):
+            team_data = players_data[rows[side]]
+            team_data[:, [SAVES, SAVE_SUCCESS]] = 0
+            goalkeepers = np.flatnonzero(arrays[side][0][:, LOCATION_INDEX[game_configs.Location.GK]])
+            if len(goalkeepers):
+                opponent_shots = int(players_data[rows[1 - side], SHOTS].sum())
+                team_data[goalkeepers[0], SAVES] = opponent_shots
+                team_data[goalkeepers[0], SAVE_SUCCESS] = max(opponent_shots - teams[1 - side].score, 0)
+            for player, data, drop in zip(team.players, team_data.tolist(), expected[rows[side], -1]):
+                player_data = player.data
+                for i, name in enumerate(PLAYER_DATA_NAMES):
+                    player_data[name] += data[i]
+                player_data["actions"] += sum(data)
+                player.stamina = max(player.stamina - float(drop), 0)
+
+        # 进球回合随机分布在常规时间内
+        goals = [
+            (side, i)
+            for side in (0, 1)
+            for i, player in enumerate(teams[side].players)
+            for _ in range(player.data["goals"])
+        ]
+        for k, turns in zip(rng.permutation(len(goals)), sorted(rng.integers(0, 50, size=len(goals)))):
+            side, i = goals[k]
+            game_eve.turns = int(turns)
+            teams[side].record_goal(player=teams[side].players[i])
+        game_eve.turns = 49
+
+    def assign_goals(self, rng: np.random.Generator, score: int, expected: np.ndarray, player_data: np.ndarray):
+        """
+        将球队进球分配给球员：射手按进球期望抽取，射门次数不少于进球数；助攻者按助攻期望从其余球员中抽取
+        :param score: 球队进球数
+        :param expected: 各球员的数据期望，列见PLAYER_TARGET_NAMES
+        :param player_data: 各球员的数据，原地修改
+        """
+        player_data[:, [GOALS, ASSISTS]] = 0
+        scorer_weights = np.cumsum(expected[:, GOALS] + 1e-3)
+        assister_weights = expected[:, ASSISTS] + 1e-3
+        for _ in range(score):
+            scorer = int(np.searchsorted(scorer_weights, rng.random() * scorer_weights[-1], side="right"))
+            player_data[scorer, GOALS] += 1
+            player_data[scorer, SHOTS] = max(player_data[scorer, SHOTS], player_data[scorer, GOALS])
+            if len(player_data) > 1 and rng.random() < self.assist_rate:
+                weights = assister_weights.copy()
+                weights[scorer] = 0
+                weights = np.cumsum(weights)
+                player_data[int(np.searchsorted(weights, rng.random() * weights[-1], side="right")), ASSISTS] += 1
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            team_weights=self.team_weights,
+            player_weights=self.player_weights,
+            team_target_names=np.array(TEAM_TARGET_NAMES),
+            player_target_names=np.array(PLAYER_TARGET_NAMES),
+            assist_rate=self.assist_rate,
+            goals_dispersion=self.goals_dispersion,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "QuickSimulator":
+        """
+        读取模型文件，目标与当前版本不一致时报错
+        """
+        data = np.load(path)
+        if (
+            tuple(data["team_target_names"]) != TEAM_TARGET_NAMES
+            or tuple(data["player_target_names"]) != PLAYER_TARGET_NAMES
+        ):
+            raise ValueError("快速模拟模型{}的预测目标与当前版本不一致，请重新校准".format(path))
+        return cls(
+            team_weights=data["team_weights"],
+            player_weights=data["player_weights"],
+            assist_rate=float(data["assist_rate"]),
+            goals_dispersion=float(data["goals_dispersion"]),
+        )
+
+    @classmethod
+    def load_default(cls) -> Optional["QuickSimulator"]:
+        """
+        按配置读取快速模拟模型，文件不存在时为空
+        """
+        path = game_configs.quick_sim_path
+        if not os.path.exists(path):
+            logger.warning("快速模拟模型{}不存在，快速模拟的比赛改为无解说模拟".format(path))
+            return None
+        return cls.load(path)
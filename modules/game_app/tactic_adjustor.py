@@ -1,4 +1,8 @@
+import random
+from typing import Dict, Optional, Tuple
+
 import crud
+import game_configs
 import models
 from modules import game_app
 from sqlalchemy.orm import Session
@@ -21,7 +25,13 @@ class TacticAdjustor:
         date: str,
         club1_model: models.Club = None,
         club2_model: models.Club = None,
+        tactic_cache: Optional["game_app.TacticCache"] = None,
+        tactic_estimator: Optional["game_app.TacticSurrogate"] = None,
     ):
+        """
+        :param tactic_cache: 战术调整缓存，为空时每次都进行模拟赛
+        :param tactic_estimator: 代理模型，不为空时以预测代替模拟赛
+        """
         self.db = db
         self.season = season
         self.date = date
@@ -31,12 +41,15 @@ class TacticAdjustor:
         self.save_id = save_id
         self.club1_model = club1_model if club1_model else crud.get_club_by_id(db, club1_id)
         self.club2_model = club2_model if club2_model else crud.get_club_by_id(db, club2_id)
+        self.tactic_cache = tactic_cache
+        self.tactic_estimator = tactic_estimator
 
-    def adjust(self):
+    def init_test_game(self, rng: Optional[random.Random] = None) -> "game_app.GameEvE":
         """
-        调整战术比重 保存至coach表中
+        创建用于战术调整的模拟比赛
+        :param rng: 模拟赛的种子与首发阵容的挑选所用的随机数，为空时使用全局的random
         """
-        game = game_app.GameEvE(
+        return game_app.GameEvE(
             db=self.db,
             club1_id=self.club1_id,
             club2_id=self.club2_id,
@@ -47,36 +60,24 @@ class TacticAdjustor:
             save_id=self.save_id,
             club1_model=self.club1_model,
             club2_model=self.club2_model,
+            fidelity=game_configs.Fidelity.headless,  # 模拟比赛无需解说
+            seed=rng.getrandbits(32) if rng else None,
+            lineup_rng=rng,
         )
-        lteam_data, rteam_data = game.tactical_start(num=10)
 
-        tactic_pro1 = dict()
-        tactic_pro1["wing_cross"] = int((lteam_data["wing_cross_success"] / lteam_data["wing_cross"] + 0.01) * 1000) + 5
-        tactic_pro1["under_cutting"] = (
-            int((lteam_data["under_cutting_success"] / (lteam_data["under_cutting"] + 0.01)) * 1000) + 5
-        )
-        tactic_pro1["pull_back"] = int((lteam_data["pull_back_success"] / (lteam_data["pull_back"] + 0.01)) * 1000) + 5
-        tactic_pro1["middle_attack"] = (
-            int((lteam_data["middle_attack_success"] / (lteam_data["middle_attack"] + 0.01)) * 1000) + 5
-        )
-        tactic_pro1["counter_attack"] = (
-            int((lteam_data["counter_attack_success"] / (lteam_data["counter_attack"] + 0.01)) * 1000) + 5
-        )
+    def adjust(self, lteam_data: Optional[dict] = None, rteam_data: Optional[dict] = None):
+        """
+        调整战术比重 保存至coach表中
+        :param lteam_data: 已模拟好的主队战术数据，为空时现场模拟
+        :param rteam_data: 已模拟好的客队战术数据，为空时现场模拟
+        """
+        if lteam_data is None or rteam_data is None:
+            # 首发阵容需在数据库中挑选，模拟比赛本身不访问数据库
+            match = game_app.MatchSnapshot.from_game(self.init_test_game())
+            lteam_data, rteam_data = self.play_tactical(match)
 
-        tactic_pro2 = dict()
-        tactic_pro2["wing_cross"] = (
-            int((rteam_data["wing_cross_success"] / (rteam_data["wing_cross"] + 0.01)) * 1000) + 5
-        )
-        tactic_pro2["under_cutting"] = (
-            int((rteam_data["under_cutting_success"] / (rteam_data["under_cutting"] + 0.01)) * 1000) + 5
-        )
-        tactic_pro2["pull_back"] = int((rteam_data["pull_back_success"] / (rteam_data["pull_back"] + 0.01)) * 1000) + 5
-        tactic_pro2["middle_attack"] = (
-            int((rteam_data["middle_attack_success"] / (rteam_data["middle_attack"] + 0.01)) * 1000) + 5
-        )
-        tactic_pro2["counter_attack"] = (
-            int((rteam_data["counter_attack_success"] / (rteam_data["counter_attack"] + 0.01)) * 1000) + 5
-        )
+        tactic_pro1 = self.get_tactic_pro(lteam_data)
+        tactic_pro2 = self.get_tactic_pro(rteam_data)
 
         if self.club1_id != self.player_club_id:
             for key, value in tactic_pro1.items():
@@ -85,6 +86,47 @@ class TacticAdjustor:
         if self.club2_id != self.player_club_id:
             for key, value in tactic_pro2.items():
                 setattr(self.club2_model.coach, key, value)
-            # coach_id = crud.get_club_by_id(db=self.db, club_id=self.club2_id).coach.id
-            # crud.update_coach(db=self.db, coach_id=coach_id, attri=tactic_pro2)
-        # self.db.commit()
+
+    def play_tactical(self, match: "game_app.MatchSnapshot") -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        自适应地进行战术调整模拟赛，见game_app.TacticOptimizer；阵容未变时直接使用缓存的结果，有代理模型时直接预测
+        :param match: 模拟赛的快照
+        :return: 两队的战术数据
+        """
+        if self.tactic_estimator is not None:
+            return self.tactic_estimator.predict_teams_data(match)
+        if self.tactic_cache is None:
+            return match.optimize_tactics()
+        key = self.tactic_cache.get_key(match)
+        teams_data = self.tactic_cache.get(key, self.date)
+        if teams_data is None:
+            teams_data = match.optimize_tactics()
+            self.tactic_cache.put(key, self.date, teams_data)
+        return teams_data
+
+    @staticmethod
+    def get_success_rates(team_data: dict) -> Dict[str, float]:
+        """
+        各战术的成功率估计：向球队整体成功率收缩，尝试次数越少收缩越多，减小少量模拟比赛带来的噪声
+        :param team_data: 球队战术数据
+        :return: 战术名: 成功率
+        """
+        prior = game_configs.tactic_prior_strength
+        attempts = sum(team_data[tactic.value] for tactic in game_configs.Tactic)
+        success = sum(team_data["{}_success".format(tactic.value)] for tactic in game_configs.Tactic)
+        mean = success / attempts if attempts else 0
+        return {
+            tactic.value: (team_data["{}_success".format(tactic.value)] + prior * mean)
+            / (team_data[tactic.value] + prior)
+            for tactic in game_configs.Tactic
+        }
+
+    @staticmethod
+    def get_tactic_pro(team_data: dict) -> Dict[str, int]:
+        """
+        根据战术执行数据计算战术比重
+        :param team_data: 球队战术数据
+        :return: 战术比重字典
+        """
+        rates = TacticAdjustor.get_success_rates(team_data)
+        return {name: int(rate * 1000) + 5 for name, rate in rates.items()}
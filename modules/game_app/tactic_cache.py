@@ -0,0 +1,157 @@
+import datetime
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import game_configs
+from modules.game_app.match_engine import ClubSnapshot, MatchSnapshot
+from utils import logger
+
+TeamsData = Tuple[Dict[str, int], Dict[str, int]]
+
+
+class TacticCache:
+    """
+    战术调整结果的缓存
+    以两队首发阵容的指纹为键，保存战术调整模拟赛得到的两队战术数据；
+    同一对阵且阵容未变时（两回合淘汰赛、杯赛重赛、度假时的连续比赛日）直接使用缓存，不再进行模拟赛
+    阵容指纹包括球员id、位置、按档划分的体力与取整的能力，转会与阵容变动会改变指纹，
+    另外可按俱乐部主动清除；缓存按最近使用淘汰，并在超过有效天数后失效
+    每个存档在进程内只有一个缓存（见get_by_save），下一回合的各次请求与任务共用；
+    最多保留game_configs.tactic_cache_saves个存档的缓存，按最近使用淘汰，删除存档时一并移除（见drop_save）
+    """
+
+    saves: OrderedDict = OrderedDict()  # 存档id: 该存档的缓存
+    saves_lock = threading.Lock()
+
+    def __init__(self, max_size: int = game_configs.tactic_cache_size, ttl_days: int = game_configs.tactic_cache_ttl):
+        """
+        :param max_size: 最多缓存的对阵数
+        :param ttl_days: 缓存的有效天数，按游戏内日期计算
+        """
+        self.max_size = max_size
+        self.ttl_days = ttl_days
+        self.entries: OrderedDict = OrderedDict()  # 键: (缓存日期, 两队战术数据)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def get_by_save(cls, save_id: int) -> "TacticCache":
+        """
+        获取存档的缓存，不存在时新建
+        :param save_id: 存档id
+        """
+        with cls.saves_lock:
+            tactic_cache = cls.saves.get(save_id)
+            if tactic_cache is None:
+                tactic_cache = cls.saves[save_id] = cls()
+            cls.saves.move_to_end(save_id)
+            # 被淘汰的缓存仍可被正在进行的回合使用，之后的回合重新建立
+            while len(cls.saves) > game_configs.tactic_cache_saves:
+                cls.saves.popitem(last=False)
+            return tactic_cache
+
+    @classmethod
+    def drop_save(cls, save_id: int):
+        """
+        移除存档的缓存，用于删除存档
+        :param save_id: 存档id
+        """
+        with cls.saves_lock:
+            cls.saves.pop(save_id, None)
+
+    @staticmethod
+    def get_fingerprint(club: ClubSnapshot, lineup: List[Tuple]) -> Tuple:
+        """
+        球队阵容的指纹
+        :param club: 俱乐部快照
+        :param lineup: 首发阵容，见MatchSnapshot
+        :return: (俱乐部id, 阵容, 能力版本)
+        """
+        players = []
+        capability = []
+        for player_snapshot, location, _ in lineup:
+            players.append((player_snapshot.id, location))
+            capa = player_snapshot.capa
+            capability.append(
+                (
+                    int(player_snapshot.real_stamina) // game_configs.tactic_cache_stamina_step,
+                    int(sum(capa[name] for name in game_configs.engine_capa) / len(game_configs.engine_capa)),
+                )
+            )
+        return int(club.id), tuple(players), tuple(capability)
+
+    def get_key(self, match: MatchSnapshot) -> Tuple:
+        """
+        比赛的缓存键
+        :param match: 战术调整模拟赛的快照
+        """
+        return tuple(self.get_fingerprint(club, lineup) for club, lineup in zip(match.clubs, match.lineups))
+
+    @staticmethod
+    def get_days(date: str) -> int:
+        year, month, day = date.split("-")
+        return datetime.date(int(year), int(month), int(day)).toordinal()
+
+    def get(self, key: Tuple, date: str) -> Optional[TeamsData]:
+        """
+        读取缓存，并记录命中与否
+        :param key: 缓存键
+        :param date: 当前游戏日期
+        :return: 两队战术数据，未命中时为空
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.get_days(date) - entry[0] > self.ttl_days:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, date: str, teams_data: TeamsData):
+        """
+        写入缓存
+        :param key: 缓存键
+        :param date: 当前游戏日期
+        :param teams_data: 两队战术数据
+        """
+        with self.lock:
+            self.entries[key] = (self.get_days(date), teams_data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate_clubs(self, club_ids: Iterable[int]):
+        """
+        清除涉及指定俱乐部的缓存，用于转会等阵容变动
+        :param club_ids: 俱乐部id
+        """
+        club_ids = {int(club_id) for club_id in club_ids}
+        if not club_ids:
+            return
+        with self.lock:
+            for key in [key for key in self.entries if key[0][0] in club_ids or key[1][0] in club_ids]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def report(self):
+        """
+        输出命中率，并清空统计
+        """
+        total = self.hits + self.misses
+        if total:
+            logger.info(
+                "战术缓存命中{}/{}次，命中率{:.1%}，缓存{}个对阵".format(
+                    self.hits, total, self.hits / total, len(self.entries)
+                )
+            )
+        self.hits = 0
+        self.misses = 0
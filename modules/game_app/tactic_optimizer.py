@@ -0,0 +1,85 @@
+import math
+from typing import Dict, List, Tuple
+
+import game_configs
+from modules import game_app
+
+TACTIC_NAMES = tuple(tactic.value for tactic in game_configs.Tactic)
+
+
+class TacticOptimizer:
+    """
+    自适应的战术调整模拟
+    逐场进行模拟比赛，每场之后按各战术成功率置信区间的半宽重新分配战术比重，
+    尚不确定的战术获得更多尝试；两队的置信区间均已分开或足够窄时提前停止，最多进行budget场
+    返回的战术数据与GameEvE.tactical_start相同，可直接交给TacticAdjustor.get_tactic_pro
+    """
+
+    def __init__(
+        self,
+        game_eve: "game_app.GameEvE",
+        budget: int = game_configs.tactic_optimizer_budget,
+        min_matches: int = game_configs.tactic_optimizer_min_matches,
+        z: float = game_configs.tactic_optimizer_z,
+        tolerance: float = game_configs.tactic_optimizer_tolerance,
+    ):
+        """
+        :param game_eve: 不连接数据库的模拟比赛实例
+        :param budget: 最多模拟的场数
+        :param min_matches: 检查停止条件前至少模拟的场数
+        :param z: 置信区间的z值
+        :param tolerance: 所有战术的置信区间半宽均不大于该值时停止
+        """
+        self.game_eve = game_eve
+        self.budget = budget
+        self.min_matches = min_matches
+        self.z = z
+        self.tolerance = tolerance
+        self.matches = 0  # 实际模拟的场数
+
+    def run(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        :return: 两队的战术数据
+        """
+        teams = (self.game_eve.lteam, self.game_eve.rteam)
+        for team in teams:
+            team.tactic = {name: 50 for name in TACTIC_NAMES}
+        for self.matches in range(1, self.budget + 1):
+            self.game_eve.play_test_match()
+            if self.matches >= self.min_matches and all(self.is_settled(team.data) for team in teams):
+                break
+            for team in teams:
+                team.tactic = self.allocate(team.data)
+        return self.game_eve.lteam.data, self.game_eve.rteam.data
+
+    def get_intervals(self, team_data: Dict[str, int]) -> Dict[str, Tuple[float, float]]:
+        """
+        各战术成功率的估计值与置信区间半宽，估计值见TacticAdjustor.get_success_rates；
+        未尝试过的战术（阵型中无可用位置等）不在其中
+        :param team_data: 球队战术数据
+        :return: 战术名: (成功率, 半宽)
+        """
+        intervals = dict()
+        for name, p in game_app.TacticAdjustor.get_success_rates(team_data).items():
+            attempts = team_data[name]
+            if attempts:
+                intervals[name] = (p, self.z * math.sqrt(p * (1 - p) / (attempts + game_configs.tactic_prior_strength)))
+        return intervals
+
+    def is_settled(self, team_data: Dict[str, int]) -> bool:
+        """
+        按成功率排序后相邻战术的置信区间互不重叠，或所有半宽均不大于tolerance
+        """
+        intervals: List[Tuple[float, float]] = sorted(self.get_intervals(team_data).values())
+        if all(half_width <= self.tolerance for _, half_width in intervals):
+            return True
+        return all(low[0] + low[1] < high[0] - high[1] for low, high in zip(intervals, intervals[1:]))
+
+    def allocate(self, team_data: Dict[str, int]) -> Dict[str, int]:
+        """
+        按置信区间半宽分配下一场的战术比重，未尝试过的战术取最大半宽
+        :return: 战术比重字典
+        """
+        intervals = self.get_intervals(team_data)
+        max_width = max((half_width for _, half_width in intervals.values()), default=0) or 1
+        return {name: int(intervals.get(name, (0, max_width))[1] / max_width * 100) + 5 for name in TACTIC_NAMES}
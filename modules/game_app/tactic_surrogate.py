@@ -0,0 +1,132 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+import game_configs
+import numpy as np
+from modules import game_app
+from utils import logger
+
+TACTIC_NAMES = tuple(tactic.value for tactic in game_configs.Tactic)
+# 按场上位置分组统计能力
+LOCATION_GROUPS = (("GK",), ("CB",), ("LB", "RB"), ("LW", "RW", "LM", "RM"), ("CM", "CDM", "CAM"), ("ST",))
+# 预测目标：每场各战术的尝试与成功次数、进球数
+TARGET_NAMES = (
+    *(name for tactic in TACTIC_NAMES for name in (tactic, "{}_success".format(tactic))),
+    "goals",
+)
+
+
+class TacticSurrogate:
+    """
+    战术调整模拟赛的代理模型
+    以两队首发阵容的分组能力为特征，岭回归预测一队每场各战术的尝试次数、成功次数与进球数，
+    代替TacticAdjustor的模拟赛；训练数据与训练命令见modules/ml_app/surrogate_trainer.py
+    """
+
+    def __init__(self, weights: Optional[np.ndarray] = None, scale_matches: int = 10):
+        """
+        :param weights: 回归系数，形状为(特征数+1, 目标数)
+        :param scale_matches: 预测结果折算的模拟场数，决定收缩估计时预测结果的权重
+        """
+        self.weights = weights
+        self.scale_matches = scale_matches
+
+    @staticmethod
+    def get_team_features(lineup: List[Tuple]) -> List[float]:
+        """
+        一队的特征：各位置组的人数与各项能力的均值
+        :param lineup: 首发阵容，见MatchSnapshot
+        """
+        features = []
+        for group in LOCATION_GROUPS:
+            players = [player_snapshot for player_snapshot, location, _ in lineup if location in group]
+            features.append(len(players))
+            for name in game_configs.engine_capa:
+                features.append(sum(player.capa[name] for player in players) / len(players) / 100 if players else 0)
+        return features
+
+    @classmethod
+    def get_features(cls, lineup: List[Tuple], opponent_lineup: List[Tuple]) -> np.ndarray:
+        """
+        :return: 本队特征、对手特征与常数项
+        """
+        return np.array([*cls.get_team_features(lineup), *cls.get_team_features(opponent_lineup), 1.0])
+
+    @classmethod
+    def get_match_features(cls, match: "game_app.MatchSnapshot") -> np.ndarray:
+        """
+        :return: 两行特征，分别以主队、客队为本队
+        """
+        return np.stack(
+            [cls.get_features(match.lineups[0], match.lineups[1]), cls.get_features(match.lineups[1], match.lineups[0])]
+        )
+
+    def fit(self, features: np.ndarray, targets: np.ndarray, l2: float = 1.0):
+        """
+        岭回归
+        :param features: 特征矩阵，每行见get_features
+        :param targets: 目标矩阵，列顺序见TARGET_NAMES
+        :param l2: 正则化系数，不作用于常数项
+        """
+        penalty = np.eye(features.shape[1]) * l2
+        penalty[-1, -1] = 0
+        self.weights = np.linalg.solve(features.T @ features + penalty, features.T @ targets)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """
+        :param features: 特征向量或矩阵
+        :return: 预测值，不小于0
+        """
+        return np.maximum(features @ self.weights, 0)
+
+    def predict_teams_data(self, match: "game_app.MatchSnapshot") -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        预测两队的战术数据，格式与GameEvE.tactical_start相同，按scale_matches场折算
+        :param match: 战术调整模拟赛的快照
+        """
+        features = self.get_match_features(match)
+        teams_data = []
+        for prediction in self.predict(features) * self.scale_matches:
+            predicted = {name: int(round(value)) for name, value in zip(TARGET_NAMES, prediction)}
+            team_data = {"attempts": sum(predicted[tactic] for tactic in TACTIC_NAMES)}
+            for tactic in TACTIC_NAMES:
+                success_name = "{}_success".format(tactic)
+                team_data[tactic] = predicted[tactic]
+                team_data[success_name] = min(predicted[success_name], predicted[tactic])  # 成功次数不超过尝试次数
+            teams_data.append(team_data)
+        return teams_data[0], teams_data[1]
+
+    def predict_goals(self, match: "game_app.MatchSnapshot") -> Tuple[float, float]:
+        """
+        预测两队每场的进球数
+        :param match: 比赛快照
+        """
+        features = self.get_match_features(match)
+        goals = self.predict(features)[:, TARGET_NAMES.index("goals")]
+        return float(goals[0]), float(goals[1])
+
+    def save(self, path: str):
+        np.savez(path, weights=self.weights, target_names=np.array(TARGET_NAMES), scale_matches=self.scale_matches)
+
+    @classmethod
+    def load(cls, path: str) -> "TacticSurrogate":
+        """
+        读取模型文件，目标与当前版本不一致时报错
+        """
+        data = np.load(path)
+        if tuple(data["target_names"]) != TARGET_NAMES:
+            raise ValueError("代理模型{}的预测目标与当前版本不一致，请重新训练".format(path))
+        return cls(weights=data["weights"], scale_matches=int(data["scale_matches"]))
+
+    @classmethod
+    def load_default(cls) -> Optional["TacticSurrogate"]:
+        """
+        按配置读取代理模型，未启用或文件不存在时为空
+        """
+        path = game_configs.tactic_surrogate_path
+        if not game_configs.tactic_surrogate_enabled:
+            return None
+        if not os.path.exists(path):
+            logger.warning("代理模型{}不存在，战术调整仍使用模拟赛".format(path))
+            return None
+        return cls.load(path)
@@ -460,24 +460,16 @@ class CalendarGenerator:
                 # 第一赛季无欧冠
                 return
             # 一般是在结束16to8比赛后运行(1/21)
-            # computed_game = computed_data_app.ComputedGame(db=self.db, save_id=self.save_id)
+            computed_game = computed_data_app.ComputedGame(db=self.db, save_id=self.save_id)
             clubs: List[int] = []
             for i in range(8):
-                # TODO 把挑选两场比赛的分数最高者的逻辑写进ComputedGame中
-                query_str = "and_(models.Game.save_id=='{}',models.Game.season=='{}', models.Game.type=='{}')".format(
-                    self.save_id, self.save_model.season, "champions16to8_{}".format(i + 1)
+                clubs.extend(
+                    computed_game.get_game_winners(
+                        season=self.save_model.season,
+                        game_type="champions16to8_{}".format(i + 1),
+                        game_name="champions_league",
+                    )
                 )
-                games = crud.get_games_by_attri(db=self.db, query_str=query_str)
-                score_dict = dict()
-                for game in games:
-                    score_dict[game.teams[0].club_id] = score_dict.get(game.teams[0].club_id, 0)
-                    score_dict[game.teams[0].club_id] += game.teams[0].score
-                    score_dict[game.teams[1].club_id] = score_dict.get(game.teams[1].club_id, 0)
-                    score_dict[game.teams[1].club_id] += game.teams[1].score
-                if score_dict[games[0].teams[0].club_id] > score_dict[games[0].teams[1].club_id]:
-                    clubs.append(games[0].teams[0].club_id)
-                else:
-                    clubs.append(games[0].teams[1].club_id)
             if len(clubs) != 8:
                 logger.error('champions8to4" 数量错误!')
 
@@ -533,24 +525,16 @@ class CalendarGenerator:
                 # 第一赛季无欧冠
                 return
             # 一般是在结束8to4比赛后运行(3/4)
-            # computed_game = computed_data_app.ComputedGame(db=self.db, save_id=self.save_id)
+            computed_game = computed_data_app.ComputedGame(db=self.db, save_id=self.save_id)
             clubs: List[int] = []
             for i in range(4):
-                # TODO 把挑选两场比赛的分数最高者的逻辑写进ComputedGame中
-                query_str = "and_(models.Game.save_id=='{}',models.Game.season=='{}', models.Game.type=='{}')".format(
-                    self.save_id, self.save_model.season, "champions8to4_{}".format(i + 1)
+                clubs.extend(
+                    computed_game.get_game_winners(
+                        season=self.save_model.season,
+                        game_type="champions8to4_{}".format(i + 1),
+                        game_name="champions_league",
+                    )
                 )
-                games = crud.get_games_by_attri(db=self.db, query_str=query_str)
-                score_dict = dict()
-                for game in games:
-                    score_dict[game.teams[0].club_id] = score_dict.get(game.teams[0].club_id, 0)
-                    score_dict[game.teams[0].club_id] += game.teams[0].score
-                    score_dict[game.teams[1].club_id] = score_dict.get(game.teams[1].club_id, 0)
-                    score_dict[game.teams[1].club_id] += game.teams[1].score
-                if score_dict[games[0].teams[0].club_id] > score_dict[games[0].teams[1].club_id]:
-                    clubs.append(games[0].teams[0].club_id)
-                else:
-                    clubs.append(games[0].teams[1].club_id)
             if len(clubs) != 4:
                 logger.error('champions4to2" 数量错误!')
 
@@ -605,23 +589,16 @@ class CalendarGenerator:
                 # 第一赛季无欧冠
                 return
             # 一般是在结束4to2比赛后运行(4/8)
+            computed_game = computed_data_app.ComputedGame(db=self.db, save_id=self.save_id)
             clubs: List[int] = []
             for i in range(2):
-                # TODO 把挑选两场比赛的分数最高者的逻辑写进ComputedGame中
-                query_str = "and_(models.Game.save_id=='{}',models.Game.season=='{}', models.Game.type=='{}')".format(
-                    self.save_id, self.save_model.season, "champions4to2_{}".format(i + 1)
+                clubs.extend(
+                    computed_game.get_game_winners(
+                        season=self.save_model.season,
+                        game_type="champions4to2_{}".format(i + 1),
+                        game_name="champions_league",
+                    )
                 )
-                games = crud.get_games_by_attri(db=self.db, query_str=query_str)
-                score_dict = dict()
-                for game in games:
-                    score_dict[game.teams[0].club_id] = score_dict.get(game.teams[0].club_id, 0)
-                    score_dict[game.teams[0].club_id] += game.teams[0].score
-                    score_dict[game.teams[1].club_id] = score_dict.get(game.teams[1].club_id, 0)
-                    score_dict[game.teams[1].club_id] += game.teams[1].score
-                if score_dict[games[0].teams[0].club_id] > score_dict[games[0].teams[1].club_id]:
-                    clubs.append(games[0].teams[0].club_id)
-                else:
-                    clubs.append(games[0].teams[1].club_id)
             if len(clubs) != 2:
                 logger.error('champions2to1" 数量错误!')
 
@@ -9,7 +9,7 @@ import models
 import schemas
 from faker import Faker
 from sqlalchemy.orm import Session
-from utils import utils
+from utils import sampling, utils
 
 
 class PlayerGenerator:
@@ -27,6 +27,7 @@ class PlayerGenerator:
         self.ori_mean_capa = game_configs.ori_mean_capa
         self.ori_mean_potential_capa = game_configs.ori_mean_potential_capa
         self.avatar_style = game_configs.avatar_style
+        self.avatar_style_tables = {key: sampling.CdfTable(value) for key, value in self.avatar_style.items()}
 
     def import_files(self):
         """
@@ -199,9 +200,10 @@ class PlayerGenerator:
             #  根据综合能力值计算初始身价
             self.data["values"] = target_lo_capa**3 / 70
             self.data["wages"] = target_lo_capa**3 / 70 / 500
+            weight_table = sampling.location_weight_tables[original_location["name"]]
             while True:
                 # 模拟球员按照位置权重成长的过程
-                capa_name = utils.select_by_pro(original_location["weight"])
+                capa_name = weight_table.sample()
                 if self.data[capa_name] <= 90:
                     # 防止溢出
                     self.data[capa_name] += 1
@@ -345,8 +347,8 @@ class PlayerGenerator:
         随机生成头像json字符串
         """
         style = dict()
-        for key, value in self.avatar_style.items():
-            style[key] = utils.select_by_pro(value)
+        for key, table in self.avatar_style_tables.items():
+            style[key] = table.sample()
         style["facialHairColor"] = style["hairColor"]
         style["topColor"] = style["clotheColor"]
         return utils.turn_dict2str(style)
@@ -1,3 +1 @@
 from modules.ml_app.base_game.base_game import BaseGame
-from modules.ml_app.base_game.base_player import BasePlayer
-from modules.ml_app.base_game.base_team import BaseTeam
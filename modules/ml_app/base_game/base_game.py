@@ -1,81 +1,69 @@
-import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-import schemas
-from modules.ml_app.base_game import BaseTeam
-from sqlalchemy.orm import Session
+import game_configs
+from modules import game_app
+from modules.game_app.match_engine import ClubSnapshot, PlayerSnapshot
 from utils import logger
 
 
 class BaseGame:
-    def __init__(self, db: Session, pos: str):
-        self.db = db
-        self.script = ""
-        self.goal_record: List[schemas.GoalRecord] = []  # 进球记录
-        self.turns = 0  # 比赛进行的回合数 用于记录进球回合
-        self.lteam = BaseTeam(db=self.db, game=self)
-        self.rteam = BaseTeam(db=self.db, game=self)
-        self.pos = pos
+    """
+    用于生成训练数据的模拟比赛：两队阵型相同、球员能力均为基准值，主队一名指定位置的球员使用给定能力
+    比赛由game_app.MatchSnapshot模拟，不访问数据库
+    """
 
-    def start(self, capa: Dict, formation: Dict):
-        self.lteam.score = 0
-        self.rteam.score = 0
-        self.lteam.init_players(formation)
-        self.rteam.init_players(formation)
-        for p in self.lteam.players:
-            if p.ori_location == self.pos:
-                p.capa = capa
-                break
-        else:
-            logger.error("阵容中找不到目标位置球员！")
+    base_capa = 50  # 其余球员的各项能力
+    base_stamina = 100  # 所有球员的初始体力
 
-        # 模拟20场比赛
-        for i in range(20):
-            self.set_full_stamina()
-            # 模拟一场比赛
-            hold_ball_team, no_ball_team = self.init_hold_ball_team()
-            counter_attack_permitted = False
-            for _ in range(50):
-                # 确定本次战术组织每个球员的场上位置
-                self.lteam.shift_location()
-                self.rteam.shift_location()
-                original_score = (self.lteam.score, self.rteam.score)
-                # 执行进攻战术
-                exchange_ball = hold_ball_team.attack(no_ball_team, counter_attack_permitted)
-                if exchange_ball:
-                    hold_ball_team, no_ball_team = self.exchange_hold_ball_team(hold_ball_team)
-                if exchange_ball and original_score == (self.lteam.score, self.rteam.score):
-                    # 若球权易位且比分未变，允许使用防守反击
-                    counter_attack_permitted = True
-                else:
-                    counter_attack_permitted = False
-        # 返回队伍战术执行数据
-        return self.lteam.score, self.rteam.score
+    def __init__(self, pos: str):
+        self.pos = pos
 
-    def set_full_stamina(self):
+    def start(self, capa: Dict, formation: Dict, seed: Optional[int] = None) -> Tuple[int, int]:
         """
-        初始化所有球员的体力
+        以给定能力与阵型模拟20场比赛
+        :param capa: 指定位置球员的能力字典
+        :param formation: 阵型，位置名与人数
+        :param seed: 比赛随机数流的种子，为空时随机生成
+        :return: 20场比赛的两队总进球数
         """
-        for player in self.lteam.players:
-            player.stamina = 100
-        for player in self.rteam.players:
-            player.stamina = 100
+        match = game_app.MatchSnapshot(
+            clubs=(self.get_club(1), self.get_club(2)),
+            lineups=(self.get_lineup(formation, capa, self.pos), self.get_lineup(formation, capa)),
+            seed=seed,
+        )
+        game = match.build_game()
+        game.tactical_start(num=20)
+        return game.lteam.score, game.rteam.score
 
-    def init_hold_ball_team(self) -> Tuple[BaseTeam, BaseTeam]:
-        """
-        比赛开始时，随机选择持球队伍
-        :return: 持球队伍，无球队伍
-        """
-        hold_ball_team = random.choice([self.lteam, self.rteam])
-        no_ball_team = self.lteam if hold_ball_team == self.rteam else self.rteam
-        return hold_ball_team, no_ball_team
+    @staticmethod
+    def get_club(club_id: int) -> ClubSnapshot:
+        # 战术比重在GameEvE.tactical_start中统一设为50
+        tactic = {tactic.value: 50 for tactic in game_configs.Tactic}
+        return ClubSnapshot(club_id=club_id, name="a", reputation=0, tactic=tactic)
 
-    def exchange_hold_ball_team(self, hold_ball_team: BaseTeam) -> Tuple[BaseTeam, BaseTeam]:
+    def get_lineup(self, formation: Dict, capa: Dict, pos: str = "") -> List[Tuple]:
         """
-        球权易位
-        :param hold_ball_team: 原先持球的队伍实例
-        :return: 持球队伍，无球队伍
+        生成首发阵容
+        :param formation: 阵型
+        :param capa: 指定位置球员的能力字典，其余球员的各项能力均为基准值
+        :param pos: 使用给定能力的位置，为空时所有球员均为基准能力
+        :return: 可直接传给Team的首发阵容
         """
-        hold_ball_team = self.lteam if hold_ball_team == self.rteam else self.rteam
-        no_ball_team = self.lteam if hold_ball_team == self.rteam else self.rteam
-        return hold_ball_team, no_ball_team
+        lineup = []
+        is_target_found = False
+        for location, count in formation.items():
+            for _ in range(count):
+                if location == pos and not is_target_found:
+                    player_capa = dict(capa)
+                    is_target_found = True
+                else:
+                    player_capa = dict.fromkeys(capa, self.base_capa)
+                snapshot = PlayerSnapshot(
+                    player_id=len(lineup), translated_name="p", real_stamina=self.base_stamina, capa=player_capa
+                )
+                lineup.append((snapshot, location, snapshot))
+        if pos and not is_target_found:
+            logger.error("阵容中找不到目标位置球员！")
+        if len(lineup) != 11:
+            logger.error("球员数量不等于11")
+        return lineup
@@ -0,0 +1,159 @@
+"""
+校准快速模拟的统计模型game_app.QuickSimulator
+随机生成两队阵容、战术比重与体力，以完整比赛引擎的常规时间结果为校准数据，保存为quick_sim_records.npz，
+拟合后保存模型并输出各目标与完整模拟的一致程度；赛季层面的对比见benchmarks/quick_sim_report.py
+用法：python -m modules.ml_app.quick_sim_trainer [--num 比赛数] [--records 校准数据] [--model 模型文件] [--reuse]
+"""
+
+import argparse
+import os
+import random
+from typing import Dict, Tuple
+
+import game_configs
+import numpy as np
+from modules import game_app
+from modules.game_app.match_engine import ClubSnapshot
+from modules.game_app.quick_simulator import PLAYER_TARGET_NAMES, TACTIC_NAMES, TEAM_TARGET_NAMES, QuickSimulator
+from modules.ml_app.surrogate_trainer import SurrogateTrainer
+from utils import logger
+
+
+class QuickSimTrainer:
+    def __init__(self, seed: int = 0):
+        """
+        :param seed: 随机种子
+        """
+        self.rng = random.Random(seed)
+        self.surrogate_trainer = SurrogateTrainer(seed=seed)
+
+    def get_match(self) -> "game_app.MatchSnapshot":
+        """
+        生成随机比赛：阵容见SurrogateTrainer.get_lineup，战术比重与初始体力随机
+        """
+        clubs = []
+        lineups = []
+        for club_id in (1, 2):
+            tactic = {name: self.rng.randint(10, 90) for name in TACTIC_NAMES}
+            clubs.append(ClubSnapshot(club_id=club_id, name="t", reputation=0, tactic=tactic))
+            formation = game_configs.formations[self.rng.choice(list(game_configs.formations))]
+            lineup = self.surrogate_trainer.get_lineup(formation)
+            for player_snapshot, _, _ in lineup:
+                player_snapshot.real_stamina = self.rng.uniform(50, 100)
+            lineups.append(lineup)
+        return game_app.MatchSnapshot(
+            clubs=(clubs[0], clubs[1]), lineups=(lineups[0], lineups[1]), seed=self.rng.getrandbits(32)
+        )
+
+    def generate_records(self, num: int) -> Dict[str, np.ndarray]:
+        """
+        生成校准数据，每场比赛两条球队数据与两队各球员的数据
+        :param num: 比赛数
+        :return: 球队特征与目标、球员特征与目标及所属球队，目标列见TEAM_TARGET_NAMES与PLAYER_TARGET_NAMES
+        """
+        team_features, team_targets, player_features, player_targets = [], [], [], []
+        player_team = []  # 各条球员数据所属的球队数据序号
+        for i in range(num):
+            game_eve = self.get_match().build_game()
+            teams = (game_eve.lteam, game_eve.rteam)
+            arrays = [QuickSimulator.get_team_arrays(team) for team in teams]
+            game_eve.simulate()
+            for side, team in enumerate(teams):
+                team_features.append(QuickSimulator.get_team_features(arrays[side], arrays[1 - side], team.tactic))
+                team_targets.append([team.score, *(team.data[name] for name in TEAM_TARGET_NAMES[1:])])
+                player_features.append(QuickSimulator.get_players_features(arrays[side], arrays[1 - side]))
+                player_team.extend([len(team_targets) - 1] * len(team.players))
+                for player, original_stamina in zip(team.players, arrays[side][2]):
+                    player_targets.append(
+                        [*(player.data[name] for name in PLAYER_TARGET_NAMES[:-1]), original_stamina - player.stamina]
+                    )
+            if (i + 1) % 500 == 0:
+                logger.info("已生成{}/{}场".format(i + 1, num))
+        return {
+            "team_features": np.array(team_features),
+            "team_targets": np.array(team_targets, dtype=float),
+            "player_features": np.vstack(player_features),
+            "player_targets": np.array(player_targets, dtype=float),
+            "player_team": np.array(player_team),
+        }
+
+    @staticmethod
+    def split(records: Dict[str, np.ndarray]) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """
+        按比赛划分校准与验证数据，每5场取1场验证
+        """
+        team_validation = np.arange(len(records["team_features"])) // 2 % 5 == 0
+        player_validation = team_validation[records["player_team"]]
+        train, validation = dict(), dict()
+        for key, value in records.items():
+            mask = team_validation if key.startswith("team") else player_validation
+            train[key] = value[~mask]
+            validation[key] = value[mask]
+        return train, validation
+
+    @staticmethod
+    def train(records: Dict[str, np.ndarray], l2: float = 1.0) -> QuickSimulator:
+        team_weights = QuickSimulator.fit(records["team_features"], records["team_targets"], l2=l2)
+        player_weights = QuickSimulator.fit(records["player_features"], records["player_targets"], l2=l2)
+        goals = records["team_targets"][:, 0]
+        expected = np.maximum(records["team_features"] @ team_weights[:, 0], 0.05)
+        assists = records["player_targets"][:, PLAYER_TARGET_NAMES.index("assists")].sum()
+        return QuickSimulator(
+            team_weights=team_weights,
+            player_weights=player_weights,
+            assist_rate=float(assists / max(goals.sum(), 1)),
+            goals_dispersion=float(((goals - expected) ** 2).sum() / expected.sum()),
+        )
+
+    @staticmethod
+    def report(model: QuickSimulator, records: Dict[str, np.ndarray]):
+        """
+        输出模型在验证数据上与完整模拟的一致程度：各目标的R2、均方根误差与均值
+        """
+        logger.info("{:<24}{:>8}{:>10}{:>10}".format("target", "R2", "rmse", "mean"))
+        for prefix, weights, names in (
+            ("team", model.team_weights, TEAM_TARGET_NAMES),
+            ("player", model.player_weights, PLAYER_TARGET_NAMES),
+        ):
+            targets = records["{}_targets".format(prefix)]
+            predictions = np.maximum(records["{}_features".format(prefix)] @ weights, 0)
+            for i, name in enumerate(names):
+                residual = ((targets[:, i] - predictions[:, i]) ** 2).sum()
+                total = ((targets[:, i] - targets[:, i].mean()) ** 2).sum()
+                logger.info(
+                    "{:<24}{:>8.3f}{:>10.3f}{:>10.3f}".format(
+                        "{}.{}".format(prefix, name),
+                        1 - residual / total if total else 0,
+                        np.sqrt(residual / len(targets)),
+                        targets[:, i].mean(),
+                    )
+                )
+        logger.info("助攻比例{:.3f}，进球数离散度{:.3f}".format(model.assist_rate, model.goals_dispersion))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="校准快速模拟的统计模型")
+    parser.add_argument("--num", type=int, default=4000, help="生成校准数据的比赛数")
+    parser.add_argument("--records", default=os.path.join(os.getcwd(), "quick_sim_records.npz"), help="校准数据路径")
+    parser.add_argument("--model", default=game_configs.quick_sim_path, help="模型保存路径")
+    parser.add_argument("--reuse", action="store_true", help="使用已有的校准数据，不重新生成")
+    parser.add_argument("--l2", type=float, default=1.0, help="岭回归的正则化系数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    trainer = QuickSimTrainer(seed=args.seed)
+    if args.reuse:
+        records = dict(np.load(args.records))
+    else:
+        records = trainer.generate_records(args.num)
+        np.savez(args.records, **records)
+        logger.info("校准数据已保存至{}".format(args.records))
+    train, validation = trainer.split(records)
+    trainer.report(trainer.train(train, l2=args.l2), validation)
+    model = trainer.train(records, l2=args.l2)
+    model.save(args.model)
+    logger.info("模型已保存至{}".format(args.model))
+
+
+if __name__ == "__main__":
+    main()
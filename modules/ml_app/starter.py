@@ -1,12 +1,14 @@
+import json
 import os
 import random
-from typing import Dict
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
 
 import pandas as pd
-from core.db import get_session
 from game_configs import formations
 from modules.ml_app.base_game.base_game import BaseGame
-from sqlalchemy.orm import Session
 from utils import logger
 
 pos_formations = {
@@ -25,76 +27,162 @@ pos_formations = {
 }
 
 
+def simulate_chunk(pos: str, num: int, seed: int) -> List[list]:
+    """
+    在子进程中生成一批数据
+    :param pos: 目标位置
+    :param num: 比赛数
+    :param seed: 本批数据的随机种子，同一批数据的结果与进程数无关
+    :return: 数据行列表
+    """
+    return Starter(pos).simulate_games(num, random.Random(seed))
+
+
 class Starter:
-    def __init__(self, pos: str, db: Session):
+    """
+    生成指定位置球员能力与比赛结果的训练数据
+    数据按批在进程池中生成，每批写入单独的分片文件，中断后再次运行会跳过已完成的分片；全部完成后合并为{pos}_records.csv
+    """
+
+    columns = [
+        "pos",
+        "formations",
+        "shooting",
+        "passing",
+        "dribbling",
+        "interception",
+        "pace",
+        "strength",
+        "aggression",
+        "anticipation",
+        "free_kick",
+        "stamina",
+        "goalkeeping",
+        "left_score",
+        "right_score",
+    ]
+
+    def __init__(self, pos: str):
         self.pos = pos
-        self.db = db
-        self.data = []
         self.path = os.getcwd()
 
-    def start(self, num: int):
-        self.simulate_games(num)
-        df = self.switch2df()
-        self.save_to_path(df)
+    def start(self, num: int, workers: Optional[int] = None, chunk_size: int = 500, seed: int = 0):
+        """
+        :param num: 比赛数
+        :param workers: 进程数，为空时取cpu核数；不大于1时在当前进程中执行
+        :param chunk_size: 每个分片的比赛数
+        :param seed: 随机种子，第i个分片的种子为seed+i
+        """
+        chunks = self.get_chunks(num, chunk_size, seed)
+        pending = [(i, size) for i, size in enumerate(chunks) if not os.path.exists(self.get_part_path(i))]
+        if len(pending) < len(chunks):
+            logger.info("{}已完成{}/{}个分片，继续生成".format(self.pos, len(chunks) - len(pending), len(chunks)))
+        workers = workers if workers else os.cpu_count()
+        total = sum(size for _, size in pending)
+        s = time.time()
+        done = 0
+        if workers <= 1:
+            for i, size in pending:
+                self.save_part(i, simulate_chunk(self.pos, size, seed + i))
+                done += size
+                self.log_progress(i, done, total, s)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(simulate_chunk, self.pos, size, seed + i): (i, size) for i, size in pending}
+                for future in as_completed(futures):
+                    i, size = futures[future]
+                    self.save_part(i, future.result())
+                    done += size
+                    self.log_progress(i, done, total, s)
+        self.merge_parts(len(chunks))
 
-    def simulate_games(self, num: int):
-        base_game = BaseGame(self.db, self.pos)
-        l, r = 0, 0
+    def simulate_games(self, num: int, rng: random.Random = random) -> List[list]:
+        """
+        :param num: 比赛数
+        :param rng: 随机数生成器
+        :return: 数据行列表，列见columns
+        """
+        base_game = BaseGame(self.pos)
+        data = []
         for _ in range(num):
-            capa = self.get_random_capa()
-            formation_name = random.choice(pos_formations[self.pos])
-            ls, rs = base_game.start(capa, formations[formation_name])
-            self.data.append([self.pos, formation_name, *self.get_ordered_capa_list(capa), ls, rs])
-            l += ls
-            r += rs
-        logger.info("{}:{}".format(l, r))
-
-    def switch2df(self) -> pd.DataFrame:
-        col = [
-            "pos",
-            "formations",
-            "shooting",
-            "passing",
-            "dribbling",
-            "interception",
-            "pace",
-            "strength",
-            "aggression",
-            "anticipation",
-            "free_kick",
-            "stamina",
-            "goalkeeping",
-            "left_score",
-            "right_score",
-        ]
-        df = pd.DataFrame(self.data, columns=col)
-        return df
+            capa = self.get_random_capa(rng)
+            formation_name = rng.choice(pos_formations[self.pos])
+            ls, rs = base_game.start(capa, formations[formation_name], seed=rng.getrandbits(32))
+            data.append([self.pos, formation_name, *self.get_ordered_capa_list(capa), ls, rs])
+        return data
+
+    def get_parts_dir(self) -> str:
+        return os.path.join(self.path, "{}_records_parts".format(self.pos))
+
+    def get_part_path(self, i: int) -> str:
+        return os.path.join(self.get_parts_dir(), "part-{:05d}.csv".format(i))
+
+    def get_chunks(self, num: int, chunk_size: int, seed: int) -> List[int]:
+        """
+        划分分片，并检查已有分片是否由相同参数生成，不同时清除重新生成
+        :return: 各分片的比赛数
+        """
+        chunks = [min(chunk_size, num - i) for i in range(0, num, chunk_size)]
+        meta = {"num": num, "chunk_size": chunk_size, "seed": seed}
+        parts_dir = self.get_parts_dir()
+        meta_path = os.path.join(parts_dir, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f_obj:
+                if json.load(f_obj) != meta:
+                    logger.warning("{}的已有分片参数不同，重新生成".format(self.pos))
+                    shutil.rmtree(parts_dir)
+        if not os.path.exists(parts_dir):
+            os.makedirs(parts_dir)
+            with open(meta_path, "w", encoding="utf-8") as f_obj:
+                json.dump(meta, f_obj)
+        return chunks
+
+    def save_part(self, i: int, data: List[list]):
+        """
+        写入一个分片，先写临时文件再改名，中断时不会留下不完整的分片
+        """
+        part_path = self.get_part_path(i)
+        pd.DataFrame(data, columns=self.columns).to_csv(part_path + ".tmp", index=False)
+        os.replace(part_path + ".tmp", part_path)
+
+    def log_progress(self, i: int, done: int, total: int, start_time: float):
+        elapsed = time.time() - start_time
+        logger.info(
+            "{} 分片{}完成，{}/{}场，{:.0f}场/s，预计剩余{:.0f}s".format(
+                self.pos, i, done, total, done / elapsed, (total - done) * elapsed / done
+            )
+        )
 
-    def save_to_path(self, df):
+    def merge_parts(self, chunks_num: int):
         """
-        保存球员信息表
-        :param df:球员信息表
+        按分片顺序合并为{pos}_records.csv，逐个分片复制，内存占用与总数据量无关；合并后删除分片
         """
-        if not os.path.exists(self.path):
-            os.mkdir(self.path)
-        df.to_csv(self.path + "/{}_records.csv".format(self.pos), index=False, encoding="utf-8-sig")
-        print("已保存至" + self.path + "\\{}_records.csv".format(self.pos))
+        records_path = os.path.join(self.path, "{}_records.csv".format(self.pos))
+        with open(records_path, "w", encoding="utf-8-sig", newline="") as f_obj:
+            for i in range(chunks_num):
+                with open(self.get_part_path(i), encoding="utf-8", newline="") as part:
+                    header = part.readline()
+                    if i == 0:
+                        f_obj.write(header)
+                    shutil.copyfileobj(part, f_obj)
+        shutil.rmtree(self.get_parts_dir())
+        logger.info("已保存至{}".format(records_path))
 
     @staticmethod
-    def get_random_capa() -> Dict:
+    def get_random_capa(rng: random.Random = random) -> Dict:
         capa = dict()
         capa_range = (10, 100)
-        capa["shooting"] = random.randint(*capa_range)
-        capa["passing"] = random.randint(*capa_range)
-        capa["dribbling"] = random.randint(*capa_range)
-        capa["interception"] = random.randint(*capa_range)
-        capa["pace"] = random.randint(*capa_range)
-        capa["strength"] = random.randint(*capa_range)
-        capa["aggression"] = random.randint(*capa_range)
-        capa["anticipation"] = random.randint(*capa_range)
-        capa["free_kick"] = random.randint(*capa_range)
-        capa["stamina"] = random.randint(*capa_range)
-        capa["goalkeeping"] = random.randint(*capa_range)
+        capa["shooting"] = rng.randint(*capa_range)
+        capa["passing"] = rng.randint(*capa_range)
+        capa["dribbling"] = rng.randint(*capa_range)
+        capa["interception"] = rng.randint(*capa_range)
+        capa["pace"] = rng.randint(*capa_range)
+        capa["strength"] = rng.randint(*capa_range)
+        capa["aggression"] = rng.randint(*capa_range)
+        capa["anticipation"] = rng.randint(*capa_range)
+        capa["free_kick"] = rng.randint(*capa_range)
+        capa["stamina"] = rng.randint(*capa_range)
+        capa["goalkeeping"] = rng.randint(*capa_range)
         return capa
 
     @staticmethod
@@ -115,5 +203,5 @@ class Starter:
 
 
 if __name__ == "__main__":
-    starter = Starter("ST", db=get_session())
+    starter = Starter("ST")
     starter.start(100)
@@ -0,0 +1,145 @@
+"""
+训练战术调整的代理模型game_app.TacticSurrogate
+随机生成两队阵容，以战术调整模拟赛的结果为训练数据，保存为tactic_records.csv，训练后保存模型并输出与模拟结果的一致程度
+用法：python -m modules.ml_app.surrogate_trainer [--num 比赛数] [--records 训练数据] [--model 模型文件] [--reuse]
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import Dict, List, Tuple
+
+import game_configs
+import numpy as np
+import pandas as pd
+from modules import game_app
+from modules.game_app.match_engine import ClubSnapshot, PlayerSnapshot
+from modules.game_app.tactic_surrogate import TARGET_NAMES, TacticSurrogate
+from utils import logger
+
+
+class SurrogateTrainer:
+    def __init__(self, seed: int = 0, matches: int = 10):
+        """
+        :param seed: 随机种子
+        :param matches: 每条训练数据的模拟场数
+        """
+        self.rng = random.Random(seed)
+        self.matches = matches
+
+    def get_lineup(self, formation: Dict[str, int]) -> List[Tuple]:
+        """
+        生成随机阵容：球队整体水平随机，球员能力在其附近波动，门将之外的球员门将能力较低
+        """
+        level = self.rng.uniform(35, 90)
+        lineup = []
+        for location, count in formation.items():
+            for _ in range(count):
+                capa = {name: min(max(self.rng.gauss(level, 10), 1), 99) for name in game_configs.engine_capa}
+                if location != "GK":
+                    capa["goalkeeping"] = self.rng.uniform(5, 30)
+                snapshot = PlayerSnapshot(player_id=len(lineup), translated_name="p", real_stamina=100, capa=capa)
+                lineup.append((snapshot, location, snapshot))
+        return lineup
+
+    def get_match(self) -> "game_app.MatchSnapshot":
+        clubs = []
+        lineups = []
+        for club_id in (1, 2):
+            tactic = {tactic.value: 50 for tactic in game_configs.Tactic}
+            clubs.append(ClubSnapshot(club_id=club_id, name="t", reputation=0, tactic=tactic))
+            lineups.append(self.get_lineup(game_configs.formations[self.rng.choice(list(game_configs.formations))]))
+        return game_app.MatchSnapshot(
+            clubs=(clubs[0], clubs[1]), lineups=(lineups[0], lineups[1]), seed=self.rng.getrandbits(32)
+        )
+
+    def generate_records(self, num: int) -> pd.DataFrame:
+        """
+        生成训练数据，每场比赛两条，分别以主队、客队为本队
+        :param num: 比赛数
+        :return: 特征列为f0、f1...，目标列见TARGET_NAMES，均为每场的平均值
+        """
+        rows = []
+        for i in range(num):
+            match = self.get_match()
+            game_eve = match.build_game()
+            teams_data = game_eve.tactical_start(num=self.matches)
+            scores = (game_eve.lteam.score, game_eve.rteam.score)
+            for features, team_data, score in zip(TacticSurrogate.get_match_features(match), teams_data, scores):
+                targets = [team_data[name] / self.matches for name in TARGET_NAMES[:-1]] + [score / self.matches]
+                rows.append([*features[:-1], *targets])
+            if (i + 1) % 100 == 0:
+                logger.info("已生成{}/{}场".format(i + 1, num))
+        features_num = len(rows[0]) - len(TARGET_NAMES)
+        return pd.DataFrame(rows, columns=["f{}".format(i) for i in range(features_num)] + list(TARGET_NAMES))
+
+    @staticmethod
+    def split(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: 含常数项的特征矩阵，目标矩阵
+        """
+        features = df[[column for column in df.columns if column.startswith("f")]].to_numpy()
+        features = np.hstack([features, np.ones((len(df), 1))])
+        return features, df[list(TARGET_NAMES)].to_numpy()
+
+    @classmethod
+    def train(cls, df: pd.DataFrame, l2: float = 1.0) -> TacticSurrogate:
+        features, targets = cls.split(df)
+        model = TacticSurrogate()
+        model.fit(features, targets, l2=l2)
+        return model
+
+    @classmethod
+    def report(cls, model: TacticSurrogate, df: pd.DataFrame):
+        """
+        输出模型在验证数据上与模拟结果的一致程度：各目标的R2与均方根误差，以及单场预测耗时
+        """
+        features, targets = cls.split(df)
+        predictions = model.predict(features)
+        logger.info("{:<24}{:>8}{:>10}{:>10}".format("target", "R2", "rmse", "mean"))
+        for i, name in enumerate(TARGET_NAMES):
+            residual = ((targets[:, i] - predictions[:, i]) ** 2).sum()
+            total = ((targets[:, i] - targets[:, i].mean()) ** 2).sum()
+            logger.info(
+                "{:<24}{:>8.3f}{:>10.3f}{:>10.3f}".format(
+                    name,
+                    1 - residual / total if total else 0,
+                    np.sqrt(residual / len(targets)),
+                    targets[:, i].mean(),
+                )
+            )
+        s = time.perf_counter()
+        for row in features[:1000]:
+            model.predict(row)
+        logger.info("单次预测耗时{:.1f}us".format((time.perf_counter() - s) / min(len(features), 1000) * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="训练战术调整的代理模型")
+    parser.add_argument("--num", type=int, default=2000, help="生成训练数据的比赛数")
+    parser.add_argument("--records", default=os.path.join(os.getcwd(), "tactic_records.csv"), help="训练数据路径")
+    parser.add_argument("--model", default=game_configs.tactic_surrogate_path, help="模型保存路径")
+    parser.add_argument("--reuse", action="store_true", help="使用已有的训练数据，不重新生成")
+    parser.add_argument("--l2", type=float, default=1.0, help="岭回归的正则化系数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    trainer = SurrogateTrainer(seed=args.seed)
+    if args.reuse:
+        df = pd.read_csv(args.records)
+    else:
+        df = trainer.generate_records(args.num)
+        df.to_csv(args.records, index=False)
+        logger.info("训练数据已保存至{}".format(args.records))
+    # 每场比赛的两条数据相邻，按比赛划分训练与验证数据
+    validation = df.index // 2 % 5 == 0
+    model = trainer.train(df[~validation], l2=args.l2)
+    trainer.report(model, df[validation])
+    model = trainer.train(df, l2=args.l2)
+    model.save(args.model)
+    logger.info("模型已保存至{}".format(args.model))
+
+
+if __name__ == "__main__":
+    main()
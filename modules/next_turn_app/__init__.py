@@ -1 +1,2 @@
 from modules.next_turn_app.next_turner import NextTurner
+from modules.next_turn_app.job_runner import JobRunner
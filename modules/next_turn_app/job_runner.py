@@ -0,0 +1,233 @@
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import crud
+import game_configs
+import models
+import schemas
+from core.db import CheckpointSession, SessionLocal, save_lock
+from modules.next_turn_app.next_turner import NextTurner
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from utils import logger
+
+
+class JobRunner:
+    """
+    下一回合任务的执行
+    接口把任务写入next_turn_job表后立即返回任务id，工作线程以各自的会话执行，进度通过查询任务获得；
+    任务在core.db.CheckpointSession中运行，已完成的天数与存档在同一事务中按检查点提交，
+    因此出错、取消或服务重启后，存档总是停在finished_num天处，继续执行时从这里接着行进剩余的天数
+    同一存档同时只有一个未结束的任务（next_turn_job.active_save_id唯一），执行时另持有core.db.save_lock，
+    不同存档的任务在各自的工作线程中并行
+    取消请求写入next_turn_job.cancel_requested，任务可能在其他进程中运行，工作线程每天结束后另开会话读取
+    """
+
+    executor: Optional[ThreadPoolExecutor] = None
+    lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        with cls.lock:
+            if cls.executor is None:
+                cls.executor = ThreadPoolExecutor(
+                    max_workers=game_configs.next_turn_job_workers, thread_name_prefix="next_turn_job"
+                )
+            return cls.executor
+
+    @classmethod
+    def enqueue(cls, db: Session, job: schemas.NextTurnJobCreate, state: Optional[str] = None) -> models.NextTurnJob:
+        """
+        新建任务并交给工作线程；重复的请求不新建任务：
+        幂等键相同时返回该键对应的任务（可能已完成），存档已有未结束的任务时返回该任务
+        :param job: 任务参数
+        :param state: 新建任务的初始结果，见models.NextTurnJob.state
+        :return: 新建或已有的任务
+        """
+        if job.idempotency_key is not None:
+            db_job = crud.get_next_turn_job_by_key(db=db, save_id=job.save_id, idempotency_key=job.idempotency_key)
+            if db_job is not None:
+                return db_job
+        db_job = crud.get_active_next_turn_job(db=db, save_id=job.save_id)
+        if db_job is not None:
+            return db_job
+        try:
+            db_job = crud.create_next_turn_job(db=db, job=job, state=state)
+        except IntegrityError:
+            # 并发的重复请求已先写入
+            db.rollback()
+            if job.idempotency_key is not None:
+                db_job = crud.get_next_turn_job_by_key(db=db, save_id=job.save_id, idempotency_key=job.idempotency_key)
+            if db_job is None:
+                db_job = crud.get_active_next_turn_job(db=db, save_id=job.save_id)
+            if db_job is None:
+                raise
+            return db_job
+        cls.submit(db_job.id)
+        return db_job
+
+    @classmethod
+    def submit(cls, job_id: int):
+        """
+        把任务交给工作线程
+        :param job_id: 任务id
+        """
+        cls.get_executor().submit(cls.run, job_id)
+
+    @classmethod
+    def cancel(cls, db: Session, job_id: int) -> models.NextTurnJob:
+        """
+        取消任务：等待中的任务直接取消，运行中的任务标记cancel_requested，在当天结束后提交已完成的天数并停止
+        工作线程只在检查点写入任务记录，标记不会被长时间阻塞
+        :param job_id: 任务id
+        """
+        if not crud.update_next_turn_job_status(
+            db=db,
+            job_id=job_id,
+            status=game_configs.JobStatus.cancelled,
+            from_status=game_configs.JobStatus.pending,
+            attri={"finished_time": datetime.datetime.now(), "active_save_id": None},
+        ):
+            crud.update_next_turn_job_status(
+                db=db,
+                job_id=job_id,
+                status=game_configs.JobStatus.running,
+                from_status=game_configs.JobStatus.running,
+                attri={"cancel_requested": True},
+            )
+        return crud.get_next_turn_job_by_id(db=db, job_id=job_id)
+
+    @classmethod
+    def resume(cls, db: Session, job_id: int) -> models.NextTurnJob:
+        """
+        继续已取消或出错的任务，从已完成的天数接着行进
+        :param job_id: 任务id
+        """
+        job = crud.get_next_turn_job_by_id(db=db, job_id=job_id)
+        if job.status not in (game_configs.JobStatus.cancelled, game_configs.JobStatus.failed):
+            return job
+        try:
+            resumed = crud.update_next_turn_job_status(
+                db=db,
+                job_id=job_id,
+                status=game_configs.JobStatus.pending,
+                from_status=job.status,
+                attri={"error": None, "finished_time": None, "active_save_id": job.save_id, "cancel_requested": False},
+            )
+        except IntegrityError:
+            # 存档已有其他未结束的任务
+            db.rollback()
+            resumed = False
+        if resumed:
+            cls.submit(job_id)
+        return crud.get_next_turn_job_by_id(db=db, job_id=job_id)
+
+    @classmethod
+    def recover(cls):
+        """
+        服务启动时继续未完成的任务：运行中的任务是上次退出时中断的，与等待中的任务一起按创建顺序重新执行
+        存档锁被占用的任务正由其他进程执行，不做处理
+        """
+        job_ids = []
+        with SessionLocal() as db:
+            jobs = crud.get_next_turn_jobs_by_status(
+                db=db, status=[game_configs.JobStatus.pending, game_configs.JobStatus.running]
+            )
+            for job in jobs:
+                with save_lock(job.save_id, blocking=False) as acquired:
+                    if not acquired:
+                        continue
+                    crud.update_next_turn_job(db=db, job_id=job.id, attri={"status": game_configs.JobStatus.pending})
+                job_ids.append(job.id)
+        if job_ids:
+            logger.info("继续{}个未完成的下一回合任务".format(len(job_ids)))
+        for job_id in job_ids:
+            cls.submit(job_id)
+
+    @classmethod
+    def run(cls, job_id: int):
+        """
+        工作线程的入口，出错时回滚到上一个检查点并记录错误
+        :param job_id: 任务id
+        """
+        try:
+            with SessionLocal() as db:
+                save_id = crud.get_next_turn_job_by_id(db=db, job_id=job_id).save_id
+            with save_lock(save_id):
+                with CheckpointSession() as checkpoint_session:
+                    cls.execute(checkpoint_session, job_id)
+        except Exception as e:
+            logger.exception("下一回合任务{}出错".format(job_id))
+            with SessionLocal() as db:
+                crud.update_next_turn_job(
+                    db=db,
+                    job_id=job_id,
+                    attri={
+                        "status": game_configs.JobStatus.failed,
+                        "error": repr(e),
+                        "finished_time": datetime.datetime.now(),
+                        "active_save_id": None,
+                    },
+                )
+
+    @classmethod
+    def execute(cls, checkpoint_session: CheckpointSession, job_id: int):
+        """
+        执行任务的剩余天数
+        :param checkpoint_session: 任务的会话
+        :param job_id: 任务id
+        """
+        db = checkpoint_session.db
+        if not crud.update_next_turn_job_status(
+            db=db,
+            job_id=job_id,
+            status=game_configs.JobStatus.running,
+            from_status=game_configs.JobStatus.pending,
+            attri={"started_time": datetime.datetime.now()},
+        ):
+            # 已被取消
+            return
+        checkpoint_session.checkpoint()
+        job = crud.get_next_turn_job_by_id(db=db, job_id=job_id)
+
+        is_holiday = job.job_type == game_configs.JobType.holiday
+        next_turner = NextTurner(
+            db=db,
+            save_id=job.save_id,
+            skip=is_holiday,
+            engine=job.engine,
+            workers=job.workers,
+            seed=job.seed,
+            fidelity=job.fidelity,
+        )
+        finished_num = job.finished_num
+        days_done = 0
+
+        def progress(days: int) -> bool:
+            nonlocal days_done
+            days_done = days
+            if not is_holiday and next_turner.check_if_exists_pve():
+                # 下一回合到有玩家俱乐部比赛的一天为止
+                job.state = "pve"
+                return False
+            with SessionLocal() as poll_db:
+                return not crud.get_next_turn_job_by_id(db=poll_db, job_id=job_id).cancel_requested
+
+        def checkpoint():
+            # 任务记录只在检查点写入，不在事务中长时间锁定，取消请求可随时写入
+            job.finished_num = finished_num + days_done
+            checkpoint_session.checkpoint()
+
+        job.finished_num = finished_num + next_turner.run_days(
+            job.turn_num - finished_num, checkpoint, job.checkpoint_days, progress=progress
+        )
+        job.status = (
+            game_configs.JobStatus.done
+            if job.finished_num >= job.turn_num or job.state == "pve"
+            else game_configs.JobStatus.cancelled
+        )
+        job.finished_time = datetime.datetime.now()
+        job.active_save_id = None
+        logger.info("下一回合任务{}：{}/{}天，{}".format(job_id, job.finished_num, job.turn_num, job.status.value))
@@ -1,12 +1,17 @@
+import bisect
 import datetime
 import json
+import threading
 import time
-from typing import List
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
 
 import crud
+import game_configs
 import models
 import schemas
 from modules import computed_data_app, game_app, generate_app, transfer_app
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from utils import Date, logger, utils
 
@@ -26,27 +31,157 @@ class NextTurner:
     回合行进的入口类
     """
 
-    def __init__(self, db: Session, save_id: int, skip: bool = False):
+    # 存档id: 本赛季各解说精度下的比赛场数、模拟耗时与解说字节数；各回合的请求与任务累加到同一份统计，
+    # 赛季结束时输出并移除；最多保留game_configs.fidelity_stats_saves个存档，按最近使用淘汰，删除存档时一并移除
+    saves_fidelity_stats: OrderedDict = OrderedDict()
+    saves_fidelity_stats_lock = threading.Lock()
+
+    def __init__(
+        self,
+        db: Session,
+        save_id: int,
+        skip: bool = False,
+        engine: str = "serial",
+        workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        fidelity: str = game_configs.Fidelity.full,
+    ):
+        """
+        :param engine: 比赛引擎 serial为逐场模拟 batch为整个比赛日批量模拟（玩家俱乐部的比赛仍逐场模拟）
+                       process为多进程模拟比赛日，结果在同一事务中写回
+        :param workers: process引擎的进程数，为空时取cpu核数
+        :param seed: process引擎的随机种子
+        :param fidelity: 电脑间比赛的解说精度，headless时不生成也不保存解说，quick时按统计模型快速模拟；
+                         各赛事可在game_configs.competition_fidelity中单独配置
+        """
         self.db = db
         self.save_id = save_id
         self.save_model = crud.get_save_by_id(db=self.db, save_id=self.save_id)
         self.date: str = ""
         self.skip = skip
+        self.engine = engine
+        self.workers = workers
+        self.seed = seed
+        self.fidelity = fidelity
+        # 一天内所有比赛的结果统一写入，见save_results
+        self.result_sink = game_app.ResultSink(self.db)
+        # 战术调整缓存，对阵与阵容未变时跳过战术调整模拟赛；同一存档的各回合共用
+        self.tactic_cache = game_app.TacticCache.get_by_save(save_id)
+        # 战术调整的代理模型，未启用时为空
+        self.tactic_estimator = game_app.TacticSurrogate.load_default()
+        # 快速模拟模型，不使用快速模拟时为空
+        self.quick_simulator = (
+            game_app.QuickSimulator.load_default()
+            if game_configs.Fidelity.quick in (fidelity, *game_configs.competition_fidelity.values())
+            else None
+        )
+        # 批量模式中预读的日程表，日期: 当天的事项；日程表生成后清空，下一次用到时重新读取，见run_days
+        self.calendar_events: Optional[Dict[str, dict]] = None
+        self.calendar_dates: List[str] = []  # 预读的日程表中有事项的日期，升序
+        self.calendar_end_date: Optional[str] = None
 
-    def plus_days(self):
+    def get_next_date(self, days: int = 1) -> str:
         """
-        世界时间加一天
+        存档日期的days天后
         """
         date = Date(self.save_model.date)
-        date.plus_days(1)
-        self.save_model.date = str(date)
+        date.plus_days(days)
+        return str(date)
+
+    def plus_days(self, days: int = 1):
+        """
+        世界时间加days天
+        """
+        self.save_model.date = self.get_next_date(days)
         self.db.commit()
-        self.date = str(date)
+        self.date = self.save_model.date
+
+    def run_days(
+        self,
+        turn_num: int,
+        checkpoint: Callable[[], None],
+        checkpoint_days: int = game_configs.holiday_checkpoint_days,
+        progress: Optional[Callable[[int], bool]] = None,
+    ) -> int:
+        """
+        度假的批量模式：连续行进turn_num天，日程表一次读入，每checkpoint_days天调用一次checkpoint提交
+        没有事项的日子什么也不发生（体力按日期计算，见ComputedPlayer.get_real_stamina），时间直接跳到下一个有事项的日期，
+        耗时只与有事项的天数有关；各事项的处理与逐日行进相同，结果一致
+        self.db为core.db.CheckpointSession的会话时，其中的提交只写入外层事务，俱乐部与球员等实例一直保留在会话中
+        :param turn_num: 天数
+        :param checkpoint: 真正提交的回调，见CheckpointSession.checkpoint
+        :param checkpoint_days: 提交间隔的天数
+        :param progress: 每次行进后以已行进的天数调用，在提交之前，返回False时停止
+        :return: 实际行进的天数
+        """
+        self.calendar_end_date = self.get_next_date(turn_num)
+        self.calendar_events = None
+        days = 0
+        try:
+            while days < turn_num:
+                event_date = self.get_next_event_date()
+                if event_date is None:
+                    step = turn_num - days
+                else:
+                    step = (Date(event_date).get_date() - Date(self.save_model.date).get_date()).days
+                self.plus_days(step)
+                if event_date is not None:
+                    logger.info("第{}回合".format(str(days + step)))
+                    self.check()
+                if progress is not None and not progress(days + step):
+                    return days + step
+                if (days + step) // checkpoint_days > days // checkpoint_days and days + step < turn_num:
+                    checkpoint()
+                days += step
+            return turn_num
+        finally:
+            self.calendar_end_date = None
+            self.calendar_events = None
+            self.calendar_dates = []
+
+    def load_calendar_events(self, start_date: str):
+        """
+        一次读取start_date到self.calendar_end_date的日程表，按日期合并，合并顺序同get_total_events
+        :param start_date: 开始日期（含）
+        """
+        calendars: List[models.Calendar] = (
+            self.db.query(models.Calendar)
+            .filter(
+                models.Calendar.save_id == self.save_model.id,
+                models.Calendar.date >= start_date,
+                models.Calendar.date <= self.calendar_end_date,
+            )
+            .order_by(models.Calendar.id)
+            .all()
+        )
+        calendar_events = dict()
+        for calendar in calendars:
+            event = json.loads(calendar.event_str)
+            calendar_events[calendar.date] = utils.merge_dict_with_list_items(
+                calendar_events.get(calendar.date, dict()), event
+            )
+        self.calendar_events = calendar_events
+        self.calendar_dates = sorted(calendar_events)
+
+    def get_next_event_date(self) -> Optional[str]:
+        """
+        批量模式中存档日期之后第一个有事项的日期，不晚于self.calendar_end_date
+        :return: 日期，没有时为空
+        """
+        if self.calendar_events is None:
+            self.load_calendar_events(self.get_next_date())
+        i = bisect.bisect_right(self.calendar_dates, self.save_model.date)
+        return self.calendar_dates[i] if i < len(self.calendar_dates) else None
 
     def get_total_events(self) -> dict:
         """
         获取字典格式的日程表
         """
+        if self.calendar_end_date is not None and self.date <= self.calendar_end_date:
+            # 批量模式中从预读的日程表中取
+            if self.calendar_events is None:
+                self.load_calendar_events(self.date)
+            return self.calendar_events.get(self.date, dict())
         # 一天的事项不一定只存在一条calendar记录中
         query_str = "and_(models.Calendar.save_id=='{}', models.Calendar.date=='{}')".format(
             self.save_model.id, self.date
@@ -78,6 +213,8 @@ class NextTurner:
             self.pve_starter(total_events["pve"])
         if "eve" in total_events.keys():
             self.eve_starter(total_events["eve"])
+        # 之后的事项会读取比赛结果，需先写入
+        self.save_results()
         if "transfer prepare" in total_events.keys():
             self.transfer_prepare_starter(total_events["transfer prepare"])
         if "crew improve" in total_events.keys():
@@ -104,34 +241,68 @@ class NextTurner:
         eve入口
         """
         s = time.time()
-        for game in eve:
-            self.play_game(game)
+        if self.engine == "serial":
+            for game in eve:
+                self.play_game(game)
+        else:
+            # 快速模拟无需批量或多进程，逐场进行
+            engine_games = []
+            for game in eve:
+                if self.get_fidelity(game) == game_configs.Fidelity.quick:
+                    self.play_game(game)
+                else:
+                    engine_games.append(game)
+            if engine_games and self.engine == "batch":
+                self.play_games_in_batch(engine_games)
+            elif engine_games and self.engine == "process":
+                self.play_games_in_process(engine_games)
         e = time.time()
         logger.debug("共耗时{}s".format(e - s))
+        self.tactic_cache.report()
+
+    def get_fidelity(self, calendar_game) -> str:
+        """
+        获取一场比赛实际使用的精度，见GameEvE.get_fidelity；快速模拟模型不存在时改为无解说模拟
+        :param calendar_game: 日程表中的比赛信息
+        """
+        fidelity = game_app.GameEvE.get_fidelity(
+            self.fidelity,
+            calendar_game["club_id"].split(","),
+            self.save_model.player_club_id,
+            calendar_game["game_name"],
+            calendar_game["game_type"],
+        )
+        if fidelity == game_configs.Fidelity.quick and self.quick_simulator is None:
+            return game_configs.Fidelity.headless
+        return fidelity
 
     def play_game(self, calendar_game):
         """
-        进行一场比赛，包括战术调整
+        进行一场比赛，包括战术调整；快速模拟的比赛不进行战术调整
         :param calendar_game: 日程表中的比赛信息
         """
-        # 战术调整
         clubs_id = calendar_game["club_id"].split(",")
+        fidelity = self.get_fidelity(calendar_game)
 
         club1_model = self.db.query(models.Club).filter(models.Club.id == clubs_id[0]).first()
         club2_model = self.db.query(models.Club).filter(models.Club.id == clubs_id[1]).first()
 
-        tactic_adjustor = game_app.TacticAdjustor(
-            db=self.db,
-            club1_id=clubs_id[0],
-            club2_id=clubs_id[1],
-            player_club_id=self.save_model.player_club_id,
-            save_id=self.save_model.id,
-            club1_model=club1_model,
-            club2_model=club2_model,
-            season=self.save_model.season,
-            date=self.date,
-        )
-        tactic_adjustor.adjust()
+        # 战术调整
+        if fidelity != game_configs.Fidelity.quick:
+            tactic_adjustor = game_app.TacticAdjustor(
+                db=self.db,
+                club1_id=clubs_id[0],
+                club2_id=clubs_id[1],
+                player_club_id=self.save_model.player_club_id,
+                save_id=self.save_model.id,
+                club1_model=club1_model,
+                club2_model=club2_model,
+                season=self.save_model.season,
+                date=self.date,
+                tactic_cache=self.tactic_cache,
+                tactic_estimator=self.tactic_estimator,
+            )
+            tactic_adjustor.adjust()
         # 开始模拟比赛
         game_eve = game_app.GameEvE(
             db=self.db,
@@ -144,14 +315,207 @@ class NextTurner:
             save_id=self.save_model.id,
             club1_model=club1_model,
             club2_model=club2_model,
+            fidelity=fidelity,
         )
-        name1, name2, score1, score2 = game_eve.start()
+        s = time.time()
+        if fidelity == game_configs.Fidelity.quick:
+            self.quick_simulator.simulate(game_eve)
+        else:
+            game_eve.simulate()
+        game_eve.finish()
+        name1, name2, score1, score2 = self.result_sink.add(game_eve)
+        self.record_fidelity_stats([game_eve], time.time() - s)
         logger.info(
             "{} {}: {} {}:{} {}".format(
                 calendar_game["game_name"], calendar_game["game_type"], name1, score1, score2, name2
             )
         )
 
+    def play_games_in_batch(self, calendar_games: list):
+        """
+        批量进行一个比赛日的比赛，包括战术调整
+        涉及玩家俱乐部的比赛需要完整解说，仍逐场进行
+        :param calendar_games: 日程表中的比赛信息列表
+        """
+        batch_games = []
+        for calendar_game in calendar_games:
+            clubs_id = [int(club_id) for club_id in calendar_game["club_id"].split(",")]
+            if self.save_model.player_club_id in clubs_id:
+                self.play_game(calendar_game)
+            else:
+                batch_games.append(calendar_game)
+        if not batch_games:
+            return
+
+        # 战术调整
+        tactic_adjustors: List[game_app.TacticAdjustor] = []
+        for calendar_game in batch_games:
+            clubs_id = calendar_game["club_id"].split(",")
+            tactic_adjustors.append(
+                game_app.TacticAdjustor(
+                    db=self.db,
+                    club1_id=clubs_id[0],
+                    club2_id=clubs_id[1],
+                    player_club_id=self.save_model.player_club_id,
+                    save_id=self.save_model.id,
+                    club1_model=self.db.query(models.Club).filter(models.Club.id == clubs_id[0]).first(),
+                    club2_model=self.db.query(models.Club).filter(models.Club.id == clubs_id[1]).first(),
+                    season=self.save_model.season,
+                    date=self.date,
+                    tactic_cache=self.tactic_cache,
+                    tactic_estimator=self.tactic_estimator,
+                )
+            )
+        # 与逐场进行时相同：命中缓存或使用代理模型的比赛不再进行模拟赛，未命中的比赛由TacticOptimizer自适应地模拟
+        for tactic_adjustor in tactic_adjustors:
+            tactic_adjustor.adjust()
+
+        # 开始模拟比赛
+        games: List[game_app.GameEvE] = []
+        for calendar_game, tactic_adjustor in zip(batch_games, tactic_adjustors):
+            games.append(
+                game_app.GameEvE(
+                    db=self.db,
+                    club1_id=tactic_adjustor.club1_id,
+                    club2_id=tactic_adjustor.club2_id,
+                    date=self.date,
+                    game_name=calendar_game["game_name"],
+                    game_type=calendar_game["game_type"],
+                    season=self.save_model.season,
+                    save_id=self.save_model.id,
+                    club1_model=tactic_adjustor.club1_model,
+                    club2_model=tactic_adjustor.club2_model,
+                    fidelity=self.get_fidelity(calendar_game),
+                )
+            )
+        s = time.time()
+        game_app.GameBatch(games).start()
+        for game_eve in games:
+            game_eve.finish(rate=False)
+        game_app.PlayerRater.rate(games)
+        scores = [self.result_sink.add(game_eve) for game_eve in games]
+        self.record_fidelity_stats(games, time.time() - s)
+        for calendar_game, (name1, name2, score1, score2) in zip(batch_games, scores):
+            logger.info(
+                "{} {}: {} {}:{} {}".format(
+                    calendar_game["game_name"], calendar_game["game_type"], name1, score1, score2, name2
+                )
+            )
+
+    def play_games_in_process(self, calendar_games: list):
+        """
+        多进程进行一个比赛日的比赛，包括战术调整
+        :param calendar_games: 日程表中的比赛信息列表
+        """
+        matchday_executor = game_app.MatchdayExecutor(
+            db=self.db,
+            save_model=self.save_model,
+            date=self.date,
+            workers=self.workers,
+            seed=self.seed,
+            fidelity=self.fidelity,
+            tactic_cache=self.tactic_cache,
+            tactic_estimator=self.tactic_estimator,
+        )
+        s = time.time()
+        games, fixtures = matchday_executor.load(calendar_games)
+        results = matchday_executor.merge(
+            games, fixtures, matchday_executor.simulate(fixtures), result_sink=self.result_sink
+        )
+        self.record_fidelity_stats(games, time.time() - s)
+        for calendar_game, (name1, name2, score1, score2) in zip(calendar_games, results):
+            logger.info(
+                "{} {}: {} {}:{} {}".format(
+                    calendar_game["game_name"], calendar_game["game_type"], name1, score1, score2, name2
+                )
+            )
+
+    def save_results(self):
+        """
+        批量写入当天所有比赛的结果并提交
+        """
+        try:
+            self.result_sink.commit()
+        except Exception:
+            logger.error("比赛日结果写入失败，回滚")
+            self.db.rollback()
+            raise
+
+    def record_fidelity_stats(self, games: List["game_app.GameEvE"], elapsed: float):
+        """
+        记录一批比赛的耗时与解说、事件记录的字节数，耗时按场均分
+        :param games: 比赛实例列表
+        :param elapsed: 总耗时
+        """
+        with self.saves_fidelity_stats_lock:
+            fidelity_stats = self.saves_fidelity_stats.get(self.save_id)
+            if fidelity_stats is None:
+                fidelity_stats = self.saves_fidelity_stats[self.save_id] = self.new_fidelity_stats()
+            self.saves_fidelity_stats.move_to_end(self.save_id)
+            while len(self.saves_fidelity_stats) > game_configs.fidelity_stats_saves:
+                self.saves_fidelity_stats.popitem(last=False)
+            for game_eve in games:
+                stats = fidelity_stats[game_eve.fidelity]
+                stats[0] += 1
+                stats[1] += elapsed / len(games)
+                stats[2] += len(game_eve.script.encode("utf-8")) + game_eve.event_log.get_packed_size()
+
+    @staticmethod
+    def new_fidelity_stats() -> Dict[str, list]:
+        """
+        :return: 解说精度: [比赛场数, 模拟耗时, 解说字节数]
+        """
+        return {fidelity.value: [0, 0.0, 0] for fidelity in game_configs.Fidelity}
+
+    @classmethod
+    def drop_fidelity_stats(cls, save_id: int) -> Dict[str, list]:
+        """
+        移除存档的解说精度统计，用于赛季报告与删除存档
+        :param save_id: 存档id
+        :return: 移除的统计，不存在时为空的统计
+        """
+        with cls.saves_fidelity_stats_lock:
+            fidelity_stats = cls.saves_fidelity_stats.pop(save_id, None)
+        return fidelity_stats if fidelity_stats is not None else cls.new_fidelity_stats()
+
+    def report_fidelity_stats(self):
+        """
+        输出本赛季headless模式节省的时间与存储、快速模拟的场数与耗时，并移除统计
+        完整解说的场均耗时与字节数取本赛季的完整解说比赛，若没有则场均字节数取存档中已保存的事件记录
+        """
+        fidelity_stats = self.drop_fidelity_stats(self.save_id)
+        headless_num, headless_time, _ = fidelity_stats[game_configs.Fidelity.headless]
+        full_num, full_time, full_bytes = fidelity_stats[game_configs.Fidelity.full]
+        if headless_num:
+            if full_num:
+                average_bytes = full_bytes / full_num
+            else:
+                average_bytes = (
+                    self.db.query(func.avg(func.length(models.Game.event_log)))
+                    .filter(models.Game.save_id == self.save_id, models.Game.event_log.isnot(None))
+                    .scalar()
+                    or 0
+                )
+            logger.info(
+                "{}赛季共{}场无解说比赛，节省解说存储约{:.1f}KB".format(
+                    self.save_model.season, headless_num, headless_num * average_bytes / 1024
+                )
+            )
+            if full_num:
+                saved_time = headless_num * (full_time / full_num - headless_time / headless_num)
+                logger.info(
+                    "场均耗时 完整解说{:.3f}s 无解说{:.3f}s，节省约{:.1f}s".format(
+                        full_time / full_num, headless_time / headless_num, saved_time
+                    )
+                )
+        quick_num, quick_time, _ = fidelity_stats[game_configs.Fidelity.quick]
+        if quick_num:
+            logger.info(
+                "{}赛季共{}场快速模拟比赛，场均耗时{:.4f}s".format(
+                    self.save_model.season, quick_num, quick_time / quick_num
+                )
+            )
+
     def pve_starter(self, pve: list):
         """
         pve入口 创建game_pve表
@@ -260,6 +624,7 @@ class NextTurner:
         for transfer_club in transfer_club_list:
             transfer_club.receive_offer(self.save_id)
             transfer_club.make_offer(self.save_id)
+        self.invalidate_transferred_clubs()
 
     def transfer_end_starter(self, transfer: list):
         """
@@ -277,6 +642,17 @@ class NextTurner:
                 transfer_club_list.append(transfer_club)
         for transfer_club in transfer_club_list:
             transfer_club.receive_offer(self.save_id)  # 转会窗最后一天，只接受offer，不发新的。
+        self.invalidate_transferred_clubs()
+
+    def invalidate_transferred_clubs(self):
+        """
+        清除当天完成转会的买卖双方的战术调整缓存
+        """
+        offers = crud.get_completed_offers_by_date(db=self.db, save_id=self.save_id, date=Date(self.date).get_date())
+        club_ids = set()
+        for offer in offers:
+            club_ids.update((offer.buyer_id, offer.target_club_id))
+        self.tactic_cache.invalidate_clubs(club_ids)
 
     def rank_n_tv_income_base(
         self, league: models.League, game: computed_data_app.computed_game, first_bonus, second_bonus, rest_bonus
@@ -396,6 +772,7 @@ class NextTurner:
             if "champions" in game_event:
                 calendar_generator.generate_champions_league_games(game_type=game_event)
                 calendar_generator.save_in_db()
+        self.calendar_events = None
 
     def promote_n_relegate_starter(self):
         """
@@ -413,12 +790,12 @@ class NextTurner:
                 )
 
                 relegate_df = df1.sort_values(by=["积分", "净胜球", "胜球"], ascending=[False, False, False])
-                relegate_club_id = relegate_df[-4:]["id"].to_list()
+                relegate_club_id = relegate_df[-game_configs.relegation_num :]["id"].to_list()
                 for club_id in relegate_club_id:
                     # 降级
                     crud.update_club(db=self.db, club_id=club_id, attri={"league_id": lower_league.id})
                 promote_df = df2.sort_values(by=["积分", "净胜球", "胜球"], ascending=[False, False, False])
-                promote_club_id = promote_df[:4]["id"].to_list()
+                promote_club_id = promote_df[: game_configs.relegation_num]["id"].to_list()
                 for club_id in promote_club_id:
                     # 升级
                     crud.update_club(db=self.db, club_id=club_id, attri={"league_id": league_model.id})
@@ -428,8 +805,15 @@ class NextTurner:
         """
         生成下赛季的日程表
         """
+        self.report_fidelity_stats()
         self.save_model.season += 1  # 赛季+1
+        self.tactic_cache.clear()
         self.db.commit()
+        cleared_num = crud.clear_replayable_game_scripts(
+            db=self.db, save_id=self.save_model.id, season=self.save_model.season - game_configs.script_kept_seasons
+        )
+        logger.info("清除了{}场旧赛季比赛的解说，读取时将重放生成".format(cleared_num))
         calendar_generator = generate_app.CalendarGenerator(db=self.db, save_id=self.save_model.id)
         calendar_generator.generate()
+        self.calendar_events = None
         logger.info("{}赛季的日程表生成完成".format(str(self.save_model.season)))
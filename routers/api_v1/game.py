@@ -1,10 +1,12 @@
+import json
+
 import crud
 import models
 import schemas
 import utils
 from core.db import get_db
 from fastapi import APIRouter, Depends, HTTPException
-from modules import computed_data_app
+from modules import computed_data_app, game_app
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -17,5 +19,38 @@ def get_game_by_id(
     game = crud.get_game_by_id(db, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
+    event_log = None
+    if not game.script and not game.event_log and game_app.GameReplayer.is_replayable(game):
+        # 解说已被清除，重放比赛生成
+        event_log = game_app.GameReplayer(db=db).replay(game).export_event_log()
+    computed_game = computed_data_app.ComputedGame(db=db, save_id=save_model.id)
+    return computed_game.get_show_data(game_id=game_id, event_log=event_log)
+
+
+@router.get("/{game_id}/replay", response_model=schemas.GameReplayShow)
+def replay_game_by_id(
+    game_id: int, db: Session = Depends(get_db), save_model: models.Save = Depends(utils.get_current_save)
+):
+    """
+    根据保存的种子与开球快照重放比赛，并与保存的比赛结果比对
+    """
+    game = crud.get_game_by_id(db, game_id)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if not game_app.GameReplayer.is_replayable(game):
+        raise HTTPException(status_code=400, detail="Game is not replayable")
+    game_eve = game_app.GameReplayer(db=db).replay(game)
+    event_log = game_eve.export_event_log()
+    goal_record = game_eve.goal_record2str()
+    is_identical = int(game_eve.winner_id) == game.winner_id and json.loads(goal_record) == json.loads(game.goal_record)
+    if game.event_log:
+        is_identical = is_identical and event_log == game.event_log
     computed_game = computed_data_app.ComputedGame(db=db, save_id=save_model.id)
-    return computed_game.get_show_data(game_id=game_id)
+    return schemas.GameReplayShow(
+        id=game.id,
+        script=computed_game.render_script(event_log),
+        scores=[game_eve.lteam.score, game_eve.rteam.score],
+        winner_id=game_eve.winner_id,
+        goal_record=game_eve.goal_record,
+        is_identical=is_identical,
+    )
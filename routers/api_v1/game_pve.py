@@ -68,6 +68,8 @@ def commit_lineup_n_tactic_weight(
         coach_model.middle_attack = tactic_weight.middle_attack
         coach_model.counter_attack = tactic_weight.counter_attack
         db.commit()
+    # 阵容与战术比重变动后，缓存的战术调整结果不再适用
+    game_app.TacticCache.get_by_save(save_model.id).invalidate_clubs((save_model.player_club_id,))
 
 
 @router.post("/skip")
@@ -1,12 +1,14 @@
 from typing import List, Union
 
 import crud
+import game_configs
 import models
 import schemas
 import utils
 from core.db import get_db
-from fastapi import APIRouter, Depends
-from modules import computed_data_app
+from fastapi import APIRouter, Depends, HTTPException
+from modules import computed_data_app, game_app
+from pydantic import conint
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -53,6 +55,24 @@ def get_clubs_by_league(league_id: int, db: Session = Depends(get_db)) -> List[s
     ]
 
 
+@router.get("/{league_id}/forecast", response_model=schemas.LeagueForecast)
+def get_league_forecast(
+    league_id: int,
+    simulations: conint(gt=0, le=game_configs.forecast_max_simulations) = game_configs.forecast_simulations,
+    db: Session = Depends(get_db),
+) -> schemas.LeagueForecast:
+    """
+    预测指定联赛本赛季的最终排名：以当前积分榜为起点模拟剩余比赛，返回各俱乐部夺冠、前四与降级的概率
+    同一存档日期的结果会被缓存
+    :param league_id: 联赛id
+    :param simulations: 模拟次数，不超过game_configs.forecast_max_simulations
+    """
+    league_model = crud.get_league_by_id(db=db, league_id=league_id)
+    if not league_model:
+        raise HTTPException(status_code=404, detail="League not found")
+    return game_app.LeagueForecaster(db=db, league_model=league_model, simulations=simulations).forecast()
+
+
 @router.get("/{league_id}/points-table")
 def get_points_table(save_id: int, game_season: int, league_id: Union[int, str], db: Session = Depends(get_db)) -> dict:
     """
@@ -1,37 +1,119 @@
-from core.db import get_db
-from fastapi import APIRouter, BackgroundTasks, Depends
+from typing import Optional
+
+import crud
+import game_configs
+import models
+import schemas
+from core.db import CheckpointSession, get_db, save_lock
+from fastapi import APIRouter, Depends, HTTPException
 from modules import next_turn_app
+from pydantic import conint
 from sqlalchemy.orm import Session
-from utils import logger
 
 router = APIRouter()
 
 
 @router.get("/holiday")
-def next_turns_for_holiday(save_id: int, turn_num: int, db: Session = Depends(get_db)):
+def next_turns_for_holiday(
+    save_id: int,
+    turn_num: conint(gt=0),
+    engine: str = "serial",
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    fidelity: game_configs.Fidelity = game_configs.Fidelity.full,
+    checkpoint_days: Optional[conint(gt=0)] = None,
+    db: Session = Depends(get_db),
+):
     """
     专门用于度假的下一回合api
+    engine为batch时，电脑间的比赛按比赛日批量模拟，不生成解说
+    engine为process时，比赛日在workers个进程中模拟，给定seed时结果可复现
+    fidelity为headless时，电脑间的比赛不生成也不保存解说；为quick时按统计模型快速模拟，不进行战术调整
+    各赛事的精度可在game_configs.competition_fidelity中单独配置
+    日程表一次读入，没有事项的日子直接跳过，见NextTurner.run_days
+    给定checkpoint_days时使用批量模式：每checkpoint_days天才提交一次，出错时回滚到上一次提交
+    存档正在行进回合时返回409
     """
-    next_turner = next_turn_app.NextTurner(db=db, save_id=save_id, skip=True)
-    for i in range(turn_num):
-        logger.info("第{}回合".format(str(i + 1)))
-        next_turner.plus_days()
-        next_turner.check()
-
-
-def next_turn_background_task(next_turner: next_turn_app.NextTurner):
-    next_turner.check()
+    with save_lock(save_id, blocking=False) as acquired:
+        if not acquired or crud.get_active_next_turn_job(db=db, save_id=save_id) is not None:
+            raise HTTPException(status_code=409, detail="Save is advancing")
+        if checkpoint_days:
+            with CheckpointSession() as checkpoint_session:
+                next_turner = next_turn_app.NextTurner(
+                    db=checkpoint_session.db,
+                    save_id=save_id,
+                    skip=True,
+                    engine=engine,
+                    workers=workers,
+                    seed=seed,
+                    fidelity=fidelity,
+                )
+                next_turner.run_days(turn_num, checkpoint_session.checkpoint, checkpoint_days)
+            return
+        next_turner = next_turn_app.NextTurner(
+            db=db, save_id=save_id, skip=True, engine=engine, workers=workers, seed=seed, fidelity=fidelity
+        )
+        next_turner.run_days(turn_num, db.commit, checkpoint_days=1)
 
 
 @router.get("/")
-def next_turn_with_background_tasks(save_id: int, background_task: BackgroundTasks, db: Session = Depends(get_db)):
+def next_turn_with_background_tasks(save_id: int, idempotency_key: Optional[str] = None, db: Session = Depends(get_db)):
     """
-    开启后台任务的下一回合
+    下一回合，以任务的形式在后台执行，进度见/jobs/{job_id}
+    存档已有未结束的任务或idempotency_key重复时不再行进，返回该任务
     """
     next_turner = next_turn_app.NextTurner(db=db, save_id=save_id)
-    next_turner.plus_days()
-    msg = {"state": "null"}
-    if next_turner.check_if_exists_pve():
-        msg["state"] = "pve"
-    background_task.add_task(next_turn_background_task, next_turner=next_turner)
-    return msg
+    next_turner.date = next_turner.get_next_date()
+    job = next_turn_app.JobRunner.enqueue(
+        db=db,
+        job=schemas.NextTurnJobCreate(
+            save_id=save_id, job_type=game_configs.JobType.turn, checkpoint_days=1, idempotency_key=idempotency_key
+        ),
+        state="pve" if next_turner.check_if_exists_pve() else None,
+    )
+    return {"state": job.state or "null", "job_id": job.id}
+
+
+@router.post("/jobs", response_model=schemas.NextTurnJob)
+def create_next_turn_job(job: schemas.NextTurnJobCreate, db: Session = Depends(get_db)):
+    """
+    创建下一回合或度假任务，立即返回任务，由后台的工作线程执行
+    存档已有未结束的任务或idempotency_key重复时返回该任务
+    """
+    return next_turn_app.JobRunner.enqueue(db=db, job=job)
+
+
+def get_job(job_id: int, db: Session) -> models.NextTurnJob:
+    db_job = crud.get_next_turn_job_by_id(db=db, job_id=job_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return db_job
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.NextTurnJob)
+def get_next_turn_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    查询任务的状态与进度，进度为已提交的天数finished_num/turn_num
+    """
+    return get_job(job_id, db)
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=schemas.NextTurnJob)
+def cancel_next_turn_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    取消任务，运行中的任务在当天结束后停止
+    """
+    get_job(job_id, db)
+    return next_turn_app.JobRunner.cancel(db=db, job_id=job_id)
+
+
+@router.post("/jobs/{job_id}/resume", response_model=schemas.NextTurnJob)
+def resume_next_turn_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    从已完成的天数继续已取消或出错的任务，存档已有其他未结束的任务时返回409
+    """
+    get_job(job_id, db)
+    db_job = next_turn_app.JobRunner.resume(db=db, job_id=job_id)
+    if db_job.status in (game_configs.JobStatus.cancelled, game_configs.JobStatus.failed):
+        raise HTTPException(status_code=409, detail="Save is advancing")
+    return db_job
@@ -8,7 +8,7 @@ import schemas
 import utils
 from core.db import get_db
 from fastapi import APIRouter, Depends
-from modules import computed_data_app, transfer_app
+from modules import computed_data_app, game_app, transfer_app
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -92,6 +92,7 @@ def dealing_offers(
         p.player_model.on_sale = 0
         offer.status = "s"  # 交易完成
         db.commit()
+        game_app.TacticCache.get_by_save(save_model.id).invalidate_clubs((save_model.player_club_id, offer.buyer_id))
         return {"status": "succeed"}
     else:
         offer.status = "r"
@@ -140,10 +141,12 @@ def negotiate_wage(
     target_player = transfer_app.Player(
         db=db, player_id=target_player_id, season=save_model.season, date=save_model.date
     )
+    seller_club_id = target_player.player_model.club_id
     player_status = target_player.negotiate_wage(
         offer_wage=offer_wage, save_id=save_model.id, buyer_club_id=save_model.player_club_id
     )
     if player_status == 1:
+        game_app.TacticCache.get_by_save(save_model.id).invalidate_clubs((save_model.player_club_id, seller_club_id))
         return {"status": "success"}  # 返回true则已完成转会
     elif player_status == 0:
         return {"status": "fail"}
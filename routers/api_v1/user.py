@@ -7,7 +7,7 @@ import schemas
 import utils
 from core.db import get_db
 from fastapi import APIRouter, Depends, HTTPException, status
-from modules import generate_app
+from modules import game_app, generate_app, next_turn_app
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from utils import logger
@@ -83,6 +83,8 @@ async def create_save(
     if not break_flag:
         # 无法找不到正确的俱乐部名 删除save
         crud.delete_save_by_id(db=db, save_id=save_model.id)
+        game_app.TacticCache.drop_save(save_model.id)
+        next_turn_app.NextTurner.drop_fidelity_stats(save_model.id)
         logger.info("请求俱乐部名不合法！")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
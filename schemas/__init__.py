@@ -4,6 +4,7 @@ from schemas.coach import *
 from schemas.game import *
 from schemas.game_pve import *
 from schemas.league import *
+from schemas.next_turn_job import *
 from schemas.offer import *
 from schemas.player import *
 from schemas.save import *
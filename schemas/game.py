@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from game_configs.game_config import Location
 from pydantic import BaseModel
@@ -158,6 +158,9 @@ class GameCreate(BaseModel):
     type: str  # 比赛类型
     season: str
     script: str  # 解说
+    event_log: Optional[bytes] = None  # 打包后的比赛事件记录，解说由其生成
+    seed: Optional[int] = None  # 比赛随机数流的种子，为空时无法重放
+    replay: Optional[bytes] = None  # 打包后的开球快照
     mvp: int  # mvp球员id
 
     winner_id: int = 0  # 胜利球队id 平局为0
@@ -257,4 +260,13 @@ class GameShow(BaseModel):
     teams_info: List[GameTeamShow]
 
 
+class GameReplayShow(BaseModel):
+    id: int
+    script: str
+    scores: List[int]
+    winner_id: int
+    goal_record: List[GoalRecord]
+    is_identical: bool  # 重放结果与保存的比赛结果是否一致
+
+
 # endregion
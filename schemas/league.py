@@ -29,3 +29,21 @@ class LeagueShow(BaseModel):
     name: str
     cup: str  # 杯赛名称
     points: float
+
+
+class ClubForecast(BaseModel):
+    club_id: int
+    name: str
+    points: int  # 当前积分
+    expected_points: float  # 赛季结束时的积分期望
+    title: float  # 夺冠概率
+    top4: float  # 进入前四的概率，次级联赛即升级概率
+    relegation: float  # 降级概率，没有次级联赛时为0
+
+
+class LeagueForecast(BaseModel):
+    league_id: int
+    date: str  # 预测时的存档日期
+    simulations: int  # 模拟次数
+    remaining_games: int  # 剩余比赛数
+    clubs: List[ClubForecast] = []  # 按积分期望降序
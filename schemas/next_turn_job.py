@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Optional
+
+import game_configs
+from pydantic import BaseModel, conint
+
+
+class NextTurnJobCreate(BaseModel):
+    save_id: int
+    job_type: game_configs.JobType = game_configs.JobType.holiday
+    turn_num: conint(gt=0) = 1
+    # 参数含义见NextTurner
+    engine: str = "serial"
+    workers: Optional[int] = None
+    seed: Optional[int] = None
+    fidelity: game_configs.Fidelity = game_configs.Fidelity.full
+    checkpoint_days: conint(gt=0) = game_configs.holiday_checkpoint_days
+    idempotency_key: Optional[str] = None  # 重复请求时返回同一任务，见JobRunner.enqueue
+
+    class Config:
+        orm_mode = True
+
+
+class NextTurnJob(NextTurnJobCreate):
+    id: int
+    created_time: datetime
+    started_time: Optional[datetime]
+    finished_time: Optional[datetime]
+    status: game_configs.JobStatus
+    finished_num: int
+    state: Optional[str]
+    error: Optional[str]
+    cancel_requested: Optional[bool]
@@ -1,8 +1,8 @@
-from core.db import get_session
 from modules.ml_app.starter import Starter
 
 if __name__ == "__main__":
     pos_list = ["ST", "LW", "CAM", "CM", "CDM", "LM", "RB", "CB", "GK"]
     for pos in pos_list:
-        starter = Starter(pos, db=get_session())
+        # 按cpu核数并行生成，中断后重新运行会从已完成的分片继续
+        starter = Starter(pos)
         starter.start(10000)
@@ -1,6 +1,9 @@
 from utils import utils
+from utils import sampling
 from utils.date import Date
 from utils.dependencies import *
 from utils.logger import logger
 from utils.token_validator import *
 from utils.translator import Translator
+from utils.event_log import EventLog
+from utils.kickoff_snapshot import KickoffSnapshot
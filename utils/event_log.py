@@ -0,0 +1,142 @@
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import game_configs
+
+
+class EventLog:
+    """
+    比赛事件记录
+    每个事件为(事件代码, 发起者槽位, 对象槽位, 数值1, 数值2, 解说评级, 回合, 比赛时间)
+    槽位0-21为两队球员（主队0-10，客队11-21），100、101为主、客队，255为空
+    打包格式：版本号、两队俱乐部id、22名球员id，之后每个事件9字节
+    """
+
+    VERSION = 1
+    TEAM_PLAYERS = 11
+    TEAM_SLOT = 100
+    NO_SLOT = 255
+    HEADER = struct.Struct("<B2i22i")
+    RECORD = struct.Struct("<BBBBBBBH")
+
+    def __init__(self):
+        self.events: List[Tuple] = []
+
+    def __len__(self):
+        return len(self.events)
+
+    def get_packed_size(self) -> int:
+        """
+        获取打包后的字节数，没有事件时为0
+        """
+        if not self.events:
+            return 0
+        return self.HEADER.size + self.RECORD.size * len(self.events)
+
+    def append(self, code: int, actor: int, target: int, value1: int, value2: int, grade: int, turn: int, clock: int):
+        """
+        记录一个事件
+        :param code: 事件代码，见game_configs.Event
+        :param actor: 发起者槽位
+        :param target: 对象槽位
+        :param value1: 数值1，如主队比分、点球轮次
+        :param value2: 数值2，如客队比分
+        :param grade: 解说评级
+        :param turn: 回合数
+        :param clock: 比赛时间，以分秒拼接的整数表示，如1230为12:30
+        """
+        self.events.append((code, actor, target, min(value1, 255), min(value2, 255), grade, turn, clock))
+
+    def pack(self, club_ids: List[int], player_ids: List[List[int]]) -> bytes:
+        """
+        打包为二进制
+        :param club_ids: 主客队俱乐部id
+        :param player_ids: 两队按槽位排列的球员id
+        :return: 二进制数据
+        """
+        slots = []
+        for ids in player_ids:
+            slots += list(ids[: self.TEAM_PLAYERS]) + [0] * (self.TEAM_PLAYERS - len(ids))
+        data = bytearray(self.HEADER.pack(self.VERSION, *club_ids, *slots))
+        for event in self.events:
+            data += self.RECORD.pack(*event)
+        return bytes(data)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> Tuple[List[int], List[int], List[Tuple]]:
+        """
+        解包二进制数据
+        :param data: 二进制数据
+        :return: 两队俱乐部id，22个槽位的球员id，事件列表
+        """
+        header = cls.HEADER.unpack_from(data)
+        if header[0] != cls.VERSION:
+            raise ValueError("不支持的事件记录版本{}".format(header[0]))
+        club_ids = list(header[1:3])
+        player_ids = list(header[3:])
+        events = list(cls.RECORD.iter_unpack(data[cls.HEADER.size :]))
+        return club_ids, player_ids, events
+
+    @classmethod
+    def render(cls, data: bytes, club_names: Dict[int, str], player_names: Dict[int, str]) -> str:
+        """
+        将事件记录渲染为解说文本
+        :param data: 二进制数据
+        :param club_names: 俱乐部id与队名
+        :param player_names: 球员id与姓名
+        :return: 解说文本
+        """
+        club_ids, player_ids, events = cls.unpack(data)
+        lname, rname = club_names.get(club_ids[0], ""), club_names.get(club_ids[1], "")
+
+        def get_name(slot: int) -> str:
+            if slot < len(player_ids):
+                return player_names.get(player_ids[slot], "")
+            if cls.TEAM_SLOT <= slot < cls.TEAM_SLOT + 2:
+                return (lname, rname)[slot - cls.TEAM_SLOT]
+            return ""
+
+        script = []
+        for code, actor, target, value1, value2, grade, _, clock in events:
+            text, status = cls.format_event(code, get_name(actor), get_name(target), value1, value2, lname, rname)
+            script.append(text + cls.format_clock(status, clock) + "@" + str(grade) + "\n")
+        return "".join(script)
+
+    @staticmethod
+    def format_event(
+        code: int,
+        actor: Optional[str],
+        target: Optional[str],
+        value1: int,
+        value2: int,
+        lname: str,
+        rname: str,
+    ) -> Tuple[str, str]:
+        """
+        生成一个事件的解说词
+        :return: 解说词，解说状态参数
+        """
+        template, status = game_configs.event_templates[game_configs.Event(code)]
+        text = template.format(actor=actor, target=target, value1=value1, value2=value2, lname=lname, rname=rname)
+        return text, status
+
+    @staticmethod
+    def format_clock(status: str, clock: int) -> str:
+        """
+        生成解说的时间部分
+        :param status: 解说状态参数
+        :param clock: 比赛时间
+        :return: 形如@12:30的时间字符串，纯解说没有时间
+        """
+        if status == "s":  # 开始
+            return "@00:00"
+        elif status == "as":  # 加时开始
+            return "@090:00"
+        elif status == "e":  # 结束
+            return "@90:00"
+        elif status == "ae":  # 加时结束
+            return "@120:00"
+        elif status == "d" or status == "c":
+            str_time = "{:04d}".format(clock)
+            return "@" + str_time[:-2] + ":" + str_time[-2:]
+        return ""
@@ -0,0 +1,64 @@
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import game_configs
+
+
+class KickoffSnapshot:
+    """
+    开球快照：两队的战术比重与首发阵容，与比赛种子一起即可重放比赛
+    打包格式：版本号、上一回合是否打平（2为未知），之后每队为俱乐部id、各战术比重、球员数，
+    每名球员为球员id、位置序号、初始体力与引擎用到的各项能力
+    """
+
+    VERSION = 1
+    NO_RESULT = 2
+    TACTIC_NAMES = tuple(tactic.value for tactic in game_configs.Tactic)
+    LOCATIONS = tuple(game_configs.Location)
+    HEADER = struct.Struct("<BB")
+    TEAM = struct.Struct("<i{}iB".format(len(TACTIC_NAMES)))
+    PLAYER = struct.Struct("<iBd{}d".format(len(game_configs.engine_capa)))
+
+    @classmethod
+    def pack(cls, last_leg_drawn: Optional[bool], teams: List[Dict]) -> bytes:
+        """
+        打包为二进制
+        :param last_leg_drawn: 上一回合是否打平，为空时表示未知
+        :param teams: 两队快照，见GameEvE.get_kickoff
+        :return: 二进制数据
+        """
+        data = bytearray(cls.HEADER.pack(cls.VERSION, cls.NO_RESULT if last_leg_drawn is None else int(last_leg_drawn)))
+        for team in teams:
+            tactic = [team["tactic"][name] for name in cls.TACTIC_NAMES]
+            data += cls.TEAM.pack(team["club_id"], *tactic, len(team["players"]))
+            for player_id, location, stamina, capa in team["players"]:
+                data += cls.PLAYER.pack(
+                    player_id,
+                    cls.LOCATIONS.index(location),
+                    stamina,
+                    *[capa[name] for name in game_configs.engine_capa]
+                )
+        return bytes(data)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> Tuple[Optional[bool], List[Dict]]:
+        """
+        解包二进制数据
+        :param data: 二进制数据
+        :return: 上一回合是否打平，两队快照
+        """
+        version, last_leg_drawn = cls.HEADER.unpack_from(data)
+        if version != cls.VERSION:
+            raise ValueError("不支持的开球快照版本{}".format(version))
+        offset = cls.HEADER.size
+        teams = []
+        for _ in range(2):
+            club_id, *tactic, players_num = cls.TEAM.unpack_from(data, offset)
+            offset += cls.TEAM.size
+            players = []
+            for _ in range(players_num):
+                player_id, location, stamina, *capa = cls.PLAYER.unpack_from(data, offset)
+                offset += cls.PLAYER.size
+                players.append([player_id, cls.LOCATIONS[location], stamina, dict(zip(game_configs.engine_capa, capa))])
+            teams.append({"club_id": club_id, "tactic": dict(zip(cls.TACTIC_NAMES, tactic)), "players": players})
+        return None if last_leg_drawn == cls.NO_RESULT else bool(last_leg_drawn), teams
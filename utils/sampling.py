@@ -0,0 +1,76 @@
+"""
+抽样工具：预编译的累积分布表与两方对抗判定
+逐次抽样在同一随机数流下与utils.select_by_pro、utils.is_happened_by_pro的结果完全一致，已保存的比赛仍可按种子重放
+"""
+
+import random
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Any, Dict
+
+import game_configs
+
+
+class CdfTable:
+    """
+    预编译的累积分布表，代替对同一概率字典反复调用utils.select_by_pro
+    """
+
+    __slots__ = ("keys", "cum", "total")
+
+    def __init__(self, pro_dict: Dict[Any, float]):
+        """
+        :param pro_dict: 概率字典，形如{'A':60,'B':40}
+        """
+        self.keys = list(pro_dict.keys())
+        self.cum = list(accumulate(pro_dict.values()))
+        self.total = self.cum[-1] if self.cum else 0
+
+    def sample(self, rng=random) -> Any:
+        """
+        抽取一个选项
+        :param rng: 随机数生成器，默认为全局的random模块
+        :return: 字典键值（即选项）
+        """
+        if self.total == 0:
+            # 如果所有概率均为0，随机选取
+            return rng.choice(self.keys)
+        return self.keys[bisect_left(self.cum, rng.random() * self.total)]
+
+
+def duel(a: float, b: float, rng=random) -> bool:
+    """
+    两方对抗，a方获胜的概率为a/(a+b)；等价于utils.select_by_pro({A: a, B: b}) == A
+    :param a: a方的数值
+    :param b: b方的数值
+    :param rng: 随机数生成器，默认为全局的random模块
+    :return: a方是否获胜
+    """
+    total = a + b
+    if total == 0:
+        return rng.choice((True, False))
+    return rng.random() * total <= a
+
+
+def happened(pro: float, rng=random) -> bool:
+    """
+    根据概率判断是否发生，等价于utils.is_happened_by_pro，但不再构造1000个元素的列表
+    :param pro: 概率，范围0-1
+    :param rng: 随机数生成器，默认为全局的random模块
+    :return: 发生为True，不发生为False
+    """
+    pro = int(min(pro, 1) * 1000)
+    if pro < 0:
+        rng.randrange(1000 - pro)
+        return False
+    return rng.randrange(1000) < pro
+
+
+# 球员每次战术组织时的位置偏移
+location_shift_tables: Dict[str, CdfTable] = {
+    location: CdfTable(shift_pro) for location, shift_pro in game_configs.location_shift.items()
+}
+# 各位置的能力比重，用于能力成长
+location_weight_tables: Dict[str, CdfTable] = {
+    location["name"]: CdfTable(location["weight"]) for location in game_configs.location_capability
+}
@@ -41,16 +41,17 @@ def retain_decimal(value, n=3):
     return Decimal("%.{}f".format(n) % value)
 
 
-def is_happened_by_pro(pro):
+def is_happened_by_pro(pro, rng=random):
     """
     根据概率判断是否发生
     :param pro: 概率，范围0-1
+    :param rng: 随机数生成器，默认为全局的random模块
     :return: 发生为True，不发生为False
     """
     pro = pro if pro <= 1 else 1
     pro = int(pro * 1000)
     pool = [1 for i in range(pro)] + [0 for i in range(1000 - pro)]
-    flag = random.choice(pool)
+    flag = rng.choice(pool)
     return flag
 
 
@@ -65,10 +66,11 @@ def act_by_pro(pro, func, *args, **kwargs):
         func(*args, **kwargs)
 
 
-def select_by_pro(pro_dict: dict):
+def select_by_pro(pro_dict: dict, rng=random):
     """
     按概率选取选项
     :param pro_dict: 概率字典，形如{'A':60,'B':40}
+    :param rng: 随机数生成器，默认为全局的random模块
     :return: 字典键值（即选项）
     """
     num_sum = 0
@@ -76,8 +78,8 @@ def select_by_pro(pro_dict: dict):
         num_sum += value
     if num_sum == 0:
         # 如果所有概率均为0，随机选取
-        return random.choice(list(pro_dict.keys()))
-    ran = random.random() * num_sum
+        return rng.choice(list(pro_dict.keys()))
+    ran = rng.random() * num_sum
     sum_ = 0
     for key, value in pro_dict.items():
         sum_ += value